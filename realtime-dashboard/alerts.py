@@ -0,0 +1,312 @@
+import json
+import os
+import shlex
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from typing import NamedTuple, Optional
+import metrics
+from records import format_time
+
+FIRED = metrics.counter('dashboard_alerts_total', "Alert state changes", ('state',))
+
+# Alert rule syntax: [subject] field op threshold[%] [for duration]
+#   TSLA change_percent < -3          one series of the source holding TSLA
+#   stocks:* change_percent < -3      every symbol (plain * if only one source has the field)
+#   "New York" temperature >= 30      quote subjects with spaces
+#   CPU > 90% for 60s                 no subject: system or news; fires once true for 60s
+# op is one of < <= > >=; % is allowed after percentages and ignored; durations take s, m or h.
+OPERATORS = {'>': (1, False), '>=': (1, True), '<': (-1, False), '<=': (-1, True)}
+DURATION_UNITS = {'s': 1000, 'm': 60000, 'h': 3600000}
+# Sources whose samples have no key
+KEYLESS_SOURCES = ('system', 'news')
+# Rule subject matching every key of a source
+ANY_KEY = '*'
+
+FIRING = 'firing'
+RESOLVED = 'resolved'
+
+class Rule(NamedTuple):
+    id: int
+    text: str
+    source: str
+    key: Optional[str]  # ANY_KEY for every key, None for keyless sources
+    column: str
+    op: str
+    threshold: float
+    duration: int  # ms the condition must hold before firing
+
+class Alert(NamedTuple):
+    rule: Rule
+    key: Optional[str]
+    state: str
+    value: float
+    timestamp: int  # epoch ms
+
+    def to_dict(self):
+        return {
+            'timestamp': self.timestamp,
+            'time': format_time(self.timestamp, '%Y-%m-%d %H:%M:%S'),
+            'state': self.state,
+            'rule': self.rule.text,
+            'source': self.rule.source,
+            'key': self.key,
+            'value': self.value
+        }
+
+def parse_duration(text):
+    unit = DURATION_UNITS.get(text[-1:].lower())
+    number = text[:-1] if unit else text
+    return int(float(number) * (unit or 1000))
+
+def subject_index(keys):
+    """Map lowercased keys to their (source, key) pairs, from source -> configured keys"""
+    subjects = {}
+    for source, known_keys in keys.items():
+        for key in known_keys:
+            subjects.setdefault(key.lower(), []).append((source, key))
+    return subjects
+
+def compile_rule(rule_id, text, fields, subjects, aliases=None):
+    """Parse one rule into a Rule, resolving its subject and field against the known sources
+
+    fields maps source -> numeric columns, subjects is a subject_index of
+    the configured keys (to find the source of a bare subject such as
+    TSLA) and aliases maps short field names to columns (CPU ->
+    cpu_percent). Raises ValueError naming the rule if it cannot be
+    compiled.
+    """
+    aliases = aliases or {}
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(f"alert rule {text!r}: {e}") from None
+    position = next((i for i, token in enumerate(tokens) if token in OPERATORS), None)
+    if position not in (1, 2) or len(tokens) not in (position + 2, position + 4):
+        raise ValueError(f"alert rule {text!r}: expected '[subject] field op threshold [for duration]'")
+    column = tokens[position - 1].lower()
+    column = aliases.get(column, column)
+    try:
+        threshold = float(tokens[position + 1].rstrip('%'))
+        duration = 0
+        if len(tokens) == position + 4:
+            if tokens[position + 2].lower() != 'for':
+                raise ValueError(tokens[position + 2])
+            duration = parse_duration(tokens[position + 3])
+    except ValueError as e:
+        raise ValueError(f"alert rule {text!r}: bad number or duration {e}") from None
+
+    if position == 1:
+        candidates = [(source, None) for source in KEYLESS_SOURCES if column in fields.get(source, ())]
+    else:
+        subject = tokens[0]
+        source, _, key = subject.rpartition(':')
+        if source:
+            candidates = [(source, key)] if column in fields.get(source, ()) else []
+        elif key == ANY_KEY:
+            candidates = [(source, ANY_KEY) for source, columns in fields.items()
+                          if column in columns and source not in KEYLESS_SOURCES]
+        else:
+            # Bare subject: the configured source holding that key, matched case-insensitively
+            candidates = [(source, known) for source, known in subjects.get(key.lower(), ())
+                          if column in fields.get(source, ())]
+    if len(candidates) != 1:
+        problem = "is ambiguous, prefix the subject with its source" if candidates else "matches no source field"
+        raise ValueError(f"alert rule {text!r} {problem}")
+    source, key = candidates[0]
+    return Rule(rule_id, text, source, key, column, tokens[position], threshold, duration)
+
+def load_rules(rules, path=None):
+    """Rule texts from a list plus a file with one rule per line (# starts a comment)"""
+    texts = list(rules)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            texts.extend(line.split('#', 1)[0].strip() for line in f)
+    return [text for text in texts if text]
+
+class RuleGroup:
+    """Rules on one column with the same operator, sorted by threshold
+
+    Thresholds are stored multiplied by the operator's sign, so for every
+    operator the rules that hold for a value are a prefix of the group.
+    A new sample moves the prefix end by one bisect, and only the rules
+    between the old and new end changed state.
+    """
+
+    def __init__(self, op):
+        self.sign, inclusive = OPERATORS[op]
+        # How many rules hold for a signed value: thresholds below it (or equal, for <= and >=)
+        self.find = bisect_right if inclusive else bisect_left
+        self.thresholds = []
+        self.rules = []
+
+    def add(self, rule):
+        threshold = self.sign * rule.threshold
+        index = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(index, threshold)
+        self.rules.insert(index, rule)
+
+class AlertLog:
+    """Append-only JSON lines file of alert state changes"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def write(self, alerts):
+        lines = ''.join(json.dumps(alert.to_dict()) + '\n' for alert in alerts)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+class AlertEngine:
+    """Threshold rules compiled once and evaluated incrementally, one sample at a time
+
+    Rules are indexed by (source, key) and column, and grouped by operator
+    (see RuleGroup), so a sample costs a dict lookup for series without
+    rules and a bisect per rule group otherwise, however many rules there
+    are. Only the last value of each series column is kept; history is
+    never rescanned. A rule with a duration fires once its condition has
+    held from one sample to a later one at least that long after.
+    """
+
+    def __init__(self, rules=(), fields=None, keys=None, aliases=None, recent=50):
+        self.rules = []
+        self.version = 0
+        # Where fired and resolved alerts are written, if anywhere (see AlertLog)
+        self.sink = None
+        self.recent = deque(maxlen=recent)
+        # (source, key) -> column -> op -> RuleGroup
+        self._index = {}
+        # (source, key) -> ((column, RuleGroups on it), ...), including rules on every key
+        self._plans = {}
+        # (source, key) -> {column: last value}
+        self._last = {}
+        # (source, key) -> {rule: timestamp its condition started holding}
+        self._pending = {}
+        # (source, key) -> {rule: Alert that fired}
+        self._firing = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        subjects = subject_index(keys or {})
+        for text in rules:
+            try:
+                self.add_rule(compile_rule(len(self.rules), text, fields or {}, subjects, aliases))
+            except ValueError as e:
+                print(f"Skipping {e}")
+
+    def add_rule(self, rule):
+        with self._lock:
+            self.rules.append(rule)
+            columns = self._index.setdefault((rule.source, rule.key), {})
+            groups = columns.setdefault(rule.column, {})
+            group = groups.get(rule.op)
+            if group is None:
+                group = groups[rule.op] = RuleGroup(rule.op)
+            group.add(rule)
+            self._plans.clear()
+
+    def subscribe(self, listener):
+        """Call listener(alerts) with every batch of fired and resolved alerts"""
+        self._listeners.append(listener)
+
+    def active(self):
+        """Alerts currently firing, newest first"""
+        with self._lock:
+            firing = [alert for alerts in self._firing.values() for alert in alerts.values()]
+        return sorted(firing, key=lambda alert: alert.timestamp, reverse=True)
+
+    def recent_alerts(self):
+        """The latest state changes, newest first"""
+        with self._lock:
+            recent = list(self.recent)
+        return recent[::-1]
+
+    def observe(self, source, key, ts, values):
+        """Evaluate the rules on one new sample (values: any {column: value} mapping)"""
+        series = (source, key)
+        plan = self._plans.get(series)
+        if plan is None:
+            plan = self._plan(series)
+        if not plan:
+            return
+        alerts = []
+        with self._lock:
+            last = self._last.setdefault(series, {})
+            for column, groups in plan:
+                value = values.get(column)
+                previous = last.get(column)
+                last[column] = value
+                if value == previous:
+                    continue
+                # A missing value (None or NaN) holds no rule
+                value_ok = value is not None and value == value
+                previous_ok = previous is not None and previous == previous
+                for group in groups:
+                    find, sign, thresholds = group.find, group.sign, group.thresholds
+                    was = find(thresholds, sign * previous) if previous_ok else 0
+                    now = find(thresholds, sign * value) if value_ok else 0
+                    if now > was:
+                        for rule in group.rules[was:now]:
+                            self._started(series, rule, value, ts, alerts)
+                    elif now < was:
+                        for rule in group.rules[now:was]:
+                            self._stopped(series, rule, value, ts, alerts)
+
+            pending = self._pending.get(series)
+            if pending:
+                for rule, since in list(pending.items()):
+                    if ts - since >= rule.duration:
+                        del pending[rule]
+                        self._fire(series, rule, values.get(rule.column), ts, alerts)
+            if alerts:
+                self.recent.extend(alerts)
+                self.version += 1
+        if alerts:
+            self._dispatch(alerts)
+
+    def _plan(self, series):
+        """Rule groups by column for one series: its own rules plus rules on every key of its source"""
+        source, key = series
+        indexes = [self._index.get(series, {})]
+        if key is not None:
+            indexes.append(self._index.get((source, ANY_KEY), {}))
+        columns = {}
+        for index in indexes:
+            for column, groups in index.items():
+                columns.setdefault(column, []).extend(groups.values())
+        plan = self._plans[series] = tuple((column, tuple(groups)) for column, groups in columns.items())
+        return plan
+
+    def _started(self, series, rule, value, ts, alerts):
+        if rule.duration:
+            self._pending.setdefault(series, {})[rule] = ts
+        else:
+            self._fire(series, rule, value, ts, alerts)
+
+    def _stopped(self, series, rule, value, ts, alerts):
+        if self._pending.get(series, {}).pop(rule, None) is not None:
+            return
+        if self._firing.get(series, {}).pop(rule, None) is not None:
+            alerts.append(Alert(rule, series[1], RESOLVED, value, ts))
+
+    def _fire(self, series, rule, value, ts, alerts):
+        alert = Alert(rule, series[1], FIRING, value, ts)
+        self._firing.setdefault(series, {})[rule] = alert
+        alerts.append(alert)
+
+    def _dispatch(self, alerts):
+        for state, count in Counter(alert.state for alert in alerts).items():
+            FIRED.inc(count, state=state)
+        if self.sink is not None:
+            try:
+                self.sink.write(alerts)
+            except OSError as e:
+                print(f"Alert log write failed: {e}")
+        for listener in self._listeners:
+            try:
+                listener(alerts)
+            except Exception as e:
+                print(f"Alert listener failed: {e}")
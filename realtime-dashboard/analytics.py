@@ -0,0 +1,144 @@
+import threading
+import warnings
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from timeseries import TimeSeriesStore
+
+# Per-tick statistics kept for each symbol
+ANALYTICS_COLUMNS = ('sma', 'ema', 'vwap', 'volatility', 'low', 'high')
+
+class RollingStats:
+    """Rolling statistics for one price series, updated from new ticks only
+
+    Only the last window-1 prices, volumes and returns plus the previous EMA
+    are kept between updates, so a batch of k ticks costs O(k * window)
+    NumPy work however long the history is. All outputs are per tick:
+    simple and exponential moving averages, VWAP, volatility (standard
+    deviation of log returns, in percent) and the rolling low/high.
+    """
+
+    def __init__(self, window, ema_span):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self.alpha = 2 / (ema_span + 1)
+        self._prices = np.empty(0)
+        self._volumes = np.empty(0)
+        self._returns = np.empty(0)
+        self._ema = None
+
+    def extend(self, prices, volumes):
+        """Add new ticks and return {column: array} with one value per tick"""
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.nan_to_num(np.asarray(volumes, dtype=np.float64))
+        if not len(prices):
+            return {name: np.empty(0) for name in ANALYTICS_COLUMNS}
+
+        previous = self._prices[-1:] if len(self._prices) else np.array([np.nan])
+        returns = np.diff(np.log(np.concatenate([previous, prices])))
+
+        price_windows = self._windows(self._prices, prices, self.window)
+        volume_windows = self._windows(self._volumes, volumes, self.window)
+        # A window of n prices holds n-1 returns
+        return_windows = self._windows(self._returns, returns, self.window - 1)
+
+        with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+            # Windows are NaN-padded until the series has `window` ticks
+            warnings.simplefilter('ignore', RuntimeWarning)
+            volume = np.nansum(volume_windows, axis=1)
+            stats = {
+                'sma': np.nanmean(price_windows, axis=1),
+                'ema': self._extend_ema(prices),
+                'vwap': np.where(volume > 0, np.nansum(price_windows * volume_windows, axis=1) / volume, np.nan),
+                'volatility': np.nanstd(return_windows, axis=1, ddof=1) * 100,
+                'low': np.nanmin(price_windows, axis=1),
+                'high': np.nanmax(price_windows, axis=1)
+            }
+
+        keep = self.window - 1
+        self._prices = np.concatenate([self._prices, prices])[-keep:]
+        self._volumes = np.concatenate([self._volumes, volumes])[-keep:]
+        self._returns = np.concatenate([self._returns, returns])[-(keep - 1):] if keep > 1 else np.empty(0)
+        return stats
+
+    @staticmethod
+    def _windows(kept, new, size):
+        """One row per new value: that value and the size-1 values before it"""
+        if size < 1:
+            return np.full((len(new), 1), np.nan)
+        kept = kept[max(0, len(kept) - (size - 1)):]
+        padding = np.full(size - 1 - len(kept), np.nan)
+        values = np.concatenate([padding, kept, new])
+        return sliding_window_view(values, size)
+
+    def _extend_ema(self, prices):
+        # ema[i] = decay^(i+1) * ema[-1] + alpha * sum(decay^(i-j) * price[j] for j <= i),
+        # evaluated with cumsum in chunks short enough that decay^-n can't overflow
+        decay = 1 - self.alpha
+        chunk_size = max(1, int(30 / -np.log(decay))) if decay > 0 else 1
+        out = np.empty(len(prices))
+        for start in range(0, len(prices), chunk_size):
+            chunk = prices[start:start + chunk_size]
+            if self._ema is None:
+                self._ema = chunk[0]
+            powers = decay ** np.arange(1, len(chunk) + 1)
+            out[start:start + len(chunk)] = powers * self._ema + self.alpha * powers * np.cumsum(chunk / powers)
+            self._ema = out[start + len(chunk) - 1]
+        return out
+
+class StockAnalytics:
+    """Rolling analytics per symbol, derived from the stock price history
+
+    catch_up() feeds every price row added to the history since the last
+    call through each symbol's RollingStats, and keeps the results in their
+    own ring buffers with the same timestamps as the prices, so chart
+    overlays can be streamed with the same cursors.
+    """
+
+    def __init__(self, history, window, ema_span, correlation_window, capacity):
+        self.history = history
+        self.window = window
+        self.ema_span = ema_span
+        self.correlation_window = correlation_window
+        self.series = TimeSeriesStore({'stocks': ANALYTICS_COLUMNS}, {'stocks': capacity})
+        self._stats = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    def catch_up(self):
+        """Compute statistics for price rows that arrived since the last call"""
+        with self._lock:
+            for symbol in self.history.keys('stocks'):
+                timestamps, columns = self.history.buffer('stocks', symbol).since(self._cursors.get(symbol, -1))
+                if not len(timestamps):
+                    continue
+                stats = self._stats.get(symbol)
+                if stats is None:
+                    stats = self._stats[symbol] = RollingStats(self.window, self.ema_span)
+                self.series.extend('stocks', symbol, timestamps, stats.extend(columns['price'], columns['volume']))
+                self._cursors[symbol] = int(timestamps[-1])
+
+    def latest(self, symbol):
+        """Get {column: value} of the newest statistics for symbol, or None"""
+        buffer = self.series.buffer('stocks', symbol)
+        latest = buffer.latest() if buffer is not None else None
+        return latest[1] if latest else None
+
+    def correlation(self, symbols):
+        """Correlation matrix of log returns over the last correlation_window ticks
+
+        Rows are aligned from the newest tick back, since every fetch appends
+        one row per symbol. Symbols without enough history get NaN.
+        """
+        n = self.correlation_window + 1
+        windows = [self.history.window('stocks', symbol, n) for symbol in symbols]
+        length = min((len(window[0]) for window in windows if window is not None), default=0)
+        matrix = np.full((len(symbols), len(symbols)), np.nan)
+        if length < 3:
+            return matrix
+
+        present = [i for i, window in enumerate(windows) if window is not None]
+        prices = np.array([windows[i][1]['price'][-length:] for i in present])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix[np.ix_(present, present)] = np.corrcoef(np.diff(np.log(prices), axis=1))
+        return matrix
@@ -1,20 +1,144 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, Patch, no_update
 import plotly.graph_objs as go
-import plotly.express as px
-import pandas as pd
 from datetime import datetime, timedelta
-import threading
+import sys
 import time
+import numpy as np
+import flask
+import psutil
 import config
+import metrics
 from data_sources import DataManager
+from http_client import get_cache
+from stream import StreamHub
+from system_metrics import SystemSampler
+from shared_state import SharedState
+from scheduler import Scheduler
+from render_cache import RenderCache, RenderedPanel
+from records import format_time
+from downsample import SeriesDownsampler
+from alerts import AlertLog
 
 # Initialize Dash application
 app = dash.Dash(__name__, external_stylesheets=['https://fonts.googleapis.com/css2?family=Fira+Code:wght@300;400;500;700&display=swap'])
 app.title = "Real-Time Data Visualization Dashboard"
+# WSGI entry point for multi-worker servers
+server = app.server
 
-# Initialize data manager
+# Line colors for stock traces
+STOCK_COLORS = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4', '#ec4899', '#64748b']
+
+# Startup milestones in seconds since the process started: ready (app imported, about to
+# listen), first_data (first source published) and first_byte (first response sent)
+PROCESS_START = psutil.Process().create_time()
+startup_times = {}
+
+def mark_startup(phase):
+    """Record and report a startup milestone the first time it is reached"""
+    if phase not in startup_times:
+        startup_times[phase] = time.time() - PROCESS_START
+        print(f"⚡ {phase.replace('_', ' ').upper()} AFTER {startup_times[phase]:.2f}s")
+
+def sync_worker():
+    """Whether this process is a gunicorn sync worker, which serves one request at a time
+
+    Each open /stream would hold such a worker until gunicorn's --timeout
+    kills it, so a few tabs would starve the whole deployment.
+    """
+    return 'gunicorn.workers.sync' in sys.modules
+
+# Server push needs a server that keeps serving while streams are open (threads or gevent)
+PUSH_UPDATES = config.PUSH_UPDATES and not sync_worker()
+if config.PUSH_UPDATES and not PUSH_UPDATES:
+    print("⚠ gunicorn sync workers can't hold server-push streams, polling instead "
+          "(run with -k gthread --threads N or -k gevent for push updates)")
+
+# Initialize data manager, restoring history saved by the previous run
 data_manager = DataManager()
+data_manager.warm_start()
+# A stale marker is not data
+data_manager.subscribe(lambda snapshot, source: source in snapshot.stale or mark_startup('first_data'))
+START_TIME = time.time()
+
+# Sample system metrics in the background so callbacks never block on psutil
+system_sampler = SystemSampler()
+# System samples are checked against alert rules like source records
+system_sampler.subscribe(lambda sample: data_manager.alerts.observe('system', None, sample.timestamp, sample))
+
+# Downsampled views of price history and of each analytics overlay, for the stock chart
+stock_views = {'price': SeriesDownsampler(data_manager.history, 'stocks', 'price', config.STOCK_CHART_DOWNSAMPLE)}
+stock_views.update({
+    overlay: SeriesDownsampler(data_manager.analytics.series, 'stocks', overlay, config.STOCK_CHART_DOWNSAMPLE)
+    for overlay in config.ANALYTICS_OVERLAYS
+})
+
+# Dash styles for analytics overlays, cycled like STOCK_COLORS
+OVERLAY_DASHES = ['dot', 'dash', 'dashdot', 'longdash']
+
+def overlay_trace_index(symbol_index, overlay_index):
+    """Trace index of an analytics overlay; overlays follow the price traces"""
+    return len(config.STOCK_SYMBOLS) + symbol_index * len(config.ANALYTICS_OVERLAYS) + overlay_index
+
+def build_stock_figure():
+    """Build the stock chart with one empty trace per symbol; points arrive as a downsampled view, then extendData"""
+    fig = go.Figure()
+    
+    for index, symbol in enumerate(config.STOCK_SYMBOLS):
+        fig.add_trace(go.Scattergl(
+            x=[],
+            y=[],
+            mode='lines',
+            name=symbol,
+            legendgroup=symbol,
+            line={'color': STOCK_COLORS[index % len(STOCK_COLORS)], 'width': 2}
+        ))
+    
+    for index, symbol in enumerate(config.STOCK_SYMBOLS):
+        for overlay_index, overlay in enumerate(config.ANALYTICS_OVERLAYS):
+            fig.add_trace(go.Scattergl(
+                x=[],
+                y=[],
+                mode='lines',
+                name=f"{symbol} {overlay.upper()}",
+                legendgroup=symbol,
+                visible='legendonly',
+                line={
+                    'color': STOCK_COLORS[index % len(STOCK_COLORS)],
+                    'width': 1,
+                    'dash': OVERLAY_DASHES[overlay_index % len(OVERLAY_DASHES)]
+                }
+            ))
+    
+    fig.update_layout(
+        title={
+            'text': "📈 LIVE STOCK PRICES",
+            'x': 0.5,
+            'font': {'color': '#1e293b', 'size': 18}
+        },
+        xaxis={
+            'title': "TIME",
+            'type': 'date',
+            'color': '#64748b',
+            'gridcolor': 'rgba(100,116,139,0.2)'
+        },
+        yaxis={
+            # Log scale keeps $150 and $3000 symbols readable on one axis
+            'title': "PRICE (USD)",
+            'type': 'log',
+            'color': '#64748b',
+            'gridcolor': 'rgba(100,116,139,0.2)'
+        },
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'family': 'Inter, sans-serif', 'color': '#64748b'},
+        legend={'orientation': 'h', 'y': -0.2},
+        # Keep zoom and legend selections while points stream in
+        uirevision='stocks',
+        margin=dict(t=60, b=40, l=40, r=40)
+    )
+    
+    return fig
 
 # Define application layout
 app.layout = html.Div([
@@ -33,25 +157,37 @@ app.layout = html.Div([
         html.Div([
             html.H3("🌤️ WEATHER MONITOR", className="card-title"),
             html.Div(id="weather-display")
-        ], className="data-card", style={'width': '48%', 'display': 'inline-block'}),
+        ], className="data-card", style={'width': '48%', 'display': 'inline-block'} if data_manager.crypto_enabled else {}),
         
+        # Hidden rather than left out, so the panel callback keeps its output
         html.Div([
             html.H3("₿ CRYPTO TRACKER", className="card-title"),
             html.Div(id="crypto-display")
-        ], className="data-card", style={'width': '48%', 'display': 'inline-block', 'float': 'right'})
+        ], className="data-card", style={'width': '48%', 'display': 'inline-block' if data_manager.crypto_enabled else 'none',
+                                         'float': 'right'})
     ]),
     
     # Second row: Stock chart
     html.Div([
         html.H3("📈 STOCK MARKET LIVE", className="card-title"),
-        dcc.Graph(id="stock-chart")
+        dcc.Graph(id="stock-chart", figure=build_stock_figure()),
+        html.Div(id="stock-analytics")
     ], className="chart-container"),
     
     # Third row: News and System information
     html.Div([
         html.Div([
             html.H3("📰 NEWS FEED", className="card-title"),
-            html.Div(id="news-display")
+            html.Div(id="news-display"),
+            dcc.Input(id="news-filter", type="search", placeholder="FILTER HEADLINES...", className="news-filter"),
+            html.Div(id="news-feed-status", className="update-time"),
+            # Only the rows around the visible ones are rendered; assets/news_feed.js reports
+            # which to fetch as the list scrolls (see update_news_feed)
+            html.Div(html.Div(id="news-rows"), id="news-viewport", className="news-viewport",
+                     style={'height': f"{config.NEWS_VISIBLE_ROWS * config.NEWS_ROW_HEIGHT}px"}, **{
+                         'data-row-height': config.NEWS_ROW_HEIGHT,
+                         'data-overscan': config.NEWS_OVERSCAN
+                     })
         ], className="data-card", style={'width': '48%', 'display': 'inline-block'}),
         
         html.Div([
@@ -60,251 +196,693 @@ app.layout = html.Div([
         ], className="data-card", style={'width': '48%', 'display': 'inline-block', 'float': 'right'})
     ]),
     
-    # Auto-refresh component
+    # Fourth row: Alerts
+    html.Div([
+        html.H3("🔔 ALERTS", className="card-title"),
+        html.Div(id="alerts-display")
+    ], className="data-card"),
+    
+    # Auto-refresh component (renders once on load; polls only when server push is off)
     dcc.Interval(
         id='interval-component',
         interval=config.UPDATE_INTERVAL * 1000,  # Convert to milliseconds
-        n_intervals=0
+        n_intervals=0,
+        disabled=PUSH_UPDATES
     ),
     
-    # Time update component
+    # Time update component (ticks in the browser, see the clientside callback)
     dcc.Interval(
         id='time-interval',
         interval=1000,  # Update every second
         n_intervals=0
-    )
+    ),
+    
+    # Snapshot versions this tab last rendered, per source
+    dcc.Store(id='panel-versions', data={}),
+    
+    # Stock chart plot width and visible range (see the clientside callback); a new
+    # value redraws the chart from a downsampled view of that range
+    dcc.Store(id='stock-viewport'),
+    # Bumped by assets/stream.js once enough live points were pushed to redraw the chart
+    dcc.Store(id='stock-refresh', data=0),
+    
+    # First news feed row to fetch, set by assets/news_feed.js while scrolling
+    dcc.Store(id='news-window', data={'offset': 0}),
+    
+    # Tells assets/stream.js where to subscribe for server-push updates (empty = off)
+    html.Div(id="push-updates", hidden=True, **{
+        'data-url': config.STREAM_ROUTE if PUSH_UPDATES else '',
+        'data-refresh-points': config.STOCK_CHART_MAX_POINTS
+    })
 ], className="main-container")
 
-# Callback function: Update current time
-@app.callback(
+# Clientside callback: Update current time without a server round trip
+app.clientside_callback(
+    """
+    function(n) {
+        var now = new Date();
+        var pad = function(v) { return String(v).padStart(2, '0'); };
+        return now.getFullYear() + '-' + pad(now.getMonth() + 1) + '-' + pad(now.getDate()) + ' ' +
+            pad(now.getHours()) + ':' + pad(now.getMinutes()) + ':' + pad(now.getSeconds());
+    }
+    """,
     Output('current-time', 'children'),
     Input('time-interval', 'n_intervals')
 )
-def update_time(n):
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-# Callback function: Update weather display
-@app.callback(
-    Output('weather-display', 'children'),
-    Input('interval-component', 'n_intervals')
+# Clientside callback: Report the stock chart's plot width (rounded up to 100 px, so small
+# resizes reuse a rendered view) and visible x range in epoch ms (null while autoscaled)
+app.clientside_callback(
+    """
+    function(relayout, refresh) {
+        var triggered = window.dash_clientside.callback_context.triggered.map(function(t) { return t.prop_id; });
+        if (relayout && triggered.indexOf('stock-chart.relayoutData') >= 0 && !Object.keys(relayout).some(
+                function(key) { return key.indexOf('xaxis') === 0 || key === 'autosize'; })) {
+            return window.dash_clientside.no_update;
+        }
+        var graph = document.getElementById('stock-chart');
+        var plot = graph && graph.querySelector('.js-plotly-plot');
+        var layout = plot && plot._fullLayout;
+        var width = layout ? layout._size.w : (graph ? graph.offsetWidth : 1000);
+        // Sent as the axis has it: the browser's time zone may not be the server's (see axis_time_ms)
+        var range = layout && !layout.xaxis.autorange ? layout.xaxis.range.slice() : null;
+        return {width: Math.max(100, Math.ceil(width / 100) * 100), range: range, refresh: refresh || 0};
+    }
+    """,
+    Output('stock-viewport', 'data'),
+    Input('stock-chart', 'relayoutData'),
+    Input('stock-refresh', 'data')
 )
-def update_weather(n):
-    latest_data = data_manager.get_latest_data()
-    weather = latest_data.get('weather')
-    
+
+def iso_times(timestamps):
+    """Server local-time ISO strings of epoch-ms timestamps, for date axes
+
+    Date axes carry no time zone, so the browser shows these as they are
+    and axis_time_ms() converts them back.
+    """
+    if not len(timestamps):
+        return []
+    offset = datetime.fromtimestamp(timestamps[0] / 1000).astimezone().utcoffset()
+    if offset != datetime.fromtimestamp(timestamps[-1] / 1000).astimezone().utcoffset():
+        # The range crosses a DST change: convert one by one
+        return [datetime.fromtimestamp(ts / 1000).isoformat() for ts in timestamps.tolist()]
+    local = np.asarray(timestamps, dtype=np.int64) + int(offset.total_seconds() * 1000)
+    return np.datetime_as_string(local.astype('datetime64[ms]')).tolist()
+
+def axis_time_ms(value):
+    """Epoch ms of a date axis value written by iso_times
+
+    Plotly reports axis ranges as strings such as '2024-01-01 12:00:00.5',
+    or as ms that read those strings as UTC; either way the wall time is the
+    server's local time.
+    """
+    if isinstance(value, str):
+        local = datetime.fromisoformat(value.strip())
+    else:
+        local = datetime(1970, 1, 1) + timedelta(milliseconds=value)
+    return int(local.timestamp() * 1000)
+
+def viewport_range(viewport):
+    """(t0, t1) in epoch ms of the visible x range, or (None, None) when autoscaled"""
+    visible = viewport.get('range')
+    if not visible:
+        return None, None
+    return axis_time_ms(visible[0]), axis_time_ms(visible[1])
+
+def render_weather(weather):
+    """Render weather panel: one row per city"""
     if not weather:
         return html.Div("LOADING WEATHER DATA...", className="loading")
     
+    rows = [
+        html.Tr([
+            html.Td(record.city),
+            html.Td(f"{record.temperature:.1f}°C", className="data-value"),
+            html.Td(f"{record.humidity:.0f}%"),
+            html.Td(f"{record.pressure:.0f} hPa"),
+            html.Td(record.description)
+        ]) for record in weather.values()
+    ]
+    last_update = max(record.timestamp for record in weather.values())
+    
     return html.Div([
-        html.Div([
-            html.Span("CITY:", className="data-label"),
-            html.Span(weather['city'], className="data-value")
-        ], className="data-item"),
-        html.Div([
-            html.Span("TEMP:", className="data-label"),
-            html.Span(f"{weather['temperature']:.1f}°C", className="data-value")
-        ], className="data-item"),
-        html.Div([
-            html.Span("HUMIDITY:", className="data-label"),
-            html.Span(f"{weather['humidity']}%", className="data-value")
-        ], className="data-item"),
-        html.Div([
-            html.Span("PRESSURE:", className="data-label"),
-            html.Span(f"{weather['pressure']} hPa", className="data-value")
-        ], className="data-item"),
-        html.Div([
-            html.Span("STATUS:", className="data-label"),
-            html.Span(weather['description'], className="data-value")
-        ], className="data-item"),
-        html.Div(f"LAST UPDATE: {weather['timestamp'].strftime('%H:%M:%S')}", className="update-time")
+        html.Table([
+            html.Thead(html.Tr([html.Th(label) for label in ("CITY", "TEMP", "HUMIDITY", "PRESSURE", "STATUS")])),
+            html.Tbody(rows)
+        ], className="weather-table"),
+        html.Div(f"LAST UPDATE: {format_time(last_update)}", className="update-time")
     ])
 
-# Callback function: Update cryptocurrency display
-@app.callback(
-    Output('crypto-display', 'children'),
-    Input('interval-component', 'n_intervals')
-)
-def update_crypto(n):
-    latest_data = data_manager.get_latest_data()
-    crypto = latest_data.get('crypto')
+def render_crypto_candles(asset):
+    """Render the newest OHLC bars of one asset as a small static candlestick chart"""
+    resolution = config.CRYPTO_CHART_RESOLUTION
+    buffer = data_manager.history.buffer(f"crypto_{resolution}", asset)
+    if buffer is None or not len(buffer):
+        return html.Div(f"WAITING FOR {resolution} BARS...", className="update-time")
     
+    timestamps, bars = buffer.window(config.CRYPTO_CHART_BARS)
+    fig = go.Figure(go.Candlestick(
+        x=iso_times(timestamps),
+        open=bars['open'].tolist(),
+        high=bars['high'].tolist(),
+        low=bars['low'].tolist(),
+        close=bars['close'].tolist(),
+        increasing={'line': {'color': '#10b981'}},
+        decreasing={'line': {'color': '#ef4444'}}
+    ))
+    fig.update_layout(
+        title={'text': f"{asset} {resolution}", 'x': 0.02, 'font': {'size': 12}},
+        height=180,
+        margin=dict(t=25, b=20, l=40, r=5),
+        xaxis={'rangeslider': {'visible': False}, 'gridcolor': 'rgba(100,116,139,0.2)'},
+        yaxis={'gridcolor': 'rgba(100,116,139,0.2)'},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'family': 'Inter, sans-serif', 'color': '#64748b'},
+        showlegend=False
+    )
+    return dcc.Graph(figure=fig, config={'displayModeBar': False, 'staticPlot': True}, style={'height': '180px'})
+
+def render_crypto(crypto):
+    """Render cryptocurrency panel: latest trade per asset and candles for the chart asset"""
     if not crypto:
         return html.Div("LOADING CRYPTO DATA...", className="loading")
     
-    change_class = "positive" if crypto['change_24h'] >= 0 else "negative"
-    change_symbol = "+" if crypto['change_24h'] >= 0 else ""
+    rows = []
+    for record in crypto.values():
+        if record.change_24h == record.change_24h:  # NaN when the feed has no 24h open
+            change_class = "positive" if record.change_24h >= 0 else "negative"
+            change = html.Td(f"{record.change_24h:+.2f}%", className=f"data-value {change_class}")
+        else:
+            change = html.Td("-")
+        rows.append(html.Tr([
+            html.Td(record.asset),
+            html.Td(f"${record.price:,.2f}" if record.price >= 1 else f"${record.price:.4f}", className="data-value"),
+            change,
+            html.Td(f"{record.volume_24h:,.0f}" if record.volume_24h == record.volume_24h else "-")
+        ]))
+    last_update = max(record.timestamp for record in crypto.values())
+    
+    return html.Div([
+        html.Table([
+            html.Thead(html.Tr([html.Th(label) for label in ("ASSET", "PRICE", "24H CHANGE", "24H VOLUME")])),
+            html.Tbody(rows)
+        ], className="crypto-table"),
+        render_crypto_candles(config.CRYPTO_CHART_ASSET or config.CRYPTO_ASSETS[0]),
+        html.Div(f"LAST UPDATE: {format_time(last_update)}", className="update-time")
+    ])
+
+def render_stock_points(cursors):
+    """Build stock chart extendData for prices (and overlays) newer than each symbol's cursor
+
+    cursors maps symbol to the newest timestamp (epoch ms) already sent.
+    Returns (extend_data or None, updated cursors).
+    """
+    # Live increments are a few points; a cursor far behind gets the newest ones only
+    max_points = config.STOCK_CHART_MAX_POINTS
+    xs, ys, trace_indices = [], [], []
+    cursors = dict(cursors)
+    
+    for index, symbol in enumerate(config.STOCK_SYMBOLS):
+        buffer = data_manager.history.buffer('stocks', symbol)
+        if buffer is None:
+            continue
+        timestamps, columns = buffer.since(cursors.get(symbol, 0))
+        prices = columns['price']
+        if config.ANALYTICS_OVERLAYS:
+            stats_buffer = data_manager.analytics.series.buffer('stocks', symbol)
+            stats = stats_buffer.since(cursors.get(symbol, 0))[1] if stats_buffer is not None else {}
+            # Statistics rows share the price timestamps; prices without them yet wait for the next call
+            count = len(stats.get('sma', ()))
+            timestamps, prices = timestamps[:count], prices[:count]
+        if not len(timestamps):
+            continue
+        
+        timestamps = timestamps[-max_points:]
+        x = iso_times(timestamps)
+        xs.append(x)
+        ys.append(prices[-max_points:].tolist())
+        trace_indices.append(index)
+        for overlay_index, overlay in enumerate(config.ANALYTICS_OVERLAYS):
+            xs.append(x)
+            ys.append(stats[overlay][:count][-max_points:].tolist())
+            trace_indices.append(overlay_trace_index(index, overlay_index))
+        cursors[symbol] = int(timestamps[-1])
+    
+    if not trace_indices:
+        return None, cursors
+    # No maxPoints: trimming would cut the downsampled history off the chart
+    return [{'x': xs, 'y': ys}, trace_indices], cursors
+
+def stock_cursors():
+    """Newest chart timestamp per symbol (rows with statistics when overlays are on)"""
+    store = data_manager.analytics.series if config.ANALYTICS_OVERLAYS else data_manager.history
+    cursors = {}
+    for symbol in config.STOCK_SYMBOLS:
+        buffer = store.buffer('stocks', symbol)
+        latest = buffer.latest() if buffer is not None else None
+        if latest is not None:
+            cursors[symbol] = latest[0]
+    return cursors
+
+def render_stock_view(viewport):
+    """Build a figure Patch replacing every stock trace with a downsampled view of the visible range
+
+    viewport holds the plot width in pixels and the visible x range as date
+    axis values (None when autoscaled). Returns (patch, cursors) with cursors as in
+    render_stock_points.
+    """
+    # Cursors first: rows added while the view renders are sent again rather than lost
+    cursors = stock_cursors()
+    width = viewport['width']
+    t0, t1 = viewport_range(viewport)
+    patch = Patch()
+    for index, symbol in enumerate(config.STOCK_SYMBOLS):
+        timestamps, prices = stock_views['price'].view(symbol, width, t0, t1)
+        patch['data'][index]['x'] = iso_times(timestamps)
+        patch['data'][index]['y'] = prices.tolist()
+        for overlay_index, overlay in enumerate(config.ANALYTICS_OVERLAYS):
+            timestamps, values = stock_views[overlay].view(symbol, width, t0, t1)
+            trace = patch['data'][overlay_trace_index(index, overlay_index)]
+            trace['x'] = iso_times(timestamps)
+            trace['y'] = values.tolist()
+    return patch, cursors
+
+def render_stock_analytics(stocks):
+    """Render rolling statistics per symbol with its most correlated peer"""
+    if not stocks:
+        return html.Div("LOADING STOCK DATA...", className="loading")
+    
+    analytics = data_manager.analytics
+    symbols = list(stocks)
+    correlation = analytics.correlation(symbols)
+    
+    rows = []
+    for i, symbol in enumerate(symbols):
+        stats = analytics.latest(symbol)
+        if stats is None:
+            continue
+        peers = [(correlation[i, j], symbols[j]) for j in range(len(symbols))
+                 if j != i and correlation[i, j] == correlation[i, j]]  # skip NaN
+        best = max(peers) if peers else None
+        rows.append(html.Tr([
+            html.Td(symbol),
+            html.Td(f"${stats['sma']:,.2f}", className="data-value"),
+            html.Td(f"${stats['ema']:,.2f}"),
+            html.Td(f"${stats['vwap']:,.2f}" if stats['vwap'] == stats['vwap'] else "-"),
+            html.Td(f"{stats['volatility']:.3f}%" if stats['volatility'] == stats['volatility'] else "-"),
+            html.Td(f"${stats['low']:,.2f} - ${stats['high']:,.2f}"),
+            html.Td(f"{best[1]} {best[0]:+.2f}" if best else "-")
+        ]))
+    
+    return html.Table([
+        html.Thead(html.Tr([html.Th(label) for label in (
+            "SYMBOL", f"SMA{config.ANALYTICS_WINDOW}", f"EMA{config.ANALYTICS_EMA_SPAN}", "VWAP",
+            "VOLATILITY", "RANGE", "TOP CORRELATION")])),
+        html.Tbody(rows)
+    ], className="analytics-table")
+
+def render_news(news):
+    """Render news panel summary; the headlines themselves are in the feed below it"""
+    if not news:
+        return html.Div("LOADING NEWS DATA...", className="loading")
     
     return html.Div([
         html.Div([
-            html.Span("BTC PRICE:", className="data-label"),
-            html.Span(f"${crypto['bitcoin_price']:,.2f}", className="data-value")
+            html.Span("HEADLINES STORED:", className="data-label"),
+            html.Span(str(len(data_manager.news_store)), className="data-value")
         ], className="data-item"),
         html.Div([
-            html.Span("24H CHANGE:", className="data-label"),
-            html.Span(f"{change_symbol}{crypto['change_24h']:.2f}%", className=f"data-value {change_class}")
+            html.Span("LAST SCRAPE:", className="data-label"),
+            html.Span(str(news.news_count), className="data-value")
         ], className="data-item"),
-        html.Div(f"LAST UPDATE: {crypto['timestamp'].strftime('%H:%M:%S')}", className="update-time")
+        html.Div(f"LAST UPDATE: {format_time(news.timestamp)}", className="update-time")
     ])
 
-# Callback function: Update stock chart
-@app.callback(
-    Output('stock-chart', 'figure'),
-    Input('interval-component', 'n_intervals')
-)
-def update_stock_chart(n):
-    latest_data = data_manager.get_latest_data()
-    stocks = latest_data.get('stocks', [])
-    
-    if not stocks:
-        # Return empty chart
-        fig = go.Figure()
-        fig.update_layout(
-            title="LOADING STOCK DATA...",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font_color='#64748b'
-        )
-        return fig
-    
-            # Create stock price bar chart
-    symbols = [stock['symbol'] for stock in stocks]
-    prices = [stock['price'] for stock in stocks]
-    changes = [stock['change_percent'] for stock in stocks]
-    
-            # Set colors based on price changes
-    colors = ['#10b981' if change >= 0 else '#ef4444' for change in changes]
+def render_news_feed(query, offset):
+    """Render the news feed rows from offset that match query, newest first
+
+    Returns [rows, rows style, status]. The rows container is as tall as
+    every match and padded down to the first rendered row, so the
+    scrollbar covers the whole list while only a window of it exists.
+    """
+    store = data_manager.news_store
+    limit = config.NEWS_VISIBLE_ROWS + 3 * config.NEWS_OVERSCAN
+    total, headlines = store.query(query, offset, limit)
+    if offset and not headlines:
+        # The list got shorter (new filter) than where the tab was scrolled to
+        offset = max(0, total - limit) // config.NEWS_OVERSCAN * config.NEWS_OVERSCAN
+        total, headlines = store.query(query, offset, limit)
     
+    rows = [
+        html.Div([
+            html.Span(format_time(headline.first_seen, '%H:%M'), className="news-time"),
+            headline.title
+        ], key=str(headline.id), title=headline.title, className="news-row")
+        for headline in headlines
+    ]
+    style = {
+        'height': f"{total * config.NEWS_ROW_HEIGHT}px",
+        'paddingTop': f"{offset * config.NEWS_ROW_HEIGHT}px",
+        'boxSizing': 'border-box'
+    }
+    status = f"{total} OF {len(store)} HEADLINES MATCH" if query.strip() else f"{total} HEADLINES"
+    return [rows, style, status]
+
+def render_system_sparkline(samples):
+    """Render CPU and memory history as a small static chart"""
     fig = go.Figure()
-    
-            # Add price bar chart
-    fig.add_trace(go.Bar(
-        x=symbols,
-        y=prices,
-        marker_color=colors,
-        name="STOCK PRICE",
-        text=[f"${price:.2f}<br>{change:+.2f}%" for price, change in zip(prices, changes)],
-        textposition="outside"
+    fig.add_trace(go.Scatter(
+        y=[sample.cpu_percent for sample in samples],
+        mode='lines', name="CPU", line={'color': '#3b82f6', 'width': 1.5}
+    ))
+    fig.add_trace(go.Scatter(
+        y=[sample.memory_percent for sample in samples],
+        mode='lines', name="MEMORY", line={'color': '#10b981', 'width': 1.5}
     ))
-    
     fig.update_layout(
-        title={
-            'text': "📈 LIVE STOCK PRICES",
-            'x': 0.5,
-            'font': {'color': '#1e293b', 'size': 18}
-        },
-        xaxis={
-            'title': "SYMBOL",
-            'color': '#64748b',
-            'gridcolor': 'rgba(100,116,139,0.2)'
-        },
-        yaxis={
-            'title': "PRICE (USD)",
-            'color': '#64748b',
-            'gridcolor': 'rgba(100,116,139,0.2)'
-        },
+        height=80,
+        margin=dict(t=5, b=5, l=5, r=5),
+        xaxis={'visible': False},
+        yaxis={'visible': False, 'range': [0, 100]},
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
-        font={'family': 'Inter, sans-serif', 'color': '#64748b'},
-        showlegend=False,
-        margin=dict(t=60, b=40, l=40, r=40)
+        showlegend=False
     )
-    
-    return fig
+    return dcc.Graph(figure=fig, config={'displayModeBar': False, 'staticPlot': True}, style={'height': '80px'})
 
-# Callback function: Update news display
-@app.callback(
-    Output('news-display', 'children'),
-    Input('interval-component', 'n_intervals')
-)
-def update_news(n):
-    latest_data = data_manager.get_latest_data()
-    news = latest_data.get('news')
+def render_system_status():
+    """Render system status panel from the latest sampler reading"""
+    sample = system_sampler.latest()
     
-    if not news:
-        return html.Div("LOADING NEWS DATA...", className="loading")
+    if not sample:
+        return html.Div("LOADING SYSTEM DATA...", className="loading")
+    
+    return html.Div([
+        html.Div([
+            html.Span("OS:", className="data-label"),
+            html.Span(system_sampler.os_name, className="data-value")
+        ], className="data-item"),
+        html.Div([
+            html.Span("CPU USAGE:", className="data-label"),
+            html.Span(f"{sample.cpu_percent}%", className="data-value")
+        ], className="data-item"),
+        html.Div([
+            html.Span("MEMORY:", className="data-label"),
+            html.Span(f"{sample.memory_percent}%", className="data-value")
+        ], className="data-item"),
+        html.Div([
+            html.Span("DISK:", className="data-label"),
+            html.Span(f"{sample.disk_percent}%", className="data-value")
+        ], className="data-item"),
+        html.Div([
+            html.Span("PROCESS:", className="data-label"),
+            html.Span(f"{sample.process_rss / 1048576:.0f} MB / {sample.process_threads} threads",
+                      className="data-value")
+        ], className="data-item"),
+        html.Div([
+            html.Span("UPTIME:", className="data-label"),
+            html.Span(f"{int(time.time() - START_TIME)}s", className="data-value")
+        ], className="data-item"),
+        render_system_sparkline(system_sampler.history()),
+        html.Div(f"LAST UPDATE: {format_time(sample.timestamp)}", className="update-time")
+    ])
+
+def render_alerts():
+    """Render alerts panel: rule count, alerts firing now and the newest state changes"""
+    engine = data_manager.alerts
+    if not engine.rules:
+        return html.Div("NO ALERT RULES CONFIGURED (ALERT_RULES)", className="update-time")
     
-    news_items = []
-    for i, title in enumerate(news['latest_titles'][:5], 1):
-        news_items.append(
-            html.Div(f"{i}. {title[:60]}{'...' if len(title) > 60 else ''}", className="news-item")
-        )
+    rows = [
+        html.Tr([
+            html.Td(format_time(alert.timestamp)),
+            html.Td(alert.state.upper(), className=f"alert-{alert.state}"),
+            html.Td(alert.rule.text),
+            html.Td(alert.key or "-"),
+            html.Td("-" if alert.value is None else f"{alert.value:,.2f}")
+        ]) for alert in engine.recent_alerts()
+    ]
     
     return html.Div([
         html.Div([
-            html.Span("NEWS COUNT:", className="data-label"),
-            html.Span(str(news['news_count']), className="data-value")
+            html.Span("RULES:", className="data-label"),
+            html.Span(str(len(engine.rules)), className="data-value")
+        ], className="data-item"),
+        html.Div([
+            html.Span("FIRING:", className="data-label"),
+            html.Span(str(len(engine.active())), className="data-value")
         ], className="data-item"),
-        html.Div("LATEST HEADLINES:", style={'color': '#3b82f6', 'margin': '10px 0 5px 0', 'font-weight': '600'}),
-        html.Div(news_items),
-        html.Div(f"LAST UPDATE: {news['timestamp'].strftime('%H:%M:%S')}", className="update-time")
+        html.Table([
+            html.Thead(html.Tr([html.Th(label) for label in ("TIME", "STATE", "RULE", "KEY", "VALUE")])),
+            html.Tbody(rows)
+        ], className="alerts-table") if rows else html.Div("NO ALERTS YET", className="update-time")
     ])
 
-# Callback function: Update system status
+# Output each source renders into: source -> (output id, property, renderer)
+SOURCE_PANELS = {
+    'weather': ('weather-display', 'children', lambda snapshot: render_weather(snapshot.weather)),
+    'stocks': ('stock-analytics', 'children', lambda snapshot: render_stock_analytics(snapshot.stocks)),
+    'crypto': ('crypto-display', 'children', lambda snapshot: render_crypto(snapshot.crypto)),
+    'news': ('news-display', 'children', lambda snapshot: render_news(snapshot.news))
+}
+
+# Rendered output shared by every tab and the stream hub
+render_cache = RenderCache(config.RENDER_CACHE_SIZE)
+
+RENDER_SECONDS = metrics.histogram('dashboard_render_seconds', "Time to render a panel (cache misses only)", ('panel',))
+
+def timed_render(panel, render):
+    def run():
+        with RENDER_SECONDS.time(panel=panel):
+            return render()
+    return run
+
+def render_source_panel(source, snapshot):
+    """Render a source's panel, flagged while it shows the last good data of a failing upstream"""
+    _, _, render = SOURCE_PANELS[source]
+    panel = render(snapshot)
+    since = snapshot.stale.get(source)
+    if since is None:
+        return panel
+    return html.Div([
+        html.Div(f"⚠ UPSTREAM UNAVAILABLE SINCE {format_time(since)}, SHOWING LAST GOOD DATA", className="stale-notice"),
+        panel
+    ])
+
+def rendered_panel(source, snapshot):
+    """Get a source's panel for snapshot, rendering it only once per version"""
+    return render_cache.panel(source, snapshot.versions[source],
+                              timed_render(source, lambda: render_source_panel(source, snapshot)))
+
+def rendered_system_status():
+    return render_cache.panel('system', system_sampler.version, timed_render('system', render_system_status))
+
+def rendered_alerts():
+    return render_cache.panel('alerts', data_manager.alerts.version, timed_render('alerts', render_alerts))
+
+def rendered_news_feed(query, offset):
+    """render_news_feed, shared by tabs showing the same rows of the same filter"""
+    key = ('news-feed', data_manager.news_store.version, query, offset)
+    return render_cache.get(key, timed_render('news-feed', lambda: RenderedPanel(render_news_feed(query, offset))))
+
+def rendered_stock_points(version, cursors):
+    """render_stock_points, shared by tabs that are at the same point of the chart"""
+    key = ('stocks', version, tuple(sorted(cursors.items())))
+    return render_cache.get(key, timed_render('stock-chart', lambda: render_stock_points(cursors)))
+
+def rendered_stock_view(version, viewport):
+    """render_stock_view, shared by tabs showing the same range at the same width"""
+    key = ('stock-view', version, viewport['width'], tuple(viewport.get('range') or ()))
+    return render_cache.get(key, timed_render('stock-view', lambda: render_stock_view(viewport)))
+
+def stock_chart_live(viewport, cursors):
+    """Whether the visible range reaches the newest points, so appending them shows"""
+    _, t1 = viewport_range(viewport)
+    return t1 is None or not cursors or t1 >= max(cursors.values())
+
+# Callback function: Update every panel in one round trip, skipping panels the tab already shows
 @app.callback(
-    Output('system-display', 'children'),
-    Input('interval-component', 'n_intervals')
+    [Output(output_id, prop) for output_id, prop, _ in SOURCE_PANELS.values()] + [
+        Output('stock-chart', 'figure'),
+        Output('stock-chart', 'extendData'),
+        Output('system-display', 'children'),
+        Output('alerts-display', 'children'),
+        Output('panel-versions', 'data')
+    ],
+    Input('interval-component', 'n_intervals'),
+    Input('stock-viewport', 'data'),
+    State('panel-versions', 'data')
 )
-def update_system_status(n):
-    import psutil
-    import platform
-    
-    try:
-        # Get system information
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        return html.Div([
-            html.Div([
-                html.Span("OS:", className="data-label"),
-                html.Span(platform.system(), className="data-value")
-            ], className="data-item"),
-            html.Div([
-                html.Span("CPU USAGE:", className="data-label"),
-                html.Span(f"{cpu_percent}%", className="data-value")
-            ], className="data-item"),
-            html.Div([
-                html.Span("MEMORY:", className="data-label"),
-                html.Span(f"{memory.percent}%", className="data-value")
-            ], className="data-item"),
-            html.Div([
-                html.Span("DISK:", className="data-label"),
-                html.Span(f"{disk.percent}%", className="data-value")
-            ], className="data-item"),
-            html.Div([
-                html.Span("UPTIME:", className="data-label"),
-                html.Span(f"{n * config.UPDATE_INTERVAL}s", className="data-value")
-            ], className="data-item"),
-            html.Div(f"LAST UPDATE: {datetime.now().strftime('%H:%M:%S')}", className="update-time")
-        ])
-    except Exception as e:
-        return html.Div([
-            html.Div("SYSTEM INFO ERROR", style={'color': '#ef4444'}),
-            html.Div(f"ERROR: {str(e)}", className="system-info")
-        ])
+def update_panels(n, viewport, sent_versions):
+    snapshot = data_manager.get_latest_data()
+    sent_versions = sent_versions or {}
+    
+    outputs = []
+    for source in SOURCE_PANELS:
+        # -1 forces the first render, which shows the loading placeholders
+        if snapshot.versions[source] > sent_versions.get(source, -1):
+            outputs.append(rendered_panel(source, snapshot).value)
+        else:
+            outputs.append(no_update)
+    
+    versions = dict(snapshot.versions)
+    
+    # The stock chart is redrawn from a downsampled view when the viewport changes or enough
+    # live points were appended; in between it only receives points newer than the last ones
+    # this tab got, and none while it shows an older range
+    versions['stocks_ts'] = sent_versions.get('stocks_ts', {})
+    versions['stock_view'] = sent_versions.get('stock_view')
+    versions['stock_appended'] = sent_versions.get('stock_appended', 0)
+    figure = extend_data = no_update
+    if viewport is None:
+        pass  # the viewport arrives once the chart is drawn
+    elif viewport != versions['stock_view'] or versions['stock_appended'] >= config.STOCK_CHART_MAX_POINTS:
+        figure, versions['stocks_ts'] = rendered_stock_view(snapshot.versions['stocks'], viewport)
+        versions['stock_view'], versions['stock_appended'] = viewport, 0
+    elif (not PUSH_UPDATES and snapshot.versions['stocks'] > sent_versions.get('stocks', -1)
+          and stock_chart_live(viewport, versions['stocks_ts'])):
+        # With server push the stream appends live points instead
+        points, versions['stocks_ts'] = rendered_stock_points(snapshot.versions['stocks'], versions['stocks_ts'])
+        if points:
+            extend_data = points
+            versions['stock_appended'] += max(len(x) for x in points[0]['x'])
+    outputs.extend([figure, extend_data])
+    
+    versions['system'] = system_sampler.version
+    outputs.append(rendered_system_status().value if versions['system'] > sent_versions.get('system', -1) else no_update)
+    versions['alerts'] = data_manager.alerts.version
+    outputs.append(rendered_alerts().value if versions['alerts'] > sent_versions.get('alerts', -1) else no_update)
+    outputs.append(versions)
+    return outputs
+
+# Callback function: Fetch the visible window of the news feed; reruns when the filter
+# changes, the list scrolls to another window or the news panel shows new headlines
+@app.callback(
+    Output('news-rows', 'children'),
+    Output('news-rows', 'style'),
+    Output('news-feed-status', 'children'),
+    Input('news-filter', 'value'),
+    Input('news-window', 'data'),
+    Input('news-display', 'children')
+)
+def update_news_feed(query, window, _):
+    # A new filter starts from the top (assets/news_feed.js scrolls back up)
+    offset = 0 if dash.callback_context.triggered_id == 'news-filter' else (window or {}).get('offset', 0)
+    return rendered_news_feed(query or '', offset).value
+
+# Server push: the updater renders each changed panel once for every open tab
+stream_hub = StreamHub()
+
+# Newest stock timestamp per symbol already pushed to stream clients; tabs draw
+# restored history from a downsampled view, so pushing starts after it
+stream_stock_cursor = stock_cursors()
+
+def push_snapshot(snapshot, source):
+    """Render the panel of the source that changed and push it to stream clients"""
+    global stream_stock_cursor
+    if source == 'stocks':
+        extend_data, stream_stock_cursor = render_stock_points(stream_stock_cursor)
+        if extend_data:
+            stream_hub.publish_increment('stock-chart', 'extendData', extend_data)
+    
+    output_id, prop, _ = SOURCE_PANELS[source]
+    stream_hub.publish_serialized({output_id: (prop, rendered_panel(source, snapshot).json)})
+
+def push_system_status(sample):
+    """Push the system panel after every sampler reading"""
+    stream_hub.publish_serialized({'system-display': ('children', rendered_system_status().json)})
+
+def push_alerts(alerts):
+    """Push the alerts panel whenever alerts fire or resolve"""
+    stream_hub.publish_serialized({'alerts-display': ('children', rendered_alerts().json)})
+
+# Instrumentation: callback timings, cache counters and the /metrics route
+CALLBACK_SECONDS = metrics.histogram('dashboard_callback_seconds', "Dash callback request time", ('callback',))
+
+@app.server.before_request
+def start_callback_timer():
+    flask.g.request_start = time.perf_counter()
+
+@app.server.after_request
+def observe_callback_time(response):
+    mark_startup('first_byte')
+    if flask.request.path.endswith('/_dash-update-component'):
+        body = flask.request.get_json(silent=True) or {}
+        # Name callbacks by their first output id
+        callback_name = body.get('output', 'unknown').strip('.').split('...')[0].rsplit('.', 1)[0]
+        CALLBACK_SECONDS.observe(time.perf_counter() - flask.g.get('request_start', time.perf_counter()),
+                                 callback=callback_name)
+    return response
+
+def http_cache_counts():
+    cache = get_cache()
+    return {'hit': cache.hits, 'revalidated': cache.revalidated, 'miss': cache.misses}
+
+metrics.gauge('dashboard_http_cache_lookups_total', "HTTP cache lookups by result",
+              http_cache_counts, ('result',), kind='counter')
+metrics.gauge('dashboard_http_cache_hit_ratio', "Share of HTTP cache lookups served without a new body",
+              lambda: get_cache().hit_ratio)
+metrics.gauge('dashboard_render_cache_lookups_total', "Render cache lookups by result",
+              lambda: {'hit': render_cache.hits, 'miss': render_cache.misses}, ('result',), kind='counter')
+metrics.gauge('dashboard_render_cache_hit_ratio', "Share of renders served from the render cache",
+              lambda: render_cache.hit_ratio)
+metrics.gauge('dashboard_history_bytes', "Memory held by history ring buffers", lambda: data_manager.history.nbytes)
+metrics.gauge('dashboard_snapshot_version', "Version of the latest data snapshot",
+              lambda: data_manager.get_latest_data().version)
+metrics.gauge('dashboard_alerts_firing', "Alerts currently firing", lambda: len(data_manager.alerts.active()))
+metrics.gauge('dashboard_startup_seconds', "Seconds from process start to each startup milestone",
+              lambda: dict(startup_times), ('phase',))
+app.server.add_url_rule(config.METRICS_ROUTE, 'metrics', metrics.REGISTRY.response)
+
+if config.PROFILER_ENABLED:
+    profiler = metrics.SamplingProfiler(config.PROFILER_INTERVAL)
+    app.server.add_url_rule(config.PROFILER_ROUTE, 'profile', profiler.response)
+
+if PUSH_UPDATES:
+    data_manager.subscribe(push_snapshot)
+    system_sampler.subscribe(push_system_status)
+    data_manager.alerts.subscribe(push_alerts)
+    app.server.add_url_rule(config.STREAM_ROUTE, 'stream', stream_hub.response)
 
 # Background data update thread
-def background_data_update():
-    """Background data update"""
-    while True:
-        try:
-            data_manager.update_all_data()
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] DATA UPDATE COMPLETE")
-        except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] DATA UPDATE FAILED: {e}")
-        time.sleep(config.UPDATE_INTERVAL)
-
-        # Start background data update thread
-data_thread = threading.Thread(target=background_data_update, daemon=True)
-data_thread.start()
-
-# Initialize data
-data_manager.update_all_data()
+def flush_updates():
+    """Write new history to disk, then hand the snapshot to reader processes"""
+    # History is on disk before readers see the snapshot that refers to it
+    if data_manager.flush_history() and shared_state is not None:
+        shared_state.write(data_manager.get_latest_data())
+
+def start_data_updates():
+    """Start polling upstream from this process, each source on its own schedule"""
+    # Only the producer logs alerts, so workers mirroring it don't repeat them
+    if config.ALERT_LOG:
+        data_manager.alerts.sink = AlertLog(config.ALERT_LOG)
+    for name in data_manager.jobs:
+        scheduler.add(name, lambda name=name: data_manager.update_source(name),
+                      lambda name=name: data_manager.source_interval(name))
+    scheduler.add('flush', flush_updates, config.HISTORY_FLUSH_INTERVAL, delay=config.HISTORY_FLUSH_INTERVAL)
+    scheduler.start()
+
+scheduler = Scheduler(jitter=config.SCHEDULE_JITTER, max_backoff=config.SCHEDULE_MAX_BACKOFF)
+
+# Only one process (the producer) polls upstream; other workers mirror its shared state
+shared_state = SharedState(config.SHARED_STATE_DIR, config.SHARED_STATE_SIZE) if config.SHARED_STATE else None
+if shared_state is None or shared_state.try_become_producer():
+    if not config.FAST_START:
+        # Serve nothing until every source has been fetched once
+        data_manager.update_all_data()
+    # The scheduler fetches every source right away, in the background
+    start_data_updates()
+else:
+    data_manager.follow(shared_state, on_promote=start_data_updates)
+
+system_sampler.start()
+mark_startup('ready')
 
 if __name__ == '__main__':
     print("🚀 LAUNCHING REAL-TIME DASHBOARD...")
     print(f"📊 ACCESS URL: http://{config.APP_HOST}:{config.APP_PORT}")
-    print(f"🔄 UPDATE INTERVAL: {config.UPDATE_INTERVAL}s")
+    print(f"🔄 UPDATE INTERVALS: {', '.join(f'{name}={interval}s' for name, interval in config.SOURCE_INTERVALS.items())}")
     print("🎯 Press Ctrl+C to EXIT")
     
     app.run_server(
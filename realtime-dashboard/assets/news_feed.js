@@ -0,0 +1,44 @@
+/* Virtualized news feed: tell the server which window of rows the list is scrolled to */
+(function () {
+    // Offset last reported; the server renders rows from it (see update_news_feed in app.py)
+    var reported = 0;
+    var pending = false;
+
+    function report(viewport) {
+        var rowHeight = parseInt(viewport.getAttribute('data-row-height'), 10);
+        var overscan = parseInt(viewport.getAttribute('data-overscan'), 10);
+        var first = Math.floor(viewport.scrollTop / rowHeight);
+        // Step in whole overscan blocks, keeping one block above the first visible row, so
+        // rows change only every `overscan` rows scrolled and the edges are already drawn
+        var offset = Math.max(0, (Math.floor(first / overscan) - 1) * overscan);
+        if (offset !== reported && window.dash_clientside && window.dash_clientside.set_props) {
+            reported = offset;
+            window.dash_clientside.set_props('news-window', {data: {offset: offset}});
+        }
+    }
+
+    // Scroll events don't bubble, so listen in the capture phase; the viewport may mount later
+    document.addEventListener('scroll', function (event) {
+        var viewport = event.target;
+        if (viewport.id !== 'news-viewport' || pending) {
+            return;
+        }
+        pending = true;
+        window.requestAnimationFrame(function () {
+            pending = false;
+            report(viewport);
+        });
+    }, true);
+
+    // A new filter shows its matches from the top
+    document.addEventListener('input', function (event) {
+        if (event.target.id !== 'news-filter') {
+            return;
+        }
+        var viewport = document.getElementById('news-viewport');
+        if (viewport) {
+            viewport.scrollTop = 0;
+            report(viewport);
+        }
+    }, true);
+})();
@@ -0,0 +1,39 @@
+/* Server-push updates: apply changed panels from the SSE stream */
+(function () {
+    function connect(url, refreshPoints) {
+        var source = new EventSource(url);
+        // Points appended to the stock chart since it was last drawn from a downsampled view
+        var appended = 0;
+        source.onmessage = function (event) {
+            var panels = JSON.parse(event.data);
+            Object.keys(panels).forEach(function (id) {
+                var props = {};
+                props[panels[id].prop] = panels[id].value;
+                window.dash_clientside.set_props(id, props);
+                if (id === 'stock-chart' && panels[id].prop === 'extendData') {
+                    appended += Math.max.apply(null, panels[id].value[0].x.map(function (x) { return x.length; }));
+                    if (refreshPoints && appended >= refreshPoints) {
+                        appended = 0;
+                        window.dash_clientside.set_props('stock-refresh', {data: Date.now()});
+                    }
+                }
+            });
+        };
+        // EventSource reconnects on its own after errors
+    }
+
+    function start() {
+        var marker = document.getElementById('push-updates');
+        if (!marker || !window.dash_clientside || !window.dash_clientside.set_props) {
+            // Wait for the Dash renderer to mount the layout
+            setTimeout(start, 200);
+            return;
+        }
+        var url = marker.getAttribute('data-url');
+        if (url && window.EventSource) {
+            connect(url, parseInt(marker.getAttribute('data-refresh-points'), 10));
+        }
+    }
+
+    start();
+})();
@@ -0,0 +1,103 @@
+"""
+Alert engine benchmark
+Evaluates random threshold rules over random-walk stock samples with the
+incremental AlertEngine and with a naive loop over every rule of the series,
+checking both fire the same alerts
+
+Usage: python benchmarks/bench_alerts.py [--rules 100,1000,10000] [--symbols 500] [--samples 50000]
+"""
+
+import argparse
+import operator
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import AlertEngine, compile_rule, subject_index
+from records import StockRecord
+
+FIELDS = {'stocks': ('price', 'change', 'change_percent', 'volume')}
+COMPARE = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+def make_rules(count, symbols, rng):
+    rules = []
+    for _ in range(count):
+        subject = 'stocks:*' if rng.random() < 0.01 else rng.choice(symbols)
+        op = rng.choice(list(COMPARE))
+        if rng.random() < 0.5:
+            rules.append(f"{subject} change_percent {op} {rng.uniform(-5, 5):.2f}")
+        else:
+            rules.append(f"{subject} price {op} {rng.uniform(80, 120):.2f}")
+    return rules
+
+def make_samples(count, symbols, rng):
+    prices = {symbol: 100.0 for symbol in symbols}
+    samples = []
+    for ts in range(count):
+        symbol = rng.choice(symbols)
+        prices[symbol] = max(1.0, prices[symbol] * (1 + rng.gauss(0, 0.001)))
+        change_percent = (prices[symbol] - 100) / 100 * 100
+        samples.append(StockRecord(symbol, prices[symbol], prices[symbol] - 100, change_percent, 1000.0, ts))
+    return samples
+
+def run_engine(rules, symbols, samples):
+    engine = AlertEngine(rules, FIELDS, {'stocks': symbols})
+    fired = []
+    engine.subscribe(fired.extend)
+    start = time.perf_counter()
+    for record in samples:
+        engine.observe('stocks', record.symbol, record.timestamp, record)
+    elapsed = time.perf_counter() - start
+    return elapsed, {(alert.rule.id, alert.key, alert.state, alert.timestamp) for alert in fired}
+
+def run_naive(rules, symbols, samples):
+    """Every rule of the sample's symbol is checked against every sample"""
+    subjects = subject_index({'stocks': symbols})
+    compiled = [compile_rule(i, text, FIELDS, subjects) for i, text in enumerate(rules)]
+    by_key = {}
+    for rule in compiled:
+        for key in (symbols if rule.key == '*' else [rule.key]):
+            by_key.setdefault(key, []).append(rule)
+    holding = set()
+    fired = set()
+    start = time.perf_counter()
+    for record in samples:
+        for rule in by_key.get(record.symbol, ()):
+            now = COMPARE[rule.op](record.get(rule.column), rule.threshold)
+            state = (rule.id, record.symbol)
+            if now and state not in holding:
+                holding.add(state)
+                fired.add((rule.id, record.symbol, 'firing', record.timestamp))
+            elif not now and state in holding:
+                holding.discard(state)
+                fired.add((rule.id, record.symbol, 'resolved', record.timestamp))
+    return time.perf_counter() - start, fired
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rules', default='100,1000,10000', help="comma separated rule counts")
+    parser.add_argument('--symbols', type=int, default=500, help="symbols the rules and samples spread over")
+    parser.add_argument('--samples', type=int, default=50000, help="samples evaluated per rule count")
+    args = parser.parse_args()
+    rng = random.Random(42)
+    symbols = [f"S{i}" for i in range(args.symbols)]
+    samples = make_samples(args.samples, symbols, rng)
+
+    print(f"{'RULES':>8} {'ENGINE US/SAMPLE':>17} {'NAIVE US/SAMPLE':>16} {'SPEEDUP':>8} {'ALERTS':>8} {'SAME':>5}")
+    same_everywhere = True
+    for count in (int(value) for value in args.rules.split(',')):
+        rules = make_rules(count, symbols, rng)
+        engine_time, engine_alerts = run_engine(rules, symbols, samples)
+        naive_time, naive_alerts = run_naive(rules, symbols, samples)
+        same = engine_alerts == naive_alerts
+        same_everywhere = same_everywhere and same
+        print(f"{count:>8} {engine_time / len(samples) * 1e6:>17.2f} {naive_time / len(samples) * 1e6:>16.2f} "
+              f"{naive_time / engine_time:>7.1f}x {len(engine_alerts):>8} {'yes' if same else 'NO':>5}")
+    if not same_everywhere:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Crypto feed benchmark
+Streams replayed ticks through CryptoFeed (WebSocket framing, JSON parsing,
+OHLC aggregation and bar storage) and checks it keeps up with a target rate
+
+Usage: python benchmarks/bench_crypto.py [--ticks 200000] [--rate 5000] [--seconds 10]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from crypto_feed import CryptoFeed
+from crypto_replay import DEFAULT_TICKS, ReplayServer
+from records import now_ms
+from timeseries import TimeSeriesStore
+
+def make_feed(url):
+    """CryptoFeed that stores closed bars like DataManager does; returns (feed, bar store)"""
+    schemas = {f"crypto_{name}": ('open', 'high', 'low', 'close', 'volume') for name in config.CRYPTO_RESOLUTIONS}
+    store = TimeSeriesStore(schemas, {source: 3600 for source in schemas})
+    feed = CryptoFeed(url, config.CRYPTO_ASSETS, config.CRYPTO_RESOLUTIONS,
+                      on_bar=lambda resolution, asset, bar: store.append(f"crypto_{resolution}", asset, bar.timestamp, bar))
+    return feed, store
+
+def bar_count(store):
+    return sum(len(store.buffer(source, key)) for source in store.schemas for key in store.keys(source))
+
+def bench_throughput(path, ticks):
+    """Unthrottled replay: how many ticks per second the feed can ingest"""
+    with ReplayServer(path, speed=0, loop=True, limit=ticks) as server:
+        feed, store = make_feed(server.url)
+        start = time.perf_counter()
+        feed.start()
+        while feed.ticks < ticks and time.perf_counter() - start < 120:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        feed.stop()
+    print(f"{'unthrottled ticks':<28} {feed.ticks:>12}")
+    print(f"{'ingest rate (ticks/s)':<28} {feed.ticks / elapsed:>12.0f}")
+    print(f"{'per tick (us)':<28} {elapsed / max(feed.ticks, 1) * 1e6:>12.1f}")
+    print(f"{'bars closed':<28} {bar_count(store):>12}")
+
+def bench_paced(path, rate, seconds):
+    """Replay at `rate` ticks/s and sample how far the newest processed tick lags behind"""
+    with ReplayServer(path, loop=True) as server:
+        server.speed = rate / server.rate
+        feed, _ = make_feed(server.url)
+        feed.start()
+        lags = []
+        start = time.perf_counter()
+        # (ticks, time) at the first tick, so connecting doesn't count against the rate
+        first = None
+        while time.perf_counter() - start < seconds:
+            time.sleep(0.05)
+            latest = feed.latest()
+            if not latest:
+                continue
+            if first is None:
+                first = (feed.ticks, time.perf_counter())
+            lags.append(now_ms() - max(ts for ts, _, _, _ in latest.values()))
+        achieved = (feed.ticks - first[0]) / (time.perf_counter() - first[1]) if first else 0.0
+        feed.stop()
+
+    lags.sort()
+    print(f"{'target rate (ticks/s)':<28} {rate:>12.0f}")
+    print(f"{'achieved rate (ticks/s)':<28} {achieved:>12.0f}")
+    if lags:
+        print(f"{'lag p50 / p95 / max (ms)':<28} {statistics.median(lags):>4.0f} / {lags[int(len(lags) * 0.95)]:.0f} / {lags[-1]:.0f}")
+    kept_up = achieved >= 0.95 * rate and lags and lags[int(len(lags) * 0.95)] < 100
+    print(f"{'keeps up':<28} {'yes' if kept_up else 'NO':>12}")
+    return kept_up
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--path', default=DEFAULT_TICKS, help="tick file to replay (JSON lines)")
+    parser.add_argument('--ticks', type=int, default=200000, help="ticks for the unthrottled run")
+    parser.add_argument('--rate', type=float, default=5000, help="ticks per second for the paced run")
+    parser.add_argument('--seconds', type=float, default=10, help="length of the paced run")
+    args = parser.parse_args()
+
+    bench_throughput(args.path, args.ticks)
+    print()
+    if not bench_paced(args.path, args.rate, args.seconds):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+HTML extraction benchmark
+Compares full-DOM BeautifulSoup parsing with the streaming extractor on saved HTML fixtures
+
+Usage: python benchmarks/bench_html.py [--iterations 200]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+import config
+from html_extract import ExtractionRule, extract_items
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def soup_extract(content, rule):
+    """Old approach: build the whole DOM, then select"""
+    soup = BeautifulSoup(content, 'html.parser')
+    titles = []
+    for container in soup.find_all(rule.container_tag, class_=rule.container_class):
+        item = container.find(rule.item_tag)
+        if item is not None and item.get_text().strip():
+            titles.append(item.get_text().strip())
+        if len(titles) >= rule.limit:
+            break
+    return titles
+
+def timed(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+    return (time.perf_counter() - start) / iterations, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    rule = ExtractionRule.from_config(config.SCRAPE_RULES['news'])
+    print(f"{'FIXTURE':<24} {'BYTES':>8} {'SOUP':>10} {'STREAMING':>10} {'SPEEDUP':>8}")
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        soup_time, soup_titles = timed(lambda: soup_extract(content, rule), args.iterations)
+        stream_time, stream_titles = timed(lambda: extract_items(content, rule), args.iterations)
+        if soup_titles != stream_titles:
+            print(f"  results differ for {os.path.basename(path)}: {soup_titles} != {stream_titles}")
+
+        print(f"{os.path.basename(path):<24} {len(content):>8} {soup_time * 1000:>8.2f}ms "
+              f"{stream_time * 1000:>8.2f}ms {soup_time / stream_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
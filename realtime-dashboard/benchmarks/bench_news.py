@@ -0,0 +1,96 @@
+"""
+News store benchmark
+Feeds synthetic scrape cycles (mostly repeated headlines) through NewsStore and
+reports deduplication, memory held at capacity and feed query latency
+
+Usage: python benchmarks/bench_news.py [--capacity 5000] [--cycles 2000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_store import NewsStore
+
+def make_words(count, rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(count)]
+
+def make_title(words, rng):
+    # A skewed pick, so some words are common and others rare, as in real headlines
+    return ' '.join(words[int(rng.paretovariate(1.2)) % len(words)] for _ in range(rng.randint(5, 12))).capitalize()
+
+def feed(store, words, cycles, per_cycle, rng):
+    """Scrape cycles of per_cycle titles, about a fifth of them new each cycle"""
+    front_page = [make_title(words, rng) for _ in range(per_cycle)]
+    ts = 0
+    seen = added = 0
+    for _ in range(cycles):
+        for i in rng.sample(range(per_cycle), per_cycle // 5):
+            front_page[i] = make_title(words, rng)
+        ts += 120000
+        added += store.add(front_page, ts)
+        seen += per_cycle
+    return seen, added
+
+def timed_queries(store, texts):
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        store.query(text, 0, 30)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--capacity', type=int, default=5000, help="headlines kept")
+    parser.add_argument('--cycles', type=int, default=2000, help="scrape cycles fed")
+    parser.add_argument('--per-cycle', type=int, default=30, help="titles per scrape cycle (all sites)")
+    parser.add_argument('--queries', type=int, default=2000, help="queries timed per kind")
+    args = parser.parse_args()
+    rng = random.Random(42)
+    words = make_words(5000, rng)
+
+    tracemalloc.start()
+    store = NewsStore(args.capacity)
+    # Memory is taken once the store is full and again at the end: it must not keep growing
+    seen, added = feed(store, words, args.capacity // (args.per_cycle // 5) + 1, args.per_cycle, rng)
+    full = tracemalloc.get_traced_memory()[0]
+    more_seen, more_added = feed(store, words, args.cycles, args.per_cycle, rng)
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    seen, added = seen + more_seen, added + more_added
+
+    print(f"{'titles scraped':<28} {seen:>12}")
+    print(f"{'unique headlines':<28} {added:>12}")
+    print(f"{'headlines kept':<28} {len(store):>12}")
+    print(f"{'memory when first full (KB)':<28} {full / 1024:>12.0f}")
+    print(f"{'memory at end (KB)':<28} {end / 1024:>12.0f}")
+    print()
+
+    common = words[:20]
+    kinds = {
+        'unfiltered page': ['' for _ in range(args.queries)],
+        'one word': [rng.choice(common) for _ in range(args.queries)],
+        'two words': [f"{rng.choice(common)} {rng.choice(common)} " for _ in range(args.queries)],
+        'prefix (typing)': [rng.choice(words)[:2] for _ in range(args.queries)],
+        'rare word': [rng.choice(words[1000:]) for _ in range(args.queries)]
+    }
+    print(f"{'QUERY':<28} {'P50 MS':>8} {'P95 MS':>8}")
+    worst = 0.0
+    for kind, texts in kinds.items():
+        p50, p95 = timed_queries(store, texts)
+        worst = max(worst, p50)
+        print(f"{kind:<28} {p50:>8.3f} {p95:>8.3f}")
+    if worst >= 1:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
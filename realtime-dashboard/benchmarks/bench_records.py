@@ -0,0 +1,92 @@
+"""
+Record memory and serialization benchmark
+Compares the old dict-with-datetime source records against the NamedTuple
+records in records.py: bytes per record, and snapshot JSON encode/decode time
+
+Usage: python benchmarks/bench_records.py [--records 100000] [--symbols 500]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import StockRecord, now_ms
+from snapshot import EMPTY_SNAPSHOT, snapshot_from_dict, snapshot_to_dict
+
+def dict_record(symbol):
+    """A stock record as the sources built it before records.py"""
+    return MappingProxyType({
+        'symbol': symbol,
+        'price': random.uniform(50, 500),
+        'change': random.uniform(-5, 5),
+        'change_percent': random.uniform(-3, 3),
+        'volume': random.randint(1000000, 10000000),
+        'timestamp': datetime.now()
+    })
+
+def tuple_record(symbol):
+    return StockRecord(symbol, random.uniform(50, 500), random.uniform(-5, 5), random.uniform(-3, 3),
+                       random.randint(1000000, 10000000), now_ms())
+
+def bytes_per_record(make, count):
+    """Traced allocation per record for a list of `count` records"""
+    symbols = [f"SYM{i:04d}" for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [make(symbol) for symbol in symbols]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return used / count
+
+def dict_snapshot_to_dict(stocks):
+    """snapshot_to_dict's record encoding before records.py"""
+    return {'stocks': [{name: value.isoformat() if isinstance(value, datetime) else value
+                        for name, value in record.items()} for record in stocks.values()]}
+
+def best_of(func, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000, help="records to allocate per type")
+    parser.add_argument('--symbols', type=int, default=500, help="stock symbols in the snapshot")
+    args = parser.parse_args()
+
+    old_bytes = bytes_per_record(dict_record, args.records)
+    new_bytes = bytes_per_record(tuple_record, args.records)
+    print(f"{'':<28} {'DICT':>10} {'RECORD':>10}")
+    print(f"{'bytes per stock record':<28} {old_bytes:>10.0f} {new_bytes:>10.0f}")
+
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    old_stocks = {symbol: dict_record(symbol) for symbol in symbols}
+    snapshot = EMPTY_SNAPSHOT.publish('stocks', MappingProxyType({symbol: tuple_record(symbol) for symbol in symbols}))
+
+    old_json = json.dumps(dict_snapshot_to_dict(old_stocks))
+    new_json = json.dumps(snapshot_to_dict(snapshot))
+    print(f"{'snapshot JSON bytes':<28} {len(old_json):>10} {len(new_json):>10}")
+    print(f"{'snapshot encode ms':<28} {best_of(lambda: json.dumps(dict_snapshot_to_dict(old_stocks))):>10.2f} "
+          f"{best_of(lambda: json.dumps(snapshot_to_dict(snapshot))):>10.2f}")
+
+    def old_decode():
+        for record in json.loads(old_json)['stocks']:
+            record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+            MappingProxyType(record)
+    print(f"{'snapshot decode ms':<28} {best_of(old_decode):>10.2f} "
+          f"{best_of(lambda: snapshot_from_dict(json.loads(new_json))):>10.2f}")
+
+if __name__ == '__main__':
+    main()
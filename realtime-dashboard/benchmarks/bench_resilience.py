@@ -0,0 +1,85 @@
+"""
+Upstream outage benchmark
+Time the stock source spends blocked on a hung upstream with and without its
+circuit breaker, what it shows meanwhile, and how fast it recovers
+
+Usage: python benchmarks/bench_resilience.py [--cycles 20] [--timeout 1] [--reset 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from fake_upstream import FakeUpstream
+
+def run_cycle(manager):
+    """One scheduled stocks fetch and publish; returns (seconds, outcome)"""
+    fetch, publish = manager.jobs['stocks']
+    start = time.perf_counter()
+    try:
+        data = fetch()
+        outcome = 'ok' if data is not None else 'fast-fail'
+    except Exception:
+        data, outcome = None, 'error'
+    if data is not None:
+        publish(data)
+    return time.perf_counter() - start, outcome
+
+def outage(upstream, threshold, args):
+    """Healthy cycle, `cycles` cycles against a hung upstream, then cycles until data flows again"""
+    from data_sources import DataManager
+    config.CIRCUIT_FAILURE_THRESHOLD = threshold
+    manager = DataManager()
+
+    upstream.server.latency = 0
+    run_cycle(manager)
+    good = manager.get_latest_data().stocks
+
+    upstream.server.latency = args.timeout * 3
+    blocked = 0.0
+    outcomes = {}
+    for _ in range(args.cycles):
+        seconds, outcome = run_cycle(manager)
+        blocked += seconds
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        time.sleep(args.interval)
+    snapshot = manager.get_latest_data()
+    kept = dict(snapshot.stocks) == dict(good) and 'stocks' in snapshot.stale
+
+    upstream.server.latency = 0
+    start = time.perf_counter()
+    while 'stocks' in manager.get_latest_data().stale and time.perf_counter() - start < 60:
+        run_cycle(manager)
+        time.sleep(args.interval)
+    recovered = time.perf_counter() - start
+    manager.engine.shutdown()
+    return blocked, outcomes, kept, recovered
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=20, help="fetch cycles during the outage")
+    parser.add_argument('--interval', type=float, default=0.25, help="seconds between cycles")
+    parser.add_argument('--timeout', type=float, default=1.0, help="upstream request timeout (seconds)")
+    parser.add_argument('--reset', type=float, default=2.0, help="seconds an open circuit waits before a probe")
+    args = parser.parse_args()
+
+    config.HISTORY_PERSIST = False
+    config.MOCK_DATA = False
+    config.SOURCE_TIMEOUTS['stocks'] = args.timeout
+    config.CIRCUIT_RESET_TIMEOUT = args.reset
+
+    with FakeUpstream(latency=0) as upstream:
+        config.STOCK_API_URL = f"{upstream.url}/v7/finance/spark"
+        print(f"{'BREAKER':<10} {'BLOCKED':>9} {'PER CYCLE':>10} {'OUTCOMES':<34} {'LAST GOOD KEPT':>14} {'RECOVERY':>9}")
+        for label, threshold in (('off', float('inf')), ('on', 3)):
+            blocked, outcomes, kept, recovered = outage(upstream, threshold, args)
+            summary = ' '.join(f"{name}={count}" for name, count in sorted(outcomes.items()))
+            print(f"{label:<10} {blocked:>8.2f}s {blocked / args.cycles * 1000:>8.0f}ms {summary:<34} "
+                  f"{'yes' if kept else 'NO':>14} {recovered:>8.2f}s")
+
+if __name__ == '__main__':
+    main()
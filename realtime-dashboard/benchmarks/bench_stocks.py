@@ -0,0 +1,64 @@
+"""
+Stock fetch benchmark
+Compares per-symbol serial requests with the batched StockData fetch against a local fake upstream
+
+Usage: python benchmarks/bench_stocks.py [--symbols 6,100,500] [--latency 0.05]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+import config
+from fake_upstream import FakeUpstream
+
+def per_symbol_fetch(url, symbols):
+    """Old access pattern: two fresh-connection requests per symbol, one after another"""
+    for symbol in symbols:
+        requests.get(url, params={'symbols': symbol, 'range': '5d', 'interval': '1d'}, timeout=10)
+        requests.get(url, params={'symbols': symbol, 'range': '1d', 'interval': '1m'}, timeout=10)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', default='6,100,500', help="comma separated symbol counts")
+    parser.add_argument('--latency', type=float, default=0.05, help="injected upstream latency (seconds)")
+    args = parser.parse_args()
+
+    with FakeUpstream(latency=args.latency) as upstream:
+        url = f"{upstream.url}/v7/finance/spark"
+        config.STOCK_API_URL = url
+        from data_sources import StockData
+
+        print(f"{'SYMBOLS':>8} {'PER-SYMBOL':>12} {'BATCHED':>10} {'WARM':>10} {'REQUESTS':>9}")
+        for count in [int(n) for n in args.symbols.split(',')]:
+            symbols = [f"SYM{i:04d}" for i in range(count)]
+
+            # The serial baseline grows linearly, so skip it for large symbol counts
+            if count <= 100:
+                start = time.perf_counter()
+                per_symbol_fetch(url, symbols)
+                per_symbol = f"{time.perf_counter() - start:.3f}s"
+            else:
+                per_symbol = "skipped"
+
+            config.STOCK_SYMBOLS = symbols
+            stocks = StockData()
+
+            # First cycle also fetches the daily previousClose batch
+            start = time.perf_counter()
+            stocks.get_stock_data()
+            batched = time.perf_counter() - start
+
+            before = upstream.request_count
+            start = time.perf_counter()
+            stocks.get_stock_data()
+            warm = time.perf_counter() - start
+
+            print(f"{count:>8} {per_symbol:>12} {batched:>9.3f}s {warm:>9.3f}s {upstream.request_count - before:>9}")
+
+if __name__ == '__main__':
+    main()
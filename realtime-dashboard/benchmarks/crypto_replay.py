@@ -0,0 +1,191 @@
+"""
+Local crypto tick replay server
+Plays recorded ticker messages (one JSON object per line) to WebSocket clients
+in the Coinbase Exchange feed format, at a configurable speed
+
+Usage: python benchmarks/crypto_replay.py serve [ticks.jsonl] [--port 8765] [--speed 1] [--loop]
+       python benchmarks/crypto_replay.py record --output ticks.jsonl [--seconds 60]
+
+Point the dashboard at it with CRYPTO_FEED_URL=ws://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from crypto_feed import parse_time_ms
+from ws_client import OP_CLOSE, OP_TEXT, WebSocket, accept_key, encode_frame, read_frame
+
+DEFAULT_TICKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'crypto_ticks.jsonl')
+
+def load_ticks(path):
+    """Read a tick file into [(seconds since the first tick, message)]"""
+    with open(path, encoding='utf-8') as f:
+        messages = [json.loads(line) for line in f if line.strip()]
+    messages = [message for message in messages if message.get('type') == 'ticker']
+    if not messages:
+        raise ValueError(f"{path} has no ticker messages")
+    first = parse_time_ms(messages[0]['time'])
+    return [((parse_time_ms(message['time']) - first) / 1000, message) for message in messages]
+
+class ReplayHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        headers = {}
+        self.rfile.readline()
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'sec-websocket-key' not in headers:
+            self.wfile.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return
+        self.wfile.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+        ).encode('ascii'))
+
+        # Wait for the subscribe message; no product_ids means every asset in the file
+        _, opcode, payload = read_frame(self.rfile)
+        if opcode != OP_TEXT:
+            return
+        products = set(json.loads(payload).get('product_ids') or ())
+        self.request.sendall(encode_frame(json.dumps({
+            'type': 'subscriptions',
+            'channels': [{'name': 'ticker', 'product_ids': sorted(products)}]
+        })))
+        try:
+            self.server.replay(self.request, products)
+            self.request.sendall(encode_frame(b'\x03\xe8', OP_CLOSE))
+        except OSError:
+            pass  # client went away
+
+class ReplayServer:
+    """Serve a tick file on a local port from a background thread
+
+    Each client gets the ticks from the start, paced by their recorded
+    spacing divided by speed (0 = as fast as the socket takes them). Tick
+    times are rewritten to the moment each tick is sent, so bars and
+    staleness checks behave as on a live feed. loop repeats the file; limit
+    stops each client after that many ticks.
+    """
+
+    def __init__(self, path=DEFAULT_TICKS, speed=1.0, loop=False, limit=None, host='127.0.0.1', port=0):
+        self.ticks = load_ticks(path)
+        self.speed = speed
+        self.loop = loop
+        self.limit = limit
+        self.server = socketserver.ThreadingTCPServer((host, port), ReplayHandler)
+        self.server.daemon_threads = True
+        self.server.replay = self.replay
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.sent = 0
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"ws://{host}:{port}"
+
+    @property
+    def duration(self):
+        """Seconds from the first to the last tick of the file, at speed 1"""
+        return self.ticks[-1][0]
+
+    @property
+    def rate(self):
+        """Ticks per second of the file, at speed 1"""
+        return len(self.ticks) / max(self.duration, 1e-3)
+
+    def replay(self, sock, products):
+        ticks = [(offset, message) for offset, message in self.ticks
+                 if not products or message['product_id'] in products]
+        # Keep the file's average spacing across the jump back to the start
+        cycle = self.duration + self.duration / max(len(self.ticks) - 1, 1)
+        start = time.perf_counter()
+        sent = 0
+        loops = 0
+        while ticks:
+            for offset, message in ticks:
+                if self.speed:
+                    delay = start + (loops * cycle + offset) / self.speed - time.perf_counter()
+                    # Sleeping is only worth it for gaps above the timer resolution
+                    if delay > 0.001:
+                        time.sleep(delay)
+                sent += 1
+                message = dict(message, sequence=sent,
+                               time=datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+                sock.sendall(encode_frame(json.dumps(message)))
+                self.sent += 1
+                if self.limit and sent >= self.limit:
+                    return
+            if not self.loop:
+                return
+            loops += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def record(url, assets, seconds, output):
+    """Save the feed's ticker messages for `seconds` to a tick file"""
+    ws = WebSocket(url)
+    ws.send(json.dumps({'type': 'subscribe', 'product_ids': assets, 'channels': ['ticker']}))
+    ws.settimeout(seconds)
+    end = time.monotonic() + seconds
+    count = 0
+    with open(output, 'w', encoding='utf-8') as f:
+        while time.monotonic() < end:
+            message = ws.recv()
+            if message is None:
+                break
+            if json.loads(message).get('type') == 'ticker':
+                f.write(message.strip() + '\n')
+                count += 1
+    ws.close()
+    print(f"Recorded {count} ticks to {output}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="replay a tick file")
+    serve.add_argument('path', nargs='?', default=DEFAULT_TICKS, help="tick file (JSON lines)")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--speed', type=float, default=1.0, help="playback speed multiplier (0 = unthrottled)")
+    serve.add_argument('--loop', action='store_true', help="repeat the file forever")
+    capture = commands.add_parser('record', help="save ticks from a live feed")
+    capture.add_argument('--url', default=config.CRYPTO_FEED_URL)
+    capture.add_argument('--assets', default=','.join(config.CRYPTO_ASSETS), help="comma separated product ids")
+    capture.add_argument('--seconds', type=float, default=60)
+    capture.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.url, args.assets.split(','), args.seconds, args.output)
+        return
+
+    with ReplayServer(args.path, args.speed, args.loop, host=args.host, port=args.port) as server:
+        print(f"Replaying {len(server.ticks)} ticks ({server.rate:.1f}/s recorded) at {server.url}, speed {args.speed}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == '__main__':
+    main()
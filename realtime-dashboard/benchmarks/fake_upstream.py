@@ -0,0 +1,104 @@
+"""
+Local fake upstream for benchmarks
+Serves Yahoo-style spark and quote responses over HTTP/1.1 keep-alive with injected latency
+Spark responses have the layout of fixtures/spark_1d_1m.json: closes only, with the
+day volume in the metadata
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(self.server.latency)
+        self.server.request_count += 1
+
+        if url.path.endswith('/spark'):
+            body = self.spark_body(query)
+        elif url.path.endswith('/quote'):
+            body = self.quote_body(query)
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def spark_body(self, query):
+        symbols = query.get('symbols', [''])[0].split(',')
+        daily = query.get('range', ['1d'])[0] != '1d'
+        now = int(time.time())
+        if daily:
+            timestamps = [now - 86400 * i for i in range(5, 0, -1)]
+        else:
+            timestamps = [now - 60 * i for i in range(self.server.bars, 0, -1)]
+
+        result = []
+        for symbol in symbols:
+            base = 100 + (hash(symbol) % 900)
+            result.append({
+                'symbol': symbol,
+                'response': [{
+                    'meta': {'symbol': symbol, 'gmtoffset': -14400, 'chartPreviousClose': base,
+                             'regularMarketVolume': self.day_volume(now)},
+                    'timestamp': timestamps,
+                    'indicators': {'quote': [{
+                        'close': [base + random.uniform(-5, 5) for _ in timestamps]
+                    }]}
+                }]
+            })
+        return {'spark': {'result': result, 'error': None}}
+
+    def quote_body(self, query):
+        symbols = query.get('symbols', [''])[0].split(',')
+        volume = self.day_volume(int(time.time()))
+        return {'quoteResponse': {'result': [{'symbol': symbol, 'regularMarketVolume': volume}
+                                             for symbol in symbols], 'error': None}}
+
+    @staticmethod
+    def day_volume(now):
+        """Cumulative volume that only grows during the day"""
+        return (now % 86400) * 1000 + random.randint(0, 999)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeUpstream:
+    """Run the fake upstream on a free local port in a background thread"""
+
+    def __init__(self, latency=0.05, bars=390):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeUpstreamHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.bars = bars
+        self.server.request_count = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self):
+        return self.server.request_count
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,263 @@
+"""
+Dashboard benchmark suite
+Measures update cycles, snapshot reads, panel renders and _dash-update-component
+requests against mock sources with injected latency
+
+Usage: python benchmarks/run_benchmarks.py [--clients 1,10,50] [--symbols 6,100,500]
+                                           [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep history and shared state out of the real data directory; removed when the run ends
+WORK_DIR = tempfile.mkdtemp(prefix='dashboard-bench-')
+os.environ.setdefault('HISTORY_DIR', os.path.join(WORK_DIR, 'history'))
+os.environ.setdefault('SHARED_STATE_DIR', os.path.join(WORK_DIR, 'shared'))
+os.environ.setdefault('HTTP_CACHE_DIR', os.path.join(WORK_DIR, 'http_cache'))
+
+import numpy as np
+import config
+import shared_state
+
+def mock_jobs(manager, latency, jitter=0.2):
+    """Replace a DataManager's fetchers with mock data delayed by about `latency` seconds"""
+    def delayed(fetch):
+        def run():
+            if latency:
+                time.sleep(latency * random.uniform(1 - jitter, 1 + jitter))
+            return fetch()
+        return run
+
+    fetches = {
+        'weather': lambda: [manager.weather.get_mock_weather_data(city) for city in manager.weather.locations],
+        'stocks': manager.stocks.get_mock_stock_data,
+        'news': manager.scraper.get_mock_news_data,
+        'crypto': manager.crypto.get_mock_crypto_data
+    }
+    manager.jobs = {name: (delayed(fetches[name]), publish) for name, (_, publish) in manager.jobs.items()}
+
+def use_symbols(manager, count):
+    symbols = [f"SYM{i:04d}" for i in range(count)]
+    config.STOCK_SYMBOLS = symbols
+    manager.stocks.symbols = symbols
+    return symbols
+
+def fill_history(manager, symbols, ticks):
+    """Preload `ticks` rows of price history per new symbol, one second apart"""
+    end = int(time.time() * 1000) - 1000
+    timestamps = end - 1000 * ticks + 1000 * np.arange(ticks, dtype=np.int64)
+    for symbol in symbols:
+        # Symbols kept from a smaller run already have newer rows; history must stay in order
+        if manager.history.buffer('stocks', symbol) is not None:
+            continue
+        prices = 100 * (1 + 0.001 * np.random.standard_normal(ticks).cumsum())
+        manager.history.extend('stocks', symbol, timestamps, {
+            'price': prices, 'change': prices * 0, 'change_percent': prices * 0,
+            'volume': prices * 0 + 1e6
+        })
+    manager.analytics.catch_up()
+
+def summarize(seconds):
+    """mean/p50/p95/max of a list of durations, in milliseconds"""
+    values = sorted(seconds)
+    return {
+        'mean_ms': statistics.mean(values) * 1000,
+        'p50_ms': values[len(values) // 2] * 1000,
+        'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+        'max_ms': values[-1] * 1000
+    }
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def bench_cycles(args, metrics):
+    """DataManager.update_all_data with every source sleeping `latency`"""
+    from data_sources import DataManager
+
+    for count in args.symbol_counts:
+        manager = DataManager()
+        manager.archive = None
+        use_symbols(manager, count)
+        mock_jobs(manager, args.latency)
+        manager.update_all_data()  # warm up pools
+        durations = timed(manager.update_all_data, args.cycles)
+        for name, value in summarize(durations).items():
+            metrics[f"cycle.m{count}.{name}"] = value
+
+        # Snapshot reads happen once per request, so they are timed in bulk
+        calls = 100000
+        start = time.perf_counter()
+        for _ in range(calls):
+            manager.get_latest_data()
+        metrics[f"get_latest_data.m{count}.ns"] = (time.perf_counter() - start) / calls * 1e9
+        manager.engine.shutdown()
+
+def callback_outputs(dash_app):
+    """(id, property) pairs of the panel update callback, parsed from Dash's callback map"""
+    key = next(key for key in dash_app.callback_map if 'panel-versions.data' in key)
+    return [tuple(output.rsplit('.', 1)) for output in key.strip('.').split('...')]
+
+# What a tab with a 1200 px wide, autoscaled stock chart reports
+VIEWPORT = {'width': 1200, 'range': None, 'refresh': 0}
+
+def request_body(outputs, versions):
+    return {
+        'output': '..' + '...'.join(f"{output_id}.{prop}" for output_id, prop in outputs) + '..',
+        'outputs': [{'id': output_id, 'property': prop} for output_id, prop in outputs],
+        'inputs': [
+            {'id': 'interval-component', 'property': 'n_intervals', 'value': 1},
+            {'id': 'stock-viewport', 'property': 'data', 'value': VIEWPORT}
+        ],
+        'changedPropIds': ['interval-component.n_intervals'],
+        'state': [{'id': 'panel-versions', 'property': 'data', 'value': versions}]
+    }
+
+def poll_round(outputs, clients):
+    """Every client polls once, concurrently; returns [(seconds, bytes)]"""
+    results = [None] * len(clients)
+    barrier = threading.Barrier(len(clients))
+
+    def poll(i):
+        client = clients[i]
+        barrier.wait()
+        start = time.perf_counter()
+        response = client['http'].post('/_dash-update-component', json=request_body(outputs, client['versions']))
+        elapsed = time.perf_counter() - start
+        if response.status_code == 200:
+            client['versions'] = response.get_json()['response']['panel-versions']['data']
+        results[i] = (elapsed, len(response.data))
+
+    threads = [threading.Thread(target=poll, args=(i,)) for i in range(len(clients))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def bench_app(args, metrics):
+    """Panel render times and _dash-update-component cost vs clients and symbols"""
+    # Hold the producer lock so the imported app serves like a web worker and never polls upstream
+    config.SHARED_STATE = True
+    producer = shared_state.SharedState(config.SHARED_STATE_DIR, config.SHARED_STATE_SIZE)
+    producer.try_become_producer()
+    if shared_state.fcntl is None:
+        print("warning: no producer lock on this platform, the app will also poll upstream")
+    # Measure the polling path; with push on, renders happen on publish instead
+    config.PUSH_UPDATES = False
+
+    import app as dashboard
+    manager = dashboard.data_manager
+    mock_jobs(manager, 0)
+    outputs = callback_outputs(dashboard.app)
+
+    for count in args.symbol_counts:
+        symbols = use_symbols(manager, count)
+        fill_history(manager, symbols, args.history)
+        manager.update_all_data()
+        snapshot = manager.get_latest_data()
+
+        # Uncached render cost of each panel
+        for source, (_, _, render) in dashboard.SOURCE_PANELS.items():
+            metrics[f"render.m{count}.{source}_ms"] = statistics.mean(timed(lambda: render(snapshot), args.repeat)) * 1000
+        metrics[f"render.m{count}.system_ms"] = statistics.mean(timed(dashboard.render_system_status, args.repeat)) * 1000
+        metrics[f"render.m{count}.alerts_ms"] = statistics.mean(timed(dashboard.render_alerts, args.repeat)) * 1000
+        metrics[f"render.m{count}.stock_points_full_ms"] = statistics.mean(
+            timed(lambda: dashboard.render_stock_points({}), args.repeat)) * 1000
+        metrics[f"render.m{count}.stock_view_ms"] = statistics.mean(
+            timed(lambda: dashboard.render_stock_view(VIEWPORT), args.repeat)) * 1000
+
+        for client_count in args.client_counts:
+            clients = [{'http': dashboard.server.test_client(), 'versions': None} for _ in range(client_count)]
+            initial = poll_round(outputs, clients)
+
+            updates = []
+            for _ in range(args.rounds):
+                manager.update_all_data()
+                updates.extend(poll_round(outputs, clients))
+
+            prefix = f"callback.n{client_count}.m{count}"
+            for name, value in summarize([seconds for seconds, _ in initial]).items():
+                metrics[f"{prefix}.initial.{name}"] = value
+            metrics[f"{prefix}.initial.bytes"] = statistics.mean(size for _, size in initial)
+            for name, value in summarize([seconds for seconds, _ in updates]).items():
+                metrics[f"{prefix}.update.{name}"] = value
+            metrics[f"{prefix}.update.bytes"] = statistics.mean(size for _, size in updates)
+
+def compare(baseline_path, metrics):
+    """Print every metric next to its baseline value; all metrics are lower-is-better"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['metrics']
+
+    print(f"\n{'METRIC':<48} {'BASELINE':>12} {'CURRENT':>12} {'CHANGE':>8}")
+    for name in sorted(set(baseline) | set(metrics)):
+        old, new = baseline.get(name), metrics.get(name)
+        if old is None or new is None:
+            print(f"{name:<48} {'-' if old is None else f'{old:.3f}':>12} {'-' if new is None else f'{new:.3f}':>12}")
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        flag = '  <-' if change > 10 else ''
+        print(f"{name:<48} {old:>12.3f} {new:>12.3f} {change:>+7.1f}%{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', default='1,10,50', help="comma separated simulated client counts")
+    parser.add_argument('--symbols', default='6,100,500', help="comma separated stock symbol counts")
+    parser.add_argument('--latency', type=float, default=0.05, help="injected source latency (seconds)")
+    parser.add_argument('--cycles', type=int, default=10, help="update cycles to time per symbol count")
+    parser.add_argument('--rounds', type=int, default=5, help="polling rounds per client count")
+    parser.add_argument('--repeat', type=int, default=20, help="renders to average per panel")
+    parser.add_argument('--history', type=int, default=1000, help="price ticks preloaded per symbol")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file from an earlier --output run")
+    args = parser.parse_args()
+    args.client_counts = [int(n) for n in args.clients.split(',')]
+    args.symbol_counts = [int(n) for n in args.symbols.split(',')]
+
+    metrics = {}
+    bench_cycles(args, metrics)
+    bench_app(args, metrics)
+
+    print(f"{'METRIC':<48} {'VALUE':>12}")
+    for name, value in sorted(metrics.items()):
+        print(f"{name:<48} {value:>12.3f}")
+
+    if args.output:
+        results = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'args': {name: value for name, value in vars(args).items() if name not in ('output', 'compare')}
+            },
+            'metrics': metrics
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(args.compare, metrics)
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
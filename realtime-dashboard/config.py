@@ -7,19 +7,185 @@ load_dotenv()
 # API configuration
 WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', 'your_weather_api_key')
 WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather"
+WEATHER_LOCATIONS = ['Beijing', 'Shanghai', 'Tokyo', 'Singapore', 'London', 'New York', 'San Francisco', 'Sydney']
+# Upstream request budget (requests per second, burst size) and concurrent requests
+WEATHER_RATE_LIMIT = 1.0
+WEATHER_RATE_BURST = 10
+WEATHER_WORKERS = 4
+# Seconds between upstream station observations; a city is not re-requested before its next one
+WEATHER_OBSERVATION_INTERVAL = 600
 
-# Stock API configuration (using yfinance, no API key required)
+# Stock API configuration (Yahoo Finance spark endpoint, no API key required)
+STOCK_API_URL = os.getenv('STOCK_API_URL', 'https://query1.finance.yahoo.com/v7/finance/spark')
 STOCK_SYMBOLS = ['AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN', 'NVDA']
+# Batched quote endpoint, asked for day volume only when a spark response carries none
+STOCK_QUOTE_URL = os.getenv('STOCK_QUOTE_URL', 'https://query1.finance.yahoo.com/v7/finance/quote')
+# Symbols per batched request, and how many batches run at once
+STOCK_BATCH_SIZE = 20
+STOCK_BATCH_WORKERS = 4
 
 # Web scraping target websites
 SCRAPE_URLS = {
-    'news': 'https://news.ycombinator.com/',
-    'bitcoin': 'https://coinmarketcap.com/currencies/bitcoin/'
+    'news': 'https://news.ycombinator.com/'
 }
 
-# Update interval (seconds)
+# Extraction rules per SCRAPE_URLS site: text of the first `item` tag in each
+# (tag, class) container, stopping after `limit` items
+SCRAPE_RULES = {
+    # <span class="titleline"><a href="...">Title</a> ...
+    'news': {'container': ('span', 'titleline'), 'item': 'a', 'limit': 10}
+}
+
+# Crypto tick feed (Coinbase Exchange WebSocket protocol); benchmarks/crypto_replay.py serves
+# recorded ticks locally, e.g. CRYPTO_FEED_URL=ws://127.0.0.1:8765. Empty = no feed
+CRYPTO_FEED_URL = os.getenv('CRYPTO_FEED_URL', 'wss://ws-feed.exchange.coinbase.com')
+CRYPTO_ASSETS = ['BTC-USD', 'ETH-USD', 'SOL-USD', 'XRP-USD', 'DOGE-USD', 'ADA-USD']
+# OHLC bar resolutions built from the ticks (name -> seconds)
+CRYPTO_RESOLUTIONS = {'1s': 1, '1m': 60, '5m': 300}
+# Seconds without a tick before the feed reconnects (the last prices are shown as stale meanwhile)
+CRYPTO_STALE_SECONDS = 30
+# Candlestick chart in the crypto panel: asset (None = first asset), resolution, bars shown
+CRYPTO_CHART_ASSET = None
+CRYPTO_CHART_RESOLUTION = '1m'
+CRYPTO_CHART_BARS = 60
+
+# Headlines kept for the news feed, deduplicated across sites and cycles (oldest dropped first)
+NEWS_STORE_CAPACITY = 5000
+# News feed rows: height in px (keep in sync with .news-row in assets/styles.css), rows visible
+# at once, and extra rows fetched above and below so scrolling a few rows needs no request
+NEWS_ROW_HEIGHT = 28
+NEWS_VISIBLE_ROWS = 12
+NEWS_OVERSCAN = 6
+
+# Alert rules, e.g. 'TSLA change_percent < -3' or 'CPU > 90% for 60s' (syntax in alerts.py),
+# plus an optional file of them, one per line
+ALERT_RULES = ['TSLA change_percent < -3', 'CPU > 90% for 60s']
+ALERT_RULES_FILE = os.getenv('ALERT_RULES_FILE', '')
+# Fired and resolved alerts are appended to this JSON lines file (empty = not logged)
+ALERT_LOG = os.getenv('ALERT_LOG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'alerts.jsonl'))
+# Newest alerts listed in the alerts panel
+ALERT_PANEL_SIZE = 20
+
+# Update interval (seconds) for browser polling and sources without their own schedule
 UPDATE_INTERVAL = 30
 
+# Per-source update intervals (seconds), measured from the start of each fetch
+SOURCE_INTERVALS = {
+    'weather': 600,
+    'stocks': 1,
+    'news': 120,
+    # Ticks stream in continuously; this is how often the latest prices are published
+    'crypto': 1
+}
+# Stocks slow down outside regular trading hours (weekdays, exchange local time)
+MARKET_TIMEZONE = 'America/New_York'
+MARKET_HOURS = ((9, 30), (16, 0))
+STOCK_CLOSED_INTERVAL = 3600
+# Random +/- fraction added to each interval so sources don't fire in lockstep
+SCHEDULE_JITTER = 0.1
+# Failed sources back off exponentially, up to this many seconds
+SCHEDULE_MAX_BACKOFF = 900
+# Seconds between history flushes (and shared snapshot writes)
+HISTORY_FLUSH_INTERVAL = 5
+
+# Fetch engine configuration
+FETCH_WORKERS = 8
+# Per-source deadline (seconds), also used as the upstream request timeout
+SOURCE_TIMEOUTS = {
+    'weather': 10,
+    'stocks': 15,
+    'news': 10,
+    'crypto': 10
+}
+# Upper bound for a whole update cycle (seconds)
+CYCLE_DEADLINE = 20
+
+# Circuit breaker per upstream: failures in a row that open it, then seconds until a half-open
+# probe (doubled after each failed probe, up to the max). Failing sources keep their last good data
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = 30
+CIRCUIT_MAX_RESET_TIMEOUT = 600
+# Simulate every source with random data instead of fetching (offline demos)
+MOCK_DATA = os.getenv('MOCK_DATA', '0') == '1'
+
+# History capacity (samples kept per series, 86400 = one day at 1s resolution)
+HISTORY_CAPACITY = {
+    'weather': 8640,
+    'stocks': 86400,
+    'news': 2880,
+    'crypto': 3600,
+    # OHLC bars per asset: 1 hour of 1s, 1 day of 1m, 1 week of 5m
+    'crypto_1s': 3600,
+    'crypto_1m': 1440,
+    'crypto_5m': 2016
+}
+
+# On-disk history (day files under HISTORY_DIR, kept for HISTORY_RETENTION_DAYS)
+HISTORY_PERSIST = True
+HISTORY_DIR = os.getenv('HISTORY_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'history'))
+HISTORY_RETENTION_DAYS = 7
+
+# Shared HTTP session configuration
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 32
+HTTP_USER_AGENT = 'Mozilla/5.0 (compatible; RealtimeDashboard/1.0)'
+
+# HTTP response cache: seconds a response is served without revalidation, per source
+HTTP_CACHE_TTL = {
+    'weather': 300,
+    'news': 120
+}
+HTTP_CACHE_MAX_ENTRIES = 128
+# Directory to keep cached responses across restarts (None = memory only)
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'http_cache'))
+
+# Stock chart history is drawn downsampled to the plot width: 'minmax' keeps every spike,
+# 'lttb' (largest triangle three buckets) keeps the overall shape
+STOCK_CHART_DOWNSAMPLE = 'minmax'
+# Live points appended per trace before the chart is redrawn from a new downsampled view
+STOCK_CHART_MAX_POINTS = 1000
+
+# System metrics sampling (seconds between samples, samples kept for the sparkline)
+SYSTEM_SAMPLE_INTERVAL = 5
+SYSTEM_SAMPLE_HISTORY = 60
+
+# Single-producer shared state for multi-worker servers (e.g. gunicorn -w 4 -k gthread --threads 8,
+# without --preload): one process polls upstream and the others read its snapshots and history files.
+# Each worker still keeps its own in-memory copy of the history and analytics
+SHARED_STATE = True
+SHARED_STATE_DIR = os.getenv('SHARED_STATE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'shared'))
+SHARED_STATE_SIZE = 8 * 1024 * 1024
+# Seconds between reader checks for a new snapshot
+SHARED_POLL_INTERVAL = 0.5
+
+# Rolling stock analytics (windows count ticks, not seconds)
+ANALYTICS_WINDOW = 20
+ANALYTICS_EMA_SPAN = 20
+ANALYTICS_CORRELATION_WINDOW = 120
+# Statistics drawn over each symbol's price line (hidden until enabled in the legend)
+ANALYTICS_OVERLAYS = ('sma', 'vwap')
+
+# Rendered panels kept for reuse across sessions (one entry per panel version)
+RENDER_CACHE_SIZE = 64
+
+# Server push (SSE) instead of interval polling. Every open tab holds a request open, so the
+# server must be threaded or async (gunicorn -k gthread --threads N, or -k gevent); under
+# gunicorn sync workers the app falls back to polling
+PUSH_UPDATES = True
+STREAM_ROUTE = '/stream'
+# Seconds between keep-alive comments on idle streams
+STREAM_HEARTBEAT = 15
+
+# Start serving before the first fetch completes (panels fill in as sources arrive)
+FAST_START = True
+
+# Prometheus-style metrics route on the Flask server
+METRICS_ROUTE = '/metrics'
+# Sampling profiler at PROFILER_ROUTE?seconds=N; off by default since it exposes stack traces
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', '0') == '1'
+PROFILER_ROUTE = '/debug/profile'
+PROFILER_INTERVAL = 0.005
+
 # Application configuration
 APP_HOST = '127.0.0.1'
 APP_PORT = 8050
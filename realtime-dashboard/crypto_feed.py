@@ -0,0 +1,209 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+import metrics
+from records import OHLCBar
+from ws_client import WebSocket
+
+TICKS = metrics.counter('dashboard_crypto_ticks_total', "Trade ticks received from the crypto feed")
+LATE_TICKS = metrics.counter('dashboard_crypto_late_ticks_total', "Ticks dropped because their bar had already closed",
+                             ('resolution',))
+CONNECTS = metrics.counter('dashboard_crypto_feed_connects_total', "Crypto feed connection attempts", ('outcome',))
+
+# A bar is closed without a newer tick this long after its interval ends
+BAR_CLOSE_DELAY_MS = 2000
+
+# (seconds prefix, its epoch ms) of the last parsed tick time
+_last_second = (None, 0)
+
+def parse_time_ms(text):
+    """Epoch ms of an ISO 8601 UTC time such as 2024-01-01T12:00:00.123456Z
+
+    Ticks arrive many per second, so the seconds part is converted once per
+    second and only the fraction is parsed per tick.
+    """
+    global _last_second
+    prefix, base = _last_second
+    if text[:19] != prefix:
+        prefix = text[:19]
+        base = int(datetime.strptime(prefix, '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp()) * 1000
+        _last_second = (prefix, base)
+    if text[19:20] != '.':
+        return base
+    digits = text[20:23]
+    if not digits.isdigit():
+        digits = digits[:len(digits) - len(digits.lstrip('0123456789'))]
+    return base + int(digits.ljust(3, '0'))
+
+class OHLCAggregator:
+    """Fold trade ticks into open/high/low/close/volume bars at several resolutions
+
+    One bar per asset and resolution is open at a time. A bar is closed, and
+    passed to on_bar(resolution, asset, OHLCBar), when the first tick of a
+    later interval arrives or close_expired() finds its interval over.
+    Intervals without ticks produce no bar. A tick whose bar has already
+    closed (out of order, or after close_expired()) is dropped and counted
+    in `late`, per resolution, rather than folded into a bar it does not
+    belong to.
+    """
+
+    def __init__(self, resolutions, on_bar=None):
+        # [(name, width in ms)], e.g. [('1s', 1000), ('1m', 60000)]
+        self.resolutions = [(name, int(seconds * 1000)) for name, seconds in resolutions.items()]
+        self.on_bar = on_bar
+        # (asset, resolution) -> [start, open, high, low, close, volume, closed]
+        self._bars = {}
+        # resolution -> ticks dropped for arriving after their bar closed
+        self.late = {name: 0 for name, _ in self.resolutions}
+        self._lock = threading.Lock()
+
+    def add(self, asset, ts, price, size):
+        """Add one tick (epoch-ms timestamp, price, traded size)"""
+        with self._lock:
+            for name, width in self.resolutions:
+                start = ts - ts % width
+                bar = self._bars.get((asset, name))
+                if bar is None or start > bar[0]:
+                    if bar is not None and not bar[6]:
+                        self._close(name, asset, bar)
+                    self._bars[(asset, name)] = [start, price, price, price, price, size, False]
+                elif start < bar[0] or bar[6]:
+                    # Its bar was already passed to on_bar
+                    self.late[name] += 1
+                    LATE_TICKS.inc(resolution=name)
+                else:
+                    if price > bar[2]:
+                        bar[2] = price
+                    if price < bar[3]:
+                        bar[3] = price
+                    bar[4] = price
+                    bar[5] += size
+
+    def close_expired(self, now):
+        """Close open bars whose interval ended more than BAR_CLOSE_DELAY_MS before now (epoch ms)"""
+        widths = dict(self.resolutions)
+        with self._lock:
+            for (asset, name), bar in self._bars.items():
+                if not bar[6] and bar[0] + widths[name] + BAR_CLOSE_DELAY_MS <= now:
+                    self._close(name, asset, bar)
+
+    def current(self, asset, resolution):
+        """The bar still being built for asset, or None"""
+        bar = self._bars.get((asset, resolution))
+        if bar is None or bar[6]:
+            return None
+        return OHLCBar(bar[1], bar[2], bar[3], bar[4], bar[5], bar[0])
+
+    def _close(self, name, asset, bar):
+        bar[6] = True
+        if self.on_bar is not None:
+            try:
+                self.on_bar(name, asset, OHLCBar(bar[1], bar[2], bar[3], bar[4], bar[5], bar[0]))
+            except Exception as e:
+                print(f"Bar listener failed: {e}")
+
+class CryptoFeed:
+    """Streaming trade ticks for many assets over a WebSocket
+
+    Speaks the Coinbase Exchange feed protocol: one subscribe message for
+    the ticker channel, then a JSON ticker message per trade. Messages may
+    also arrive as JSON arrays of tickers. Ticks update the latest trade per
+    asset and the OHLC bars. The connection runs on its own thread and
+    reconnects with exponential backoff; a feed silent for `stale_after`
+    seconds is reconnected.
+    """
+
+    def __init__(self, url, assets, resolutions, on_bar=None, stale_after=30, max_backoff=60):
+        self.url = url
+        self.assets = list(assets)
+        self.stale_after = stale_after
+        self.max_backoff = max_backoff
+        self.aggregator = OHLCAggregator(resolutions, on_bar)
+        # asset -> (ts, price, open_24h, volume_24h) of the newest tick
+        self._latest = {}
+        self.ticks = 0
+        self.last_tick_at = 0.0
+        self._socket = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Connect in the background; later calls do nothing"""
+        if self._thread is not None or not self.url:
+            return
+        # Connecting gets the same grace period as a quiet feed before it counts as stale
+        self.last_tick_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='crypto-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._socket is not None:
+            self._socket.close()
+
+    @property
+    def fresh(self):
+        """Whether a tick arrived in the last stale_after seconds"""
+        return time.monotonic() - self.last_tick_at < self.stale_after
+
+    def latest(self):
+        """Get {asset: (ts, price, open_24h, volume_24h)} of the newest ticks"""
+        return dict(self._latest)
+
+    def handle_message(self, text):
+        """Apply one feed message; returns the number of ticks it held"""
+        data = json.loads(text)
+        messages = data if isinstance(data, list) else (data,)
+        count = 0
+        add = self.aggregator.add
+        for message in messages:
+            if message.get('type') != 'ticker':
+                if message.get('type') == 'error':
+                    print(f"Crypto feed error: {message.get('message')} {message.get('reason', '')}")
+                continue
+            asset = message['product_id']
+            ts = parse_time_ms(message['time'])
+            price = float(message['price'])
+            add(asset, ts, price, float(message.get('last_size') or 0))
+            open_24h = message.get('open_24h')
+            volume_24h = message.get('volume_24h')
+            self._latest[asset] = (ts, price, float(open_24h) if open_24h else None,
+                                   float(volume_24h) if volume_24h else None)
+            count += 1
+        if count:
+            self.ticks += count
+            self.last_tick_at = time.monotonic()
+            TICKS.inc(count)
+        return count
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self._socket = WebSocket(self.url, timeout=self.stale_after)
+            except Exception as e:
+                CONNECTS.inc(outcome='error')
+                print(f"Crypto feed connect failed: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            CONNECTS.inc(outcome='ok')
+            backoff = 1
+            try:
+                self._socket.send(json.dumps({
+                    'type': 'subscribe',
+                    'product_ids': self.assets,
+                    'channels': ['ticker']
+                }))
+                while not self._stop.is_set():
+                    message = self._socket.recv()
+                    if message is None:
+                        break
+                    self.handle_message(message)
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"Crypto feed disconnected: {e}")
+            finally:
+                self._socket.close()
+            self._stop.wait(backoff)
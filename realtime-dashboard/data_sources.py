@@ -1,92 +1,364 @@
-import requests
-import yfinance as yf
-import pandas as pd
-from bs4 import BeautifulSoup
-import json
-from datetime import datetime
+import threading
+import time
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 import config
+import metrics
+from fetch_engine import FetchEngine
+from http_client import RateLimiter, get_cache, get_session
+from html_extract import ExtractionRule, extract_items
+from news_store import NewsStore
+from timeseries import TimeSeriesStore
+from analytics import StockAnalytics
+from crypto_feed import CryptoFeed
+from history_archive import HistoryArchive
+from records import CryptoRecord, NewsRecord, OHLCBar, StockRecord, WeatherRecord, now_ms
+from resilience import CircuitBreaker, CircuitOpenError, SourceUnavailable
+from alerts import AlertEngine, load_rules
+from system_metrics import SAMPLE_ALIASES, SAMPLE_COLUMNS
+from snapshot import EMPTY_SNAPSHOT
+
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ = ZoneInfo(config.MARKET_TIMEZONE)
+except Exception:
+    # Python 3.8 or no tz database: fall back to US Eastern standard time
+    MARKET_TZ = timezone(timedelta(hours=-5))
+
+PARSE_SECONDS = metrics.histogram('dashboard_parse_seconds', "Time to parse an upstream response", ('source',))
+HISTORY_APPEND_SECONDS = metrics.histogram(
+    'dashboard_history_append_seconds', "Time to append one record to history", ('source',),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.01))
+
+def make_breaker(name):
+    return CircuitBreaker(name, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT,
+                          config.CIRCUIT_MAX_RESET_TIMEOUT)
+
+# Numeric columns kept in history for each source
+HISTORY_COLUMNS = {
+    'weather': ('temperature', 'humidity', 'pressure'),
+    'stocks': ('price', 'change', 'change_percent', 'volume'),
+    'news': ('news_count',),
+    'crypto': ('price', 'change_24h', 'volume_24h'),
+    # OHLC bars per asset, one source per resolution (crypto_1s, crypto_1m, ...)
+    **{f"crypto_{name}": OHLCBar._fields[:-1] for name in config.CRYPTO_RESOLUTIONS}
+}
+
+# Keys of each source, so alert rules can name a symbol, asset or city without its source
+ALERT_KEYS = {
+    'stocks': config.STOCK_SYMBOLS,
+    'crypto': config.CRYPTO_ASSETS,
+    'weather': config.WEATHER_LOCATIONS
+}
 
 class WeatherData:
     def __init__(self):
         self.api_key = config.WEATHER_API_KEY
         self.api_url = config.WEATHER_API_URL
+        self.locations = config.WEATHER_LOCATIONS
+        self.cache = get_cache()
+        self.limiter = RateLimiter(config.WEATHER_RATE_LIMIT, config.WEATHER_RATE_BURST)
+        # One per city: a city the API rejects (404, bad name) must not fail fast for the others
+        self.breakers = {city: make_breaker(f"weather {city}") for city in self.locations}
+        self.executor = ThreadPoolExecutor(max_workers=config.WEATHER_WORKERS, thread_name_prefix='weather')
+        
+        # city -> (response, parsed record, expires_at); a city is not requested again
+        # until its upstream observation is due to be replaced
+        self._observations = {}
+        self._in_flight = {}
     
-    def get_weather_data(self, city="Beijing"):
-        """Get weather data"""
+    def get_all_weather(self):
+        """Get weather for every configured location; a slow city never holds up the others
+
+        Cities that fail are left out. Raises if none succeeded and no
+        city is still in flight.
+        """
+        deadline = time.monotonic() + config.SOURCE_TIMEOUTS['weather']
+        futures = {}
+        for city in self.locations:
+            running = self._in_flight.get(city)
+            if running is None or running.done():
+                running = self._in_flight[city] = self.executor.submit(self.get_weather_data, city)
+            futures[city] = running
+        
+        wait(list(futures.values()), timeout=max(0, deadline - time.monotonic()))
+        
+        weather = []
+        errors = []
+        for city in self.locations:
+            future = futures[city]
+            if not future.done():
+                if city in self._observations:
+                    # Still in flight: reuse the last observation, the new one lands in the next cycle
+                    weather.append(self._observations[city][1]._replace(timestamp=now_ms()))
+            elif future.exception():
+                errors.append(future.exception())
+            else:
+                weather.append(future.result())
+        if not weather and errors:
+            raise errors[0]
+        return weather
+    
+    def get_weather_data(self, city=None):
+        """Get weather data for one city; raises if the upstream fails"""
+        city = city or self.locations[0]
+        cached = self._observations.get(city)
+        if cached is not None and time.time() < cached[2]:
+            return cached[1]._replace(timestamp=now_ms())
+        
         try:
-            params = {
-                'q': city,
-                'appid': self.api_key,
-                'units': 'metric',
-                'lang': 'en'
-            }
-            response = requests.get(self.api_url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'city': data['name'],
-                    'temperature': data['main']['temp'],
-                    'humidity': data['main']['humidity'],
-                    'pressure': data['main']['pressure'],
-                    'description': data['weather'][0]['description'],
-                    'timestamp': datetime.now()
-                }
+            response = self.breakers[city].call(self._request, city)
+            if cached is None or cached[0] is not response:
+                with PARSE_SECONDS.time(source='weather'):
+                    data = response.json()
+                    record = WeatherRecord(
+                        # The configured name: the API may answer with another one (New York City)
+                        city=city,
+                        temperature=data['main']['temp'],
+                        humidity=data['main']['humidity'],
+                        pressure=data['main']['pressure'],
+                        description=data['weather'][0]['description'],
+                        timestamp=now_ms()
+                    )
+                observed_at = data.get('dt', time.time())
             else:
-                return self.get_mock_weather_data()
+                record = cached[1]._replace(timestamp=now_ms())
+                observed_at = 0
+        except SourceUnavailable:
+            raise
         except Exception as e:
-            print(f"Weather API failed: {e}")
-            return self.get_mock_weather_data()
+            print(f"Weather API failed for {city}: {e}")
+            raise
+        
+        # Stations report every WEATHER_OBSERVATION_INTERVAL; never poll faster than the cache TTL
+        expires_at = max(observed_at + config.WEATHER_OBSERVATION_INTERVAL,
+                         time.time() + config.HTTP_CACHE_TTL['weather'])
+        self._observations[city] = (response, record, expires_at)
+        return record
+    
+    def _request(self, city):
+        params = {
+            'q': city,
+            'appid': self.api_key,
+            'units': 'metric',
+            'lang': 'en'
+        }
+        self.limiter.acquire()
+        # Freshness is decided per city by get_weather_data, so always revalidate here
+        response = self.cache.get(
+            self.api_url,
+            params=params,
+            ttl=0,
+            timeout=config.SOURCE_TIMEOUTS['weather']
+        )
+        if response.status_code != 200:
+            raise ValueError(f"HTTP {response.status_code}")
+        return response
     
-    def get_mock_weather_data(self):
+    def get_mock_weather_data(self, city=None):
         """Simulate weather data"""
         import random
-        return {
-            'city': 'Beijing',
-            'temperature': random.uniform(15, 30),
-            'humidity': random.uniform(40, 80),
-            'pressure': random.uniform(1000, 1020),
-            'description': 'Sunny',
-            'timestamp': datetime.now()
-        }
+        return WeatherRecord(
+            city=city or self.locations[0],
+            temperature=random.uniform(15, 30),
+            humidity=random.uniform(40, 80),
+            pressure=random.uniform(1000, 1020),
+            description='Sunny',
+            timestamp=now_ms()
+        )
 
 class StockData:
     def __init__(self):
         self.symbols = config.STOCK_SYMBOLS
+        self.api_url = config.STOCK_API_URL
+        self.quote_url = config.STOCK_QUOTE_URL
+        self.session = get_session()
+        self.breaker = make_breaker('stocks')
+        # The quote endpoint only fills in volume, so its failures must not stop prices
+        self.quote_breaker = make_breaker('stock_quotes')
+        # Cleared when the quote endpoint refuses us (it wants a crumb and cookie we don't have)
+        self.quotes_allowed = True
+        # Last cumulative day volume per symbol, to turn it into volume traded per sample
+        self.day_volume = {}
+        self.executor = ThreadPoolExecutor(max_workers=config.STOCK_BATCH_WORKERS, thread_name_prefix='stocks')
+        
+        # previousClose per symbol, refreshed once per trading day
+        self.previous_close = {}
+        self.previous_close_date = None
     
     def get_stock_data(self):
-        """Get stock data"""
-        try:
-            stock_data = []
-            for symbol in self.symbols:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                hist = ticker.history(period="1d", interval="1m")
-                
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
-                    previous_close = info.get('previousClose', current_price)
-                    change = current_price - previous_close
-                    change_percent = (change / previous_close) * 100 if previous_close else 0
-                    
-                    stock_data.append({
-                        'symbol': symbol,
-                        'price': current_price,
-                        'change': change,
-                        'change_percent': change_percent,
-                        'volume': hist['Volume'].iloc[-1],
-                        'timestamp': datetime.now()
-                    })
+        """Get stock data for all symbols with batched requests; raises if the upstream fails"""
+        intraday = self.fetch_spark(self.symbols, range_='1d', interval='1m')
+        
+        session_dates = [self._session_date(series) for series in intraday.values() if series['timestamp']]
+        if session_dates and max(session_dates) != self.previous_close_date:
+            self.refresh_previous_close(max(session_dates))
+        
+        day_volumes = self.day_volumes(intraday)
+        
+        stock_data = []
+        timestamp = now_ms()
+        for symbol in self.symbols:
+            series = intraday.get(symbol)
+            latest = self._latest_bar(series) if series else None
+            if latest is None:
+                continue
             
-            return stock_data if stock_data else self.get_mock_stock_data()
+            current_price, volume = latest
+            if volume != volume:
+                volume = self._volume_since_last(symbol, day_volumes.get(symbol))
+            previous_close = (self.previous_close.get(symbol)
+                              or series['meta'].get('chartPreviousClose')
+                              or current_price)
+            change = current_price - previous_close
+            change_percent = (change / previous_close) * 100 if previous_close else 0
+            
+            stock_data.append(StockRecord(symbol, current_price, change, change_percent, volume, timestamp))
+        
+        if not stock_data:
+            raise ValueError("no prices in the stock response")
+        return stock_data
+    
+    @staticmethod
+    def market_open(now=None):
+        """Whether now falls in regular trading hours (exchange holidays are not considered)"""
+        now = now or datetime.now(MARKET_TZ)
+        (open_h, open_m), (close_h, close_m) = config.MARKET_HOURS
+        return now.weekday() < 5 and (open_h, open_m) <= (now.hour, now.minute) < (close_h, close_m)
+    
+    def refresh_previous_close(self, session_date):
+        """Cache each symbol's close from the session before session_date"""
+        try:
+            daily = self.fetch_spark(self.symbols, range_='5d', interval='1d')
         except Exception as e:
-            print(f"Stock API failed: {e}")
-            return self.get_mock_stock_data()
+            # Keep the old values and retry on the next cycle
+            print(f"Previous close refresh failed: {e}")
+            return
+        
+        previous_close = {}
+        for symbol, series in daily.items():
+            offset = series['meta'].get('gmtoffset', 0)
+            for ts, close in zip(series['timestamp'], series['close']):
+                if close is not None and self._local_date(ts, offset) < session_date:
+                    previous_close[symbol] = close
+        
+        self.previous_close = previous_close
+        self.previous_close_date = session_date
+    
+    def fetch_spark(self, symbols, range_, interval):
+        """Fetch price series for many symbols, STOCK_BATCH_SIZE symbols per request"""
+        batch_size = config.STOCK_BATCH_SIZE
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        futures = [self.executor.submit(self.breaker.call, self._fetch_batch, batch, range_, interval)
+                   for batch in batches]
+        
+        series = {}
+        errors = []
+        for future in futures:
+            try:
+                series.update(future.result())
+            except Exception as e:
+                errors.append(e)
+        
+        # A failed batch only drops its own symbols
+        if errors and not series:
+            raise errors[0]
+        for e in errors:
+            print(f"Stock batch failed: {e}")
+        return series
+    
+    def day_volumes(self, intraday):
+        """Cumulative day volume of the symbols whose spark series has no per-bar volume
+
+        Read from the spark metadata (regularMarketVolume) where present,
+        otherwise asked for in one batched quote request; symbols with
+        neither are left out.
+        """
+        missing = [symbol for symbol, series in intraday.items() if not any(v is not None for v in series['volume'])]
+        volumes = {symbol: intraday[symbol]['meta'].get('regularMarketVolume') for symbol in missing}
+        volumes = {symbol: volume for symbol, volume in volumes.items() if volume is not None}
+        unknown = [symbol for symbol in missing if symbol not in volumes]
+        if unknown and self.quotes_allowed:
+            try:
+                volumes.update(self.quote_breaker.call(self._fetch_quote_volumes, unknown))
+            except CircuitOpenError:
+                pass  # reported when the circuit opened
+            except Exception as e:
+                print(f"Stock volume unavailable: {e}")
+        return volumes
+    
+    def _fetch_quote_volumes(self, symbols):
+        response = self.session.get(self.quote_url, params={'symbols': ','.join(symbols)},
+                                    timeout=config.SOURCE_TIMEOUTS['stocks'])
+        if response.status_code in (401, 403):
+            # Not an outage: retrying can't help, so stop asking instead of tripping the breaker
+            self.quotes_allowed = False
+            print(f"Stock quote endpoint refused the request ({response.status_code}), "
+                  "volume only comes from spark data from now on")
+            return {}
+        response.raise_for_status()
+        quotes = response.json().get('quoteResponse', {}).get('result') or []
+        return {quote['symbol']: quote['regularMarketVolume'] for quote in quotes
+                if quote.get('regularMarketVolume') is not None}
+    
+    def _volume_since_last(self, symbol, day_volume):
+        """Volume traded since the previous sample, from cumulative day volume (NaN if unknown)"""
+        if day_volume is None:
+            return float('nan')
+        previous = self.day_volume.get(symbol)
+        self.day_volume[symbol] = day_volume
+        if previous is None:
+            return float('nan')
+        # A lower total means a new session started
+        return day_volume - previous if day_volume >= previous else day_volume
+    
+    def _fetch_batch(self, batch, range_, interval):
+        params = {
+            'symbols': ','.join(batch),
+            'range': range_,
+            'interval': interval
+        }
+        response = self.session.get(self.api_url, params=params, timeout=config.SOURCE_TIMEOUTS['stocks'])
+        response.raise_for_status()
+        
+        series = {}
+        with PARSE_SECONDS.time(source='stocks'):
+            for result in response.json().get('spark', {}).get('result') or []:
+                for chart in result.get('response') or []:
+                    quote = (chart.get('indicators', {}).get('quote') or [{}])[0]
+                    series[result['symbol']] = {
+                        'meta': chart.get('meta', {}),
+                        'timestamp': chart.get('timestamp') or [],
+                        'close': quote.get('close') or [],
+                        'volume': quote.get('volume') or []
+                    }
+        return series
+    
+    @staticmethod
+    def _latest_bar(series):
+        """Get (close, volume) of the last bar that has a close; volume is NaN if the bar has none"""
+        closes = series['close']
+        volumes = series['volume']
+        for i in range(len(closes) - 1, -1, -1):
+            if closes[i] is not None:
+                volume = volumes[i] if i < len(volumes) and volumes[i] is not None else float('nan')
+                return closes[i], volume
+        return None
+    
+    @staticmethod
+    def _local_date(ts, gmtoffset):
+        return datetime.fromtimestamp(ts + gmtoffset, timezone.utc).date()
+    
+    def _session_date(self, series):
+        return self._local_date(series['timestamp'][-1], series['meta'].get('gmtoffset', 0))
     
     def get_mock_stock_data(self):
         """Simulate stock data"""
         import random
         stock_data = []
         base_prices = {'AAPL': 150, 'GOOGL': 2500, 'MSFT': 300, 'TSLA': 800, 'AMZN': 3000, 'NVDA': 900}
+        timestamp = now_ms()
         
         for symbol in self.symbols:
             base_price = base_prices.get(symbol, 100)
@@ -94,43 +366,66 @@ class StockData:
             change = random.uniform(-5, 5)
             change_percent = random.uniform(-3, 3)
             
-            stock_data.append({
-                'symbol': symbol,
-                'price': current_price,
-                'change': change,
-                'change_percent': change_percent,
-                'volume': random.randint(1000000, 10000000),
-                'timestamp': datetime.now()
-            })
+            stock_data.append(StockRecord(
+                symbol=symbol,
+                price=current_price,
+                change=change,
+                change_percent=change_percent,
+                volume=random.randint(1000000, 10000000),
+                timestamp=timestamp
+            ))
         
         return stock_data
 
 class WebScraper:
     def __init__(self):
         self.urls = config.SCRAPE_URLS
+        self.cache = get_cache()
+        self.rules = {site: ExtractionRule.from_config(rule) for site, rule in config.SCRAPE_RULES.items()}
+        self.breakers = {site: make_breaker(site) for site in self.urls}
+        # Last (response, titles) per site, so an unchanged page is not parsed again
+        self._parsed = {}
+    
+    def scrape_titles(self, site):
+        """Fetch a site from SCRAPE_URLS and extract items with its SCRAPE_RULES entry"""
+        response = self.breakers[site].call(self._request, site)
+        
+        cached = self._parsed.get(site)
+        if cached is None or cached[0] is not response:
+            with PARSE_SECONDS.time(source=site):
+                cached = (response, extract_items(response.content, self.rules[site]))
+            self._parsed[site] = cached
+        return cached[1]
+    
+    def _request(self, site):
+        response = self.cache.get(
+            self.urls[site],
+            ttl=config.HTTP_CACHE_TTL.get(site, 0),
+            timeout=config.SOURCE_TIMEOUTS['news']
+        )
+        if response.status_code != 200:
+            raise ValueError(f"{site} returned HTTP {response.status_code}")
+        return response
     
     def scrape_news_data(self):
-        """Scrape news data"""
-        try:
-            response = requests.get(self.urls['news'], timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Scrape Hacker News titles
-            titles = []
-            for item in soup.find_all('a', class_='storylink')[:10]:
-                titles.append(item.get_text())
-            
-            if not titles:  # If no titles found, use mock data
-                return self.get_mock_news_data()
-                
-            return {
-                'news_count': len(titles),
-                'latest_titles': titles,
-                'timestamp': datetime.now()
-            }
-        except Exception as e:
-            print(f"News scraping failed: {e}")
-            return self.get_mock_news_data()
+        """Scrape every SCRAPE_RULES site; raises only if none of them gave titles"""
+        titles = []
+        errors = {}
+        for site in self.rules:
+            try:
+                site_titles = self.scrape_titles(site)
+            except Exception as e:
+                errors[site] = e
+                continue
+            if not site_titles:
+                # The page changed shape; its SCRAPE_RULES entry needs updating
+                errors[site] = ValueError(f"no titles found on {site}")
+            titles.extend(site_titles)
+        if not titles:
+            raise next(iter(errors.values()), ValueError("no news sites configured"))
+        for site, error in errors.items():
+            print(f"News site {site} skipped: {error}")
+        return NewsRecord(news_count=len(titles), latest_titles=tuple(titles), timestamp=now_ms())
     
     def get_mock_news_data(self):
         """Simulate news data"""
@@ -148,29 +443,71 @@ class WebScraper:
         
         selected_titles = random.sample(mock_titles, min(5, len(mock_titles)))
         
-        return {
-            'news_count': random.randint(8, 15),
-            'latest_titles': selected_titles,
-            'timestamp': datetime.now()
-        }
+        return NewsRecord(
+            news_count=random.randint(8, 15),
+            latest_titles=tuple(selected_titles),
+            timestamp=now_ms()
+        )
     
-    def scrape_crypto_data(self):
-        """Get cryptocurrency data"""
-        try:
-            # Simple Bitcoin price simulation
-            import random
-            return {
-                'bitcoin_price': random.uniform(40000, 70000),
-                'change_24h': random.uniform(-8, 8),
-                'timestamp': datetime.now()
-            }
-        except Exception as e:
-            print(f"Crypto data failed: {e}")
-            return {
-                'bitcoin_price': 50000,
-                'change_24h': 2.5,
-                'timestamp': datetime.now()
-            }
+class CryptoData:
+    def __init__(self, on_bar=None):
+        self.assets = config.CRYPTO_ASSETS
+        # Ticks stream in on the feed's own thread; on_bar receives every closed OHLC bar
+        self.feed = CryptoFeed(config.CRYPTO_FEED_URL, self.assets, config.CRYPTO_RESOLUTIONS,
+                               on_bar, config.CRYPTO_STALE_SECONDS)
+        # Tick count at the last publish
+        self._published_ticks = 0
+    
+    @property
+    def configured(self):
+        """Whether there is a feed to connect to (CRYPTO_FEED_URL is set)"""
+        return bool(self.feed.url)
+    
+    def get_crypto_data(self):
+        """Get the latest trade per asset from the tick feed; raises SourceUnavailable while it is down
+
+        Returns None when no tick arrived since the last call, so a quiet
+        feed publishes nothing until it goes stale.
+        """
+        if not self.configured:
+            return None  # nothing to wait for, so never stale
+        self.feed.start()
+        timestamp = now_ms()
+        # Quiet assets still get their bars closed on time
+        self.feed.aggregator.close_expired(timestamp)
+        if not self.feed.fresh:
+            raise SourceUnavailable(f"no crypto ticks for {self.feed.stale_after}s")
+        # Read before the ticks: one landing in between is published again next time, never lost
+        ticks = self.feed.ticks
+        if ticks == self._published_ticks:
+            return None  # connected, no trades since the last publish
+        self._published_ticks = ticks
+        
+        crypto_data = []
+        latest = self.feed.latest()
+        for asset in self.assets:
+            if asset not in latest:
+                continue
+            _, price, open_24h, volume_24h = latest[asset]
+            change_24h = (price - open_24h) / open_24h * 100 if open_24h else float('nan')
+            crypto_data.append(CryptoRecord(asset, price, change_24h,
+                                            float('nan') if volume_24h is None else volume_24h, timestamp))
+        return crypto_data
+    
+    def get_mock_crypto_data(self):
+        """Simulate crypto data"""
+        import random
+        base_prices = {'BTC-USD': 60000, 'ETH-USD': 3000, 'SOL-USD': 150, 'XRP-USD': 0.5, 'DOGE-USD': 0.15, 'ADA-USD': 0.45}
+        timestamp = now_ms()
+        return [
+            CryptoRecord(
+                asset=asset,
+                price=base_prices.get(asset, 1) * random.uniform(0.98, 1.02),
+                change_24h=random.uniform(-8, 8),
+                volume_24h=random.uniform(1e4, 1e6),
+                timestamp=timestamp
+            ) for asset in self.assets
+        ]
 
 # Data manager
 class DataManager:
@@ -178,44 +515,263 @@ class DataManager:
         self.weather = WeatherData()
         self.stocks = StockData()
         self.scraper = WebScraper()
+        self.crypto = CryptoData(on_bar=self._record_bar)
         
-        # Data storage
-        self.weather_history = []
-        self.stock_history = []
-        self.news_history = []
-        self.crypto_history = []
+        # Data storage: numeric history in ring buffers, latest records in an immutable snapshot
+        self.history = TimeSeriesStore(HISTORY_COLUMNS, config.HISTORY_CAPACITY)
+        self.snapshot = EMPTY_SNAPSHOT
+        self._listeners = []
+        self._flushed_version = None
+        # Every headline seen, deduplicated and indexed for the news feed. With an archive it is
+        # rebuilt from the producer's headline log, so every worker has the same ids and rows
+        self.news_store = NewsStore(config.NEWS_STORE_CAPACITY)
+        # Alert rules, evaluated on every sample as it is recorded (system samples come from the app)
+        self.alerts = AlertEngine(load_rules(config.ALERT_RULES, config.ALERT_RULES_FILE),
+                                  dict(HISTORY_COLUMNS, system=SAMPLE_COLUMNS), ALERT_KEYS, SAMPLE_ALIASES,
+                                  recent=config.ALERT_PANEL_SIZE)
+        # Rolling statistics derived from the stock history
+        self.analytics = StockAnalytics(self.history, config.ANALYTICS_WINDOW, config.ANALYTICS_EMA_SPAN,
+                                        config.ANALYTICS_CORRELATION_WINDOW, config.HISTORY_CAPACITY['stocks'])
+        
+        # Optional on-disk copy of the history, written in batches by flush_history()
+        self.archive = None
+        if config.HISTORY_PERSIST:
+            self.archive = HistoryArchive(config.HISTORY_DIR, HISTORY_COLUMNS, config.HISTORY_RETENTION_DAYS)
+
+        # Sources publish from fetch worker threads; only writers take the lock
+        self._lock = threading.Lock()
+        self.engine = FetchEngine()
+        fetches = {
+            'weather': self.weather.get_all_weather,
+            'stocks': self.stocks.get_stock_data,
+            'news': self.scraper.scrape_news_data,
+            'crypto': self.crypto.get_crypto_data
+        }
+        if config.MOCK_DATA:
+            # Offline demo: every source is simulated and nothing is fetched
+            fetches = {
+                'weather': lambda: [self.weather.get_mock_weather_data(city) for city in self.weather.locations],
+                'stocks': self.stocks.get_mock_stock_data,
+                'news': self.scraper.get_mock_news_data,
+                'crypto': self.crypto.get_mock_crypto_data
+            }
+        self.jobs = {
+            'weather': (self._keep_last_good('weather', fetches['weather']), self._publish_weather),
+            'stocks': (self._keep_last_good('stocks', fetches['stocks']), self._publish_stocks),
+            'news': (self._keep_last_good('news', fetches['news']), self._publish_news),
+            'crypto': (self._keep_last_good('crypto', fetches['crypto']), self._publish_crypto)
+        }
+        # Without a feed there is nothing to poll; the app hides the crypto panel
+        self.crypto_enabled = config.MOCK_DATA or self.crypto.configured
+        if not self.crypto_enabled:
+            print("No CRYPTO_FEED_URL configured, crypto tracker disabled")
+            del self.jobs['crypto']
     
     def update_all_data(self):
-        """Update all data sources"""
-        # Update weather data
-        weather_data = self.weather.get_weather_data()
-        self.weather_history.append(weather_data)
-        if len(self.weather_history) > 100:
-            self.weather_history.pop(0)
-        
-        # Update stock data
-        stock_data = self.stocks.get_stock_data()
-        self.stock_history.extend(stock_data)
-        if len(self.stock_history) > 500:
-            self.stock_history = self.stock_history[-500:]
-        
-        # Update news data
-        news_data = self.scraper.scrape_news_data()
-        self.news_history.append(news_data)
-        if len(self.news_history) > 50:
-            self.news_history.pop(0)
-        
-        # Update cryptocurrency data
-        crypto_data = self.scraper.scrape_crypto_data()
-        self.crypto_history.append(crypto_data)
-        if len(self.crypto_history) > 100:
-            self.crypto_history.pop(0)
+        """Update all data sources concurrently, returning a status per source"""
+        return self.engine.run_cycle(self.jobs)
+    
+    def update_source(self, name):
+        """Start fetching one source in the background
+
+        Returns the fetch's Future, or None if the previous fetch is still running.
+        """
+        fetch, publish = self.jobs[name]
+        return self.engine.submit(name, fetch, publish)
+    
+    def source_interval(self, name):
+        """Seconds until name should be fetched again"""
+        if name == 'stocks' and not self.stocks.market_open():
+            return config.STOCK_CLOSED_INTERVAL
+        return config.SOURCE_INTERVALS.get(name, config.UPDATE_INTERVAL)
+    
+    def warm_start(self):
+        """Reload history and the latest records saved by the previous run"""
+        if self.archive is None:
+            return
+        self.archive.load_into(self.history)
+        self.analytics.catch_up()
+        self.archive.headlines_into(self.news_store)
+        
+        # Publish the saved records directly; their rows are already in the history
+        latest = self.archive.load_latest()
+        with self._lock:
+            # Continue the previous run's version numbers so clients never see them go backwards
+            snapshot = self.snapshot._replace(version=max(self.snapshot.version, latest.get('version', 0)))
+            if latest.get('news'):
+                snapshot = snapshot.publish('news', latest['news'])
+            if latest.get('weather'):
+                weather = {record.city: record for record in latest['weather']}
+                snapshot = snapshot.publish('weather', MappingProxyType(weather))
+            if latest.get('stocks'):
+                stocks = {stock.symbol: stock for stock in latest['stocks']}
+                ordered = {symbol: stocks[symbol] for symbol in config.STOCK_SYMBOLS if symbol in stocks}
+                snapshot = snapshot.publish('stocks', MappingProxyType(ordered))
+            if latest.get('crypto'):
+                crypto = {record.asset: record for record in latest['crypto']}
+                ordered = {asset: crypto[asset] for asset in config.CRYPTO_ASSETS if asset in crypto}
+                snapshot = snapshot.publish('crypto', MappingProxyType(ordered))
+            self.snapshot = snapshot
+    
+    def follow(self, shared_state, on_promote=None):
+        """Mirror the producer process's snapshots and history instead of polling upstream
+
+        If the producer exits, this process takes over its lock and on_promote is called.
+        """
+        thread = threading.Thread(target=self._follow, args=(shared_state, on_promote),
+                                  name='shared-state', daemon=True)
+        thread.start()
+    
+    def _follow(self, shared_state, on_promote):
+        while True:
+            try:
+                snapshot = shared_state.read()
+                if snapshot is not None and snapshot is not self.snapshot:
+                    # Rows the producer flushed before writing this snapshot, copied into this
+                    # process's own buffers (history is not shared memory between workers)
+                    if self.archive is not None:
+                        self.archive.tail_into(self.history)
+                        self.analytics.catch_up()
+                        self.archive.headlines_into(self.news_store)
+                    if snapshot.version < self.snapshot.version:
+                        changed = list(snapshot.versions)  # producer restarted without its archive
+                    else:
+                        changed = snapshot.changed_since(self.snapshot.versions)
+                    self.snapshot = snapshot
+                    if self.archive is None and 'news' in changed and snapshot.news is not None:
+                        # No headline log to replay: this worker's feed holds what it saw
+                        self.news_store.add(snapshot.news.latest_titles, snapshot.news.timestamp)
+                    for source in changed:
+                        self._observe_snapshot(snapshot, source)
+                    for source in changed:
+                        self._notify(snapshot, source)
+                
+                if shared_state.try_become_producer():
+                    print("Producer exited, this process now polls upstream")
+                    if self.archive is not None:
+                        # Whatever the old producer flushed last, so this process continues from it
+                        self.archive.tail_into(self.history)
+                        self.archive.headlines_into(self.news_store)
+                    if on_promote is not None:
+                        on_promote()
+                    return
+            except Exception as e:
+                print(f"Shared state read failed: {e}")
+            time.sleep(config.SHARED_POLL_INTERVAL)
+    
+    def flush_history(self):
+        """Write history queued since the last flush to disk
+
+        Returns False if nothing was published since the last flush.
+        """
+        snapshot = self.snapshot
+        if snapshot.version == self._flushed_version:
+            return False
+        if self.archive is not None:
+            self.archive.flush(snapshot)
+        self._flushed_version = snapshot.version
+        return True
+    
+    def _record(self, source, key, record):
+        with HISTORY_APPEND_SECONDS.time(source=source):
+            self.history.append(source, key, record.timestamp, record)
+            if self.archive is not None:
+                self.archive.record(source, key, record.timestamp, record)
+        self.alerts.observe(source, key, record.timestamp, record)
+    
+    def _observe_snapshot(self, snapshot, source):
+        """Evaluate alert rules on a mirrored snapshot's latest records (followers record no rows)"""
+        records = getattr(snapshot, source)
+        if source == 'news':
+            if records is not None:
+                self.alerts.observe(source, None, records.timestamp, records)
+            return
+        for key, record in records.items():
+            self.alerts.observe(source, key, record.timestamp, record)
+    
+    def _record_bar(self, resolution, asset, bar):
+        """Keep a closed OHLC bar in history; called from the crypto feed thread"""
+        self._record(f"crypto_{resolution}", asset, bar)
+    
+    def _keep_last_good(self, source, fetch):
+        """Wrap a source's fetch so a failure marks the source stale instead of replacing its data
+
+        The snapshot keeps the last good records and no history row is
+        written. SourceUnavailable (open circuit, silent feed) cost no
+        waiting and is no error to the scheduler; other failures are raised
+        again so it backs off.
+        """
+        def run():
+            try:
+                return fetch()
+            except SourceUnavailable as e:
+                self._mark_stale(source, e)
+                return None
+            except Exception as e:
+                self._mark_stale(source, e)
+                raise
+        return run
+    
+    def _mark_stale(self, source, error):
+        with self._lock:
+            if source in self.snapshot.stale:
+                return
+            snapshot = self.snapshot = self.snapshot.mark_stale(source, now_ms())
+        print(f"{source} unavailable, keeping its last good data: {error}")
+        self._notify(snapshot, source)
+    
+    def subscribe(self, listener):
+        """Call listener(snapshot, source) after every publish, from the fetch worker"""
+        self._listeners.append(listener)
+    
+    def _notify(self, snapshot, source):
+        for listener in self._listeners:
+            try:
+                listener(snapshot, source)
+            except Exception as e:
+                print(f"Snapshot listener failed: {e}")
+    
+    def _publish_weather(self, weather_data):
+        with self._lock:
+            weather = dict(self.snapshot.weather)
+            for record in weather_data:
+                self._record('weather', record.city, record)
+                weather[record.city] = record
+            snapshot = self.snapshot = self.snapshot.publish('weather', MappingProxyType(weather))
+        self._notify(snapshot, 'weather')
+    
+    def _publish_stocks(self, stock_data):
+        with self._lock:
+            stocks = dict(self.snapshot.stocks)
+            for stock in stock_data:
+                self._record('stocks', stock.symbol, stock)
+                stocks[stock.symbol] = stock
+            self.analytics.catch_up()
+            
+            # Symbols that failed this cycle keep their last good record
+            ordered = {symbol: stocks[symbol] for symbol in config.STOCK_SYMBOLS if symbol in stocks}
+            snapshot = self.snapshot = self.snapshot.publish('stocks', MappingProxyType(ordered))
+        self._notify(snapshot, 'stocks')
+    
+    def _publish_news(self, news_data):
+        with self._lock:
+            self._record('news', None, news_data)
+            self.news_store.add(news_data.latest_titles, news_data.timestamp)
+            if self.archive is not None:
+                self.archive.record_headlines(news_data.latest_titles, news_data.timestamp)
+            snapshot = self.snapshot = self.snapshot.publish('news', news_data)
+        self._notify(snapshot, 'news')
+    
+    def _publish_crypto(self, crypto_data):
+        with self._lock:
+            crypto = dict(self.snapshot.crypto)
+            for record in crypto_data:
+                self._record('crypto', record.asset, record)
+                crypto[record.asset] = record
+            ordered = {asset: crypto[asset] for asset in config.CRYPTO_ASSETS if asset in crypto}
+            snapshot = self.snapshot = self.snapshot.publish('crypto', MappingProxyType(ordered))
+        self._notify(snapshot, 'crypto')
     
     def get_latest_data(self):
-        """Get latest data"""
-        return {
-            'weather': self.weather_history[-1] if self.weather_history else None,
-            'stocks': self.stock_history[-len(config.STOCK_SYMBOLS):] if self.stock_history else [],
-            'news': self.news_history[-1] if self.news_history else None,
-            'crypto': self.crypto_history[-1] if self.crypto_history else None
-        }
+        """Get the latest snapshot (no locking or copying)"""
+        return self.snapshot
@@ -0,0 +1,221 @@
+import threading
+import numpy as np
+
+# Pyramid bucket widths are PYRAMID_BASE_MS * PYRAMID_FACTOR ** level for levels 1..PYRAMID_LEVELS
+PYRAMID_BASE_MS = 1000
+PYRAMID_FACTOR = 8
+PYRAMID_LEVELS = 5
+
+def _segment_extremes(segments, starts, values):
+    """Index of the first minimum and first maximum of values in each segment
+
+    segments holds the segment number of every value (non-decreasing) and
+    starts the index where each segment begins. values must not be NaN.
+    """
+    counts = np.diff(np.append(starts, len(values)))
+    extremes = []
+    for reduce in (np.minimum, np.maximum):
+        # Positions equal to their segment's extreme; the first one of each segment wins
+        hits = np.flatnonzero(values == np.repeat(reduce.reduceat(values, starts), counts))
+        hit_segments = segments[hits]
+        extremes.append(hits[np.flatnonzero(np.diff(hit_segments, prepend=-1))])
+    return extremes
+
+def minmax(x, y, buckets):
+    """Reduce to the minimum and maximum point of each of `buckets` equal-count buckets
+
+    Keeps every spike visible at any zoom level, returning at most
+    2 * buckets points in their original order.
+    """
+    size = len(x)
+    if size <= 2 * buckets:
+        return x, y
+    starts = np.linspace(0, size, buckets + 1).astype(np.int64)[:-1]
+    segments = np.repeat(np.arange(buckets), np.diff(np.append(starts, size)))
+    first_min, first_max = _segment_extremes(segments, starts, y)
+    index = np.unique(np.concatenate([first_min, first_max]))
+    return x[index], y[index]
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: `threshold` points that keep the visual shape
+
+    The first and last points are kept; from every bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket is chosen.
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return x, y
+    xf = np.asarray(x, dtype=np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    # Mean of every bucket, plus the last point standing in for the bucket after the last one
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(xf[1:size - 1], edges[:-1] - 1) / counts, xf[-1])
+    mean_y = np.append(np.add.reduceat(yf[1:size - 1], edges[:-1] - 1) / counts, yf[-1])
+
+    index = np.empty(threshold, dtype=np.int64)
+    index[0], index[-1] = 0, size - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = xf[a], yf[a]
+        areas = np.abs((ax - mean_x[i + 1]) * (yf[start:end] - ay) - (ax - xf[start:end]) * (mean_y[i + 1] - ay))
+        a = start + int(np.argmax(areas))
+        index[i + 1] = a
+    return x[index], y[index]
+
+REDUCERS = {
+    # Points allowed per pixel of width for each reducer
+    'minmax': lambda x, y, width: minmax(x, y, width),
+    'lttb': lambda x, y, width: lttb(x, y, 2 * width)
+}
+
+class MinMaxLevel:
+    """Time-aligned min/max buckets of one width; the newest bucket may still be filling"""
+
+    COLUMNS = (('start', np.int64), ('min_ts', np.int64), ('min', np.float64),
+               ('max_ts', np.int64), ('max', np.float64))
+
+    def __init__(self, width):
+        self.width = width
+        self._data = {name: np.empty(64, dtype) for name, dtype in self.COLUMNS}
+        self._first = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._first
+
+    def add(self, timestamps, values):
+        """Fold new rows (sorted, newer than every row added before) into the buckets"""
+        starts = timestamps - timestamps % self.width
+        boundaries = np.flatnonzero(np.diff(starts)) + 1
+        first = np.concatenate([[0], boundaries])
+        segments = np.repeat(np.arange(len(first)), np.diff(np.append(first, len(starts))))
+        first_min, first_max = _segment_extremes(segments, first, values)
+        new = {
+            'start': starts[first], 'min_ts': timestamps[first_min], 'min': values[first_min],
+            'max_ts': timestamps[first_max], 'max': values[first_max]
+        }
+
+        data = self._data
+        last = self._end - 1
+        if len(self) and data['start'][last] == new['start'][0]:
+            # The first new segment belongs to the bucket still filling
+            if new['min'][0] < data['min'][last]:
+                data['min'][last], data['min_ts'][last] = new['min'][0], new['min_ts'][0]
+            if new['max'][0] > data['max'][last]:
+                data['max'][last], data['max_ts'][last] = new['max'][0], new['max_ts'][0]
+            new = {name: column[1:] for name, column in new.items()}
+        self._append(new)
+
+    def trim(self, oldest):
+        """Drop buckets that end before the oldest timestamp still in history"""
+        starts = self._data['start'][self._first:self._end]
+        self._first += int(np.searchsorted(starts, oldest - self.width, side='right'))
+
+    def points(self, t0, t1):
+        """Min and max points of the buckets overlapping [t0, t1], in time order"""
+        starts = self._data['start'][self._first:self._end]
+        lo = self._first + int(np.searchsorted(starts, t0 - self.width, side='right'))
+        hi = self._first + int(np.searchsorted(starts, t1, side='right'))
+        data = {name: column[lo:hi] for name, column in self._data.items()}
+        min_first = data['min_ts'] <= data['max_ts']
+        ts = np.column_stack([np.where(min_first, data['min_ts'], data['max_ts']),
+                              np.where(min_first, data['max_ts'], data['min_ts'])]).ravel()
+        values = np.column_stack([np.where(min_first, data['min'], data['max']),
+                                  np.where(min_first, data['max'], data['min'])]).ravel()
+        # A bucket whose min and max are one point appears once
+        keep = np.ones(len(ts), dtype=bool)
+        keep[1::2] = data['min_ts'] != data['max_ts']
+        return ts[keep], values[keep]
+
+    def _append(self, new):
+        n = len(new['start'])
+        if not n:
+            return
+        if self._end + n > len(self._data['start']):
+            # Compact trimmed buckets away, growing if that is not enough
+            size = len(self)
+            capacity = max(len(self._data['start']), 2 * (size + n))
+            for name, dtype in self.COLUMNS:
+                column = np.empty(capacity, dtype)
+                column[:size] = self._data[name][self._first:self._end]
+                self._data[name] = column
+            self._first, self._end = 0, size
+        for name, column in new.items():
+            self._data[name][self._end:self._end + n] = column
+        self._end += n
+
+class SeriesDownsampler:
+    """Downsampled views of one column of a TimeSeriesStore source, per key
+
+    Each key gets a pyramid of min/max levels, extended from new history
+    rows only, so a view of any range costs a slice of the coarsest level
+    that still has enough buckets plus a final reduction to the viewport's
+    pixel width. Ranges holding few enough raw rows are returned as is.
+    """
+
+    def __init__(self, store, source, column, reducer='minmax'):
+        self.store = store
+        self.source = source
+        self.column = column
+        self.reduce = REDUCERS[reducer]
+        self.levels = [PYRAMID_BASE_MS * PYRAMID_FACTOR ** level for level in range(1, PYRAMID_LEVELS + 1)]
+        self._pyramids = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    def view(self, key, width, t0=None, t1=None):
+        """Get (timestamps, values) of key between t0 and t1 (epoch ms, None = open) for `width` pixels"""
+        buffer = self.store.buffer(self.source, key)
+        if buffer is None or not len(buffer):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        timestamps, columns = buffer.window()
+        lo = 0 if t0 is None else int(np.searchsorted(timestamps, t0, side='left'))
+        hi = len(timestamps) if t1 is None else int(np.searchsorted(timestamps, t1, side='right'))
+        # One point either side keeps lines running to the edges of the view
+        lo, hi = max(0, lo - 1), min(len(timestamps), hi + 1)
+        if hi - lo <= 2 * width:
+            return timestamps[lo:hi].copy(), columns[self.column][lo:hi].copy()
+
+        t0 = int(timestamps[lo]) if t0 is None else t0
+        t1 = int(timestamps[hi - 1]) if t1 is None else t1
+        with self._lock:
+            pyramid = self._catch_up(key, buffer)
+            # Finest level with at most 4 buckets per pixel in the range
+            level = next((level for level in pyramid if (t1 - t0) / level.width <= 4 * width), pyramid[-1])
+            ts, values = level.points(t0, t1)
+        if len(ts) >= hi - lo:
+            # Sparse rows (e.g. outside market hours): the raw range is already smaller
+            ts, values = timestamps[lo:hi], columns[self.column][lo:hi]
+        first, last = lo, hi - 1
+        # Buckets overlapping the range edges hold points from outside it, which would
+        # make the line double back once the edge rows are added
+        keep = ~np.isnan(values) & (ts >= timestamps[first]) & (ts <= timestamps[last])
+        ts, values = self.reduce(ts[keep], values[keep], width)
+        # Always end on the range's first and last rows, so lines reach the edges and the live end
+        if not len(ts) or ts[0] > timestamps[first]:
+            ts, values = np.append(timestamps[first], ts), np.append(columns[self.column][first], values)
+        if ts[-1] < timestamps[last]:
+            ts, values = np.append(ts, timestamps[last]), np.append(values, columns[self.column][last])
+        return ts.copy(), values.copy()
+
+    def _catch_up(self, key, buffer):
+        """Fold history rows added since the last call into key's pyramid (lock held)"""
+        pyramid = self._pyramids.get(key)
+        if pyramid is None:
+            pyramid = self._pyramids[key] = [MinMaxLevel(width) for width in self.levels]
+        timestamps, columns = buffer.since(self._cursors.get(key, -1))
+        if len(timestamps):
+            values = columns[self.column]
+            keep = ~np.isnan(values)
+            if keep.any():
+                for level in pyramid:
+                    level.add(timestamps[keep], values[keep])
+            self._cursors[key] = int(timestamps[-1])
+        oldest = buffer.window()[0][:1]
+        if len(oldest):
+            for level in pyramid:
+                level.trim(int(oldest[0]))
+        return pyramid
@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import config
+import metrics
+
+FETCH_SECONDS = metrics.histogram('dashboard_fetch_seconds', "Time to fetch one source", ('source',))
+PUBLISH_SECONDS = metrics.histogram('dashboard_publish_seconds', "Time to publish one source's data", ('source',))
+FETCHES = metrics.counter('dashboard_fetches_total', "Source fetches by outcome", ('source', 'outcome'))
+
+class FetchEngine:
+    """Run data source fetches concurrently with per-source and per-cycle deadlines"""
+
+    def __init__(self, max_workers=None, source_timeouts=None, cycle_deadline=None):
+        self.source_timeouts = source_timeouts or config.SOURCE_TIMEOUTS
+        self.cycle_deadline = cycle_deadline or config.CYCLE_DEADLINE
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.FETCH_WORKERS,
+            thread_name_prefix='fetch'
+        )
+
+        # Latest future per source, so a hung upstream never piles up workers
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, fetch, publish):
+        """Fetch and publish one source in the pool
+
+        Returns None if the previous fetch for this source is still running.
+        """
+        with self._lock:
+            running = self._in_flight.get(name)
+            if running is not None and not running.done():
+                return None
+            future = self.executor.submit(self._fetch_and_publish, name, fetch, publish)
+            self._in_flight[name] = future
+            return future
+
+    def _fetch_and_publish(self, name, fetch, publish):
+        try:
+            with FETCH_SECONDS.time(source=name):
+                data = fetch()
+            # Publish from the worker so each source lands as soon as it arrives;
+            # None means there is nothing new to publish
+            if data is not None:
+                with PUBLISH_SECONDS.time(source=name):
+                    publish(data)
+        except Exception as e:
+            FETCHES.inc(source=name, outcome='error')
+            print(f"{name} fetch failed: {e}")
+            raise
+        FETCHES.inc(source=name, outcome='ok')
+
+    def run_cycle(self, jobs):
+        """Run one update cycle and return a status per source
+
+        jobs maps a source name to a (fetch, publish) pair. The cycle waits for
+        each source until its own deadline, never past the cycle deadline.
+        Sources still running at their deadline keep going in the background
+        and publish whenever they finish; they are skipped as 'busy' in the
+        following cycles until then.
+        """
+        start = time.monotonic()
+        cycle_end = start + self.cycle_deadline
+
+        status = {}
+        pending = {}
+        for name, (fetch, publish) in jobs.items():
+            future = self.submit(name, fetch, publish)
+            if future is None:
+                status[name] = 'busy'
+                continue
+            deadline = min(start + self.source_timeouts.get(name, self.cycle_deadline), cycle_end)
+            pending[future] = (name, deadline)
+
+        while pending:
+            now = time.monotonic()
+            for future, (name, deadline) in list(pending.items()):
+                if future.done():
+                    status[name] = 'error' if future.exception() else 'ok'
+                    del pending[future]
+                elif now >= deadline:
+                    status[name] = 'timeout'
+                    del pending[future]
+
+            if pending:
+                next_deadline = min(deadline for _, deadline in pending.values())
+                wait(list(pending), timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+        return status
+
+    def shutdown(self):
+        """Stop accepting work without waiting for running fetches"""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+import numpy as np
+from records import decode_record
+from snapshot import SOURCES, snapshot_to_dict
+
+LATEST_FILE = 'latest.json'
+SCHEMA_FILE = 'schema.json'
+# Directory name for series without a key (news, crypto)
+NO_KEY = '_'
+# Directory of the headline log, one JSON lines file per day
+HEADLINES_DIR = 'headlines'
+
+class HistoryArchive:
+    """Append-only on-disk history, one directory per series and one file per day
+
+    Each day file holds fixed-size binary rows (int64 epoch-ms timestamp plus
+    one float64 per column), so it can be memory-mapped straight back into
+    the ring buffers on startup instead of being parsed. Rows are buffered
+    in memory and written in batches by flush().
+
+    Every batch of scraped headlines is logged too, as a [ts, titles] line,
+    so any process replaying the log in order builds the same NewsStore.
+    """
+
+    def __init__(self, root, schemas, retention_days):
+        self.root = root
+        self.schemas = schemas
+        self.retention_days = retention_days
+        self.dtypes = {
+            source: np.dtype([('ts', '<i8')] + [(name, '<f8') for name in columns])
+            for source, columns in schemas.items()
+        }
+        self._pending = {}
+        self._pending_headlines = []
+        self._lock = threading.Lock()
+        self._pruned_on = None
+        # Rows already loaded per day file, for tail_into
+        self._offsets = {}
+        # Bytes already replayed per headline log file, for headlines_into
+        self._headline_offsets = {}
+
+    def record(self, source, key, ts, values):
+        """Queue one row for the next flush"""
+        row = (ts,) + tuple(np.nan if value is None else value
+                            for value in map(values.get, self.schemas[source]))
+        with self._lock:
+            self._pending.setdefault((source, key), []).append(row)
+
+    def record_headlines(self, titles, ts):
+        """Queue one batch of headlines seen at ts for the next flush"""
+        with self._lock:
+            self._pending_headlines.append((ts, list(titles)))
+
+    def flush(self, snapshot=None):
+        """Write queued rows (and the latest records from snapshot) to disk"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            headlines, self._pending_headlines = self._pending_headlines, []
+
+        for (source, key), rows in pending.items():
+            rows = np.array(rows, dtype=self.dtypes[source])
+            directory = self._series_dir(source, key)
+            os.makedirs(directory, exist_ok=True)
+            self._write_schema(directory, source)
+
+            # Split the batch by day partition
+            days = [self._day(ts) for ts in rows['ts'].tolist()]
+            start = 0
+            for i in range(1, len(days) + 1):
+                if i == len(days) or days[i] != days[start]:
+                    with open(os.path.join(directory, f"{days[start]}.bin"), 'ab') as f:
+                        f.write(rows[start:i].tobytes())
+                    start = i
+
+        if headlines:
+            directory = os.path.join(self.root, HEADLINES_DIR)
+            os.makedirs(directory, exist_ok=True)
+            for ts, titles in headlines:
+                with open(os.path.join(directory, f"{self._day(ts)}.jsonl"), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps([ts, titles]) + '\n')
+
+        if snapshot is not None:
+            self._write_latest(snapshot)
+
+        if self._pruned_on != date.today():
+            self.prune()
+
+    def prune(self):
+        """Delete day files older than the retention window"""
+        cutoff = (date.today() - timedelta(days=self.retention_days)).isoformat()
+        for directory in self._series_dirs():
+            for name in os.listdir(directory):
+                if name.endswith('.bin') and name[:-4] < cutoff:
+                    path = os.path.join(directory, name)
+                    os.remove(path)
+                    self._offsets.pop(path, None)
+        headlines_dir = os.path.join(self.root, HEADLINES_DIR)
+        if os.path.isdir(headlines_dir):
+            for name in os.listdir(headlines_dir):
+                if name.endswith('.jsonl') and name[:-6] < cutoff:
+                    path = os.path.join(headlines_dir, name)
+                    os.remove(path)
+                    self._headline_offsets.pop(path, None)
+        self._pruned_on = date.today()
+
+    def load_into(self, store):
+        """Warm-start a TimeSeriesStore from the newest day files"""
+        for source, key, directory in self._series():
+            if not self._schema_matches(directory, source):
+                continue
+            dtype = self.dtypes[source]
+            capacity = store.capacities[source]
+
+            # Map day files from newest to oldest until the buffer is full
+            mapped = []
+            count = 0
+            for name in self._day_files(directory, reverse=True):
+                path = os.path.join(directory, name)
+                rows = os.path.getsize(path) // dtype.itemsize
+                self._offsets[path] = rows
+                if rows and count < capacity:
+                    mapped.append(np.memmap(path, dtype=dtype, mode='r', shape=(rows,)))
+                    count += rows
+            if not mapped:
+                continue
+
+            rows = mapped[0] if len(mapped) == 1 else np.concatenate(mapped[::-1])
+            rows = rows[-capacity:]
+            store.extend(source, key, rows['ts'], {name: rows[name] for name in self.schemas[source]})
+
+    def tail_into(self, store):
+        """Append rows another process wrote since the last load_into/tail_into call"""
+        for source, key, directory in self._series():
+            if not self._schema_matches(directory, source):
+                continue
+            dtype = self.dtypes[source]
+            for name in self._day_files(directory):
+                path = os.path.join(directory, name)
+                # A row still being written is left for the next call
+                rows = os.path.getsize(path) // dtype.itemsize
+                offset = self._offsets.get(path, 0)
+                if rows > offset:
+                    new_rows = np.memmap(path, dtype=dtype, mode='r', offset=offset * dtype.itemsize,
+                                         shape=(rows - offset,))
+                    store.extend(source, key, new_rows['ts'], {name: new_rows[name] for name in self.schemas[source]})
+                    self._offsets[path] = rows
+
+    def headlines_into(self, news_store):
+        """Add the headline batches logged since the last call (all of them on the first) to a NewsStore"""
+        directory = os.path.join(self.root, HEADLINES_DIR)
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(name for name in os.listdir(directory) if name.endswith('.jsonl')):
+            path = os.path.join(directory, name)
+            offset = self._headline_offsets.get(path, 0)
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+            # A line still being written is left for the next call
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                try:
+                    ts, titles = json.loads(line)
+                except ValueError:
+                    continue
+                news_store.add(titles, ts)
+            self._headline_offsets[path] = offset + end
+
+    def load_latest(self):
+        """Get the latest record per source (and snapshot version) saved by the previous run, or {}"""
+        path = os.path.join(self.root, LATEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                latest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"History warm start failed: {e}")
+            return {}
+
+        records = {'version': latest.get('version', 0)}
+        fields = latest.get('fields', {})
+        for source in SOURCES:
+            value = latest.get(source)
+            if source in ('weather', 'stocks', 'crypto'):
+                # Keyed sources are saved as lists of records; older versions saved some as one record
+                if not isinstance(value, list) or not all(isinstance(record, (list, dict)) for record in value):
+                    value = [value] if value else []
+                records[source] = [record for record in (decode_record(source, record, fields.get(source))
+                                                         for record in value) if record is not None]
+            elif value is not None:
+                records[source] = decode_record(source, value, fields.get(source))
+        return records
+
+    def _write_latest(self, snapshot):
+        latest = snapshot_to_dict(snapshot)
+        path = os.path.join(self.root, LATEST_FILE)
+        os.makedirs(self.root, exist_ok=True)
+        # Write then rename so a crash never leaves a half-written file
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(latest, f)
+        os.replace(path + '.tmp', path)
+
+    def _write_schema(self, directory, source):
+        path = os.path.join(directory, SCHEMA_FILE)
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(list(self.schemas[source]), f)
+
+    def _schema_matches(self, directory, source):
+        try:
+            with open(os.path.join(directory, SCHEMA_FILE), encoding='utf-8') as f:
+                return tuple(json.load(f)) == tuple(self.schemas[source])
+        except (OSError, ValueError):
+            return False
+
+    def _series_dir(self, source, key):
+        return os.path.join(self.root, source, NO_KEY if key is None else str(key))
+
+    def _series(self):
+        for source in self.schemas:
+            source_dir = os.path.join(self.root, source)
+            if not os.path.isdir(source_dir):
+                continue
+            for name in os.listdir(source_dir):
+                directory = os.path.join(source_dir, name)
+                if os.path.isdir(directory):
+                    yield source, None if name == NO_KEY else name, directory
+
+    @staticmethod
+    def _day_files(directory, reverse=False):
+        return sorted((name for name in os.listdir(directory) if name.endswith('.bin')), reverse=reverse)
+
+    def _series_dirs(self):
+        return [directory for _, _, directory in self._series()]
+
+    @staticmethod
+    def _day(ts):
+        return datetime.fromtimestamp(ts / 1000).date().isoformat()
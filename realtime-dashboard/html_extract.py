@@ -0,0 +1,86 @@
+import codecs
+from html.parser import HTMLParser
+
+# Bytes fed to the tokenizer at a time; extraction stops between chunks once the limit is hit
+CHUNK_SIZE = 16384
+
+class _LimitReached(Exception):
+    pass
+
+class ExtractionRule:
+    """Compiled extraction rule from config.SCRAPE_RULES
+
+    Items are the text of the first `item` tag inside each `container`
+    element, where container is (tag, class) and class may be None.
+    """
+
+    def __init__(self, container, item='a', limit=10):
+        self.container_tag, self.container_class = container
+        self.item_tag = item
+        self.limit = limit
+
+    @classmethod
+    def from_config(cls, rule):
+        return cls(tuple(rule['container']), rule.get('item', 'a'), rule.get('limit', 10))
+
+    def matches_container(self, tag, attrs):
+        if tag != self.container_tag:
+            return False
+        if self.container_class is None:
+            return True
+        for name, value in attrs:
+            if name == 'class' and value and self.container_class in value.split():
+                return True
+        return False
+
+class _RuleParser(HTMLParser):
+    """SAX-style tokenizer that collects items for one rule and stops at the limit"""
+
+    def __init__(self, rule):
+        super().__init__(convert_charrefs=True)
+        self.rule = rule
+        self.items = []
+        self._container_depth = 0
+        self._took_item = False
+        self._text = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._container_depth:
+            if tag == self.rule.container_tag:
+                self._container_depth += 1
+            elif tag == self.rule.item_tag and not self._took_item and self._text is None:
+                self._text = []
+        elif self.rule.matches_container(tag, attrs):
+            self._container_depth = 1
+            self._took_item = False
+
+    def handle_endtag(self, tag):
+        if not self._container_depth:
+            return
+        if tag == self.rule.item_tag and self._text is not None:
+            text = ''.join(self._text).strip()
+            self._text = None
+            self._took_item = True
+            if text:
+                self.items.append(text)
+                if len(self.items) >= self.rule.limit:
+                    raise _LimitReached()
+        elif tag == self.rule.container_tag:
+            self._container_depth -= 1
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+def extract_items(content, rule, encoding='utf-8'):
+    """Extract item texts from HTML bytes or str, stopping once rule.limit items are found"""
+    parser = _RuleParser(rule)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    try:
+        for start in range(0, len(content), CHUNK_SIZE):
+            chunk = content[start:start + CHUNK_SIZE]
+            parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        parser.close()
+    except _LimitReached:
+        pass
+    return parser.items
@@ -0,0 +1,172 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class CachedResponse:
+    """Response body and validators kept by HttpCache"""
+
+    __slots__ = ('url', 'status_code', 'content', 'etag', 'last_modified', 'fetched_at', 'version')
+
+    def __init__(self, url, status_code, content, etag=None, last_modified=None, version=0):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time()
+        # Bumped whenever the body changes, so callers can reuse parsed results
+        self.version = version
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def to_dict(self):
+        """JSON-safe form for the disk cache; the body is base64 encoded"""
+        return {
+            'url': self.url,
+            'status': self.status_code,
+            'headers': {'ETag': self.etag, 'Last-Modified': self.last_modified},
+            'fetched_at': self.fetched_at,
+            'version': self.version,
+            'body': base64.b64encode(self.content).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        headers = data['headers']
+        entry = cls(data['url'], data['status'], base64.b64decode(data['body']),
+                    headers.get('ETag'), headers.get('Last-Modified'), data['version'])
+        entry.fetched_at = data['fetched_at']
+        return entry
+
+class HttpCache:
+    """Shared HTTP cache with per-call TTL, conditional revalidation and LRU eviction
+
+    Within its TTL an entry is served without a request. After that it is
+    revalidated with If-None-Match / If-Modified-Since, and a 304 keeps the
+    cached body. Entries are optionally mirrored to cache_dir so they survive
+    restarts.
+    """
+
+    def __init__(self, session, max_entries=128, cache_dir=None):
+        self.session = session
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, url, params=None, ttl=0, timeout=None):
+        """GET url through the cache; returns a CachedResponse"""
+        key = self._key(url, params)
+        entry = self._lookup(key)
+
+        if entry is not None and time.time() - entry.fetched_at < ttl:
+            with self._lock:
+                self.hits += 1
+            return entry
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            entry.fetched_at = time.time()
+            with self._lock:
+                self.revalidated += 1
+            self._store(key, entry)
+            return entry
+
+        with self._lock:
+            self.misses += 1
+        fresh = CachedResponse(
+            url=url,
+            status_code=response.status_code,
+            content=response.content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            version=entry.version + 1 if entry is not None else 1
+        )
+        # Errors are passed through but never cached
+        if response.status_code == 200:
+            self._store(key, fresh)
+        return fresh
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self.cache_dir:
+            entry = self._load(key)
+            if entry is not None:
+                self._store(key, entry, persist=False)
+            return entry
+        return None
+
+    def _store(self, key, entry, persist=True):
+        evicted = []
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+
+        if self.cache_dir:
+            if persist:
+                self._save(key, entry)
+            for old_key in evicted:
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return CachedResponse.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, partly written or from an older format: fetch it again
+            return None
+
+    def _save(self, key, entry):
+        path = self._path(key)
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(entry.to_dict(), f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"HTTP cache write failed: {e}")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _key(url, params):
+        # Hashed so API keys in the query string never end up in file names
+        query = '&'.join(f"{name}={value}" for name, value in sorted((params or {}).items()))
+        return hashlib.sha1(f"{url}?{query}".encode('utf-8')).hexdigest()
@@ -0,0 +1,86 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+import config
+import metrics
+from http_cache import HttpCache
+
+UPSTREAM_SECONDS = metrics.histogram('dashboard_upstream_request_seconds', "Upstream HTTP request time", ('host',))
+UPSTREAM_REQUESTS = metrics.counter(
+    'dashboard_upstream_requests_total', "Upstream HTTP requests by status class (or 'error')", ('host', 'status'))
+
+class InstrumentedSession(requests.Session):
+    """Session that times every request and counts outcomes per upstream host"""
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlsplit(url).hostname or 'unknown'
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            UPSTREAM_REQUESTS.inc(host=host, status='error')
+            raise
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, host=host)
+        UPSTREAM_REQUESTS.inc(host=host, status=f"{response.status_code // 100}xx")
+        return response
+
+_session = None
+_cache = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Get the keep-alive HTTP session shared by all data sources"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = InstrumentedSession()
+                # Pool sized for the fetch workers plus batched stock requests
+                adapter = HTTPAdapter(
+                    pool_connections=config.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=config.HTTP_POOL_MAXSIZE
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({'User-Agent': config.HTTP_USER_AGENT})
+                _session = session
+    return _session
+
+def get_cache():
+    """Get the HTTP cache shared by all data sources"""
+    global _cache
+    if _cache is None:
+        session = get_session()
+        with _session_lock:
+            if _cache is None:
+                _cache = HttpCache(
+                    session,
+                    max_entries=config.HTTP_CACHE_MAX_ENTRIES,
+                    cache_dir=config.HTTP_CACHE_DIR
+                )
+    return _cache
+
+class RateLimiter:
+    """Token bucket shared by threads: `rate` calls per second with bursts up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller may make one call"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve a token even if it is not there yet; the debt is the wait
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
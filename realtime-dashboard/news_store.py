@@ -0,0 +1,131 @@
+import hashlib
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from typing import NamedTuple
+
+# Words are runs of letters and digits, matched case-insensitively
+WORD = re.compile(r"[^\W_]+")
+
+class Headline(NamedTuple):
+    id: int
+    title: str
+    first_seen: int  # epoch ms
+    last_seen: int   # epoch ms
+
+def title_key(title):
+    """64-bit hash of a title, ignoring case and whitespace differences"""
+    normalized = ' '.join(title.casefold().split())
+    return int.from_bytes(hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def tokenize(text):
+    return WORD.findall(text.casefold())
+
+class NewsStore:
+    """Deduplicated headlines with a keyword index, holding at most `capacity`
+
+    Each headline is stored once under the hash of its title; seeing it
+    again only moves its last_seen. Ids increase with every new headline
+    and the oldest is evicted past capacity, so the live ids are always one
+    contiguous range and every posting list of the inverted index (word ->
+    ids containing it) is sorted oldest first. Filtering intersects the
+    posting lists of the query words, the last word matching as a prefix
+    while it is still being typed.
+    """
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        # Bumped whenever a new headline arrives
+        self.version = 0
+        self._items = {}
+        self._ids = {}
+        self._postings = {}
+        # Sorted words of the index, for prefix matches
+        self._vocabulary = []
+        self._first = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, titles, ts):
+        """Add headlines seen at ts (epoch ms); returns how many were new"""
+        added = 0
+        with self._lock:
+            for title in titles:
+                key = title_key(title)
+                known = self._ids.get(key)
+                if known is not None:
+                    self._items[known] = self._items[known]._replace(last_seen=ts)
+                    continue
+                headline_id = self._next
+                self._next += 1
+                self._items[headline_id] = Headline(headline_id, title, ts, ts)
+                self._ids[key] = headline_id
+                for word in set(tokenize(title)):
+                    posting = self._postings.get(word)
+                    if posting is None:
+                        posting = self._postings[word] = deque()
+                        insort(self._vocabulary, word)
+                    posting.append(headline_id)
+                added += 1
+                if len(self._items) > self.capacity:
+                    self._evict_oldest()
+            if added:
+                self.version += 1
+        return added
+
+    def query(self, text='', offset=0, limit=20):
+        """Get (matching count, up to limit headlines from offset), newest first
+
+        An empty text matches every headline.
+        """
+        words = tokenize(text)
+        with self._lock:
+            if not words:
+                newest = self._next - 1 - offset
+                oldest = max(newest - limit, self._first - 1)
+                return len(self._items), [self._items[i] for i in range(newest, oldest, -1)]
+            ids = self._match(words, prefix=not text[-1:].isspace())
+            if isinstance(ids, deque):
+                # A single posting list is already in id order
+                page = [ids[i] for i in range(len(ids) - 1 - offset, max(len(ids) - 1 - offset - limit, -1), -1)]
+            else:
+                page = heapq.nlargest(offset + limit, ids)[offset:]
+            return len(ids), [self._items[i] for i in page]
+
+    def _match(self, words, prefix):
+        """Ids holding every word, as a posting list or a set (lock held)"""
+        matches = []
+        for i, word in enumerate(words):
+            if prefix and i == len(words) - 1:
+                lo = bisect_left(self._vocabulary, word)
+                hi = bisect_left(self._vocabulary, word + '\uffff', lo)
+                if hi - lo == 1:
+                    ids = self._postings[self._vocabulary[lo]]
+                else:
+                    ids = set().union(*(self._postings[w] for w in self._vocabulary[lo:hi]))
+            else:
+                ids = self._postings.get(word, ())
+            if not ids:
+                return ()
+            matches.append(ids)
+        if len(matches) == 1:
+            return matches[0]
+        matches.sort(key=len)
+        return set(matches[0]).intersection(*matches[1:])
+
+    def _evict_oldest(self):
+        headline = self._items.pop(self._first)
+        del self._ids[title_key(headline.title)]
+        for word in set(tokenize(headline.title)):
+            posting = self._postings[word]
+            # The oldest live headline heads every posting list it is in
+            posting.popleft()
+            if not posting:
+                del self._postings[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+        self._first += 1
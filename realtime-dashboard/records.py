@@ -0,0 +1,120 @@
+import time
+from datetime import datetime
+from typing import NamedTuple, Tuple
+
+def now_ms():
+    """Current time as epoch milliseconds"""
+    return time.time_ns() // 1000000
+
+def format_time(ts, fmt='%H:%M:%S'):
+    """Format an epoch-ms timestamp in local time"""
+    return datetime.fromtimestamp(ts / 1000).strftime(fmt)
+
+# Records are immutable tuples: no per-instance dict, safe to share between
+# snapshots and threads, and serialized as plain JSON arrays. get() lets them
+# stand in wherever a {column: value} mapping is read (history appends, alert rules).
+
+def record_get(record, name, default=None):
+    """The get() method of every record type"""
+    return getattr(record, name, default)
+
+class WeatherRecord(NamedTuple):
+    """One city's weather observation"""
+    city: str
+    temperature: float
+    humidity: float
+    pressure: float
+    description: str
+    timestamp: int
+
+    get = record_get
+
+class StockRecord(NamedTuple):
+    """Latest price of one symbol"""
+    symbol: str
+    price: float
+    change: float
+    change_percent: float
+    volume: float
+    timestamp: int
+
+    get = record_get
+
+class NewsRecord(NamedTuple):
+    """Latest headlines"""
+    news_count: int
+    latest_titles: Tuple[str, ...]
+    timestamp: int
+
+    get = record_get
+
+class CryptoRecord(NamedTuple):
+    """Latest trade of one crypto asset"""
+    asset: str
+    price: float
+    change_24h: float
+    volume_24h: float
+    timestamp: int
+
+    get = record_get
+
+class OHLCBar(NamedTuple):
+    """One open/high/low/close bar; timestamp is the start of its interval"""
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    timestamp: int
+
+    get = record_get
+
+class SystemSample(NamedTuple):
+    """One reading of host and dashboard process metrics"""
+    cpu_percent: float
+    memory_percent: float
+    disk_percent: float
+    process_cpu_percent: float
+    process_rss: int
+    process_threads: int
+    timestamp: int
+
+    get = record_get
+
+RECORD_TYPES = {
+    'weather': WeatherRecord,
+    'stocks': StockRecord,
+    'news': NewsRecord,
+    'crypto': CryptoRecord
+}
+
+def encode_record(record):
+    """JSON-ready form of a record: its values as a list, in field order"""
+    return None if record is None else list(record)
+
+def decode_record(source, data, fields=None):
+    """Rebuild a record from encode_record output
+
+    fields is the field order the data was written with; if it differs from
+    the current record type, values are matched by name. Dicts with ISO
+    timestamps written by older versions are accepted too. Returns None for
+    data missing one of the record type's fields.
+    """
+    if data is None:
+        return None
+    record_type = RECORD_TYPES[source]
+    if isinstance(data, dict):
+        values = dict(data)
+        if isinstance(values.get('timestamp'), str):
+            values['timestamp'] = int(datetime.fromisoformat(values['timestamp']).timestamp() * 1000)
+    elif fields is not None and tuple(fields) != record_type._fields:
+        values = dict(zip(fields, data))
+    else:
+        record = record_type(*data)
+        return record._replace(latest_titles=tuple(record.latest_titles)) if source == 'news' else record
+
+    if any(name not in values for name in record_type._fields):
+        return None
+    if source == 'news':
+        values['latest_titles'] = tuple(values['latest_titles'] or ())
+    return record_type(**{name: values[name] for name in record_type._fields})
@@ -0,0 +1,78 @@
+import json
+import threading
+from collections import OrderedDict
+from plotly.io.json import to_json_plotly
+
+class RenderedPanel:
+    """Panel output serialized once: the JSON text plus the equivalent plain data"""
+
+    __slots__ = ('json', 'value')
+
+    def __init__(self, component):
+        self.json = to_json_plotly(component)
+        # Plain dicts and lists: returning these from a callback skips the component tree walk
+        self.value = json.loads(self.json)
+
+class RenderCache:
+    """Bounded LRU cache of rendered output shared by every session
+
+    Keys include the data version the output was rendered from, so entries
+    never go stale; old versions simply age out. Concurrent requests for a
+    key that is being rendered wait for that render instead of repeating it.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._rendering = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """Get the cached result for key, calling render() on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            done = self._rendering.get(key)
+            if done is None:
+                done = self._rendering[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            done.wait()
+            with self._lock:
+                if key in self._entries:
+                    self.hits += 1
+                    return self._entries[key]
+            # The render failed or was already evicted; do our own
+            return render()
+
+        try:
+            value = render()
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._rendering.pop(key, None)
+            done.set()
+
+    def panel(self, name, version, render):
+        """Get panel name rendered from data version as a RenderedPanel"""
+        return self.get((name, version), lambda: RenderedPanel(render()))
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
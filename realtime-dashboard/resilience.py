@@ -0,0 +1,102 @@
+import threading
+import time
+import metrics
+
+REJECTED = metrics.counter('dashboard_circuit_rejected_total', "Upstream calls failed fast by an open circuit", ('breaker',))
+TRANSITIONS = metrics.counter('dashboard_circuit_transitions_total', "Circuit breaker state changes", ('breaker', 'state'))
+
+# Breakers by name, for the state gauge; a newer breaker of the same name replaces the old one
+_breakers = {}
+
+class SourceUnavailable(Exception):
+    """The upstream was not asked (nothing was waited on); its last good data still applies"""
+
+class CircuitOpenError(SourceUnavailable):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+class CircuitBreaker:
+    """Fail fast on an upstream that keeps failing
+
+    closed: calls go through; failure_threshold failures in a row open the
+    circuit. open: calls raise CircuitOpenError without touching the
+    upstream. half-open: once reset_timeout seconds have passed, one probe
+    call at a time goes through; a success closes the circuit, a failure
+    opens it again with the timeout doubled, up to max_reset_timeout.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30, max_reset_timeout=600):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        # Consecutive failed probes, which double the time the circuit stays open
+        self.trips = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        _breakers[name] = self
+
+    @property
+    def retry_in(self):
+        """Seconds until the next probe may go through (0 unless open)"""
+        if self.state != self.OPEN:
+            return 0.0
+        timeout = min(self.reset_timeout * 2 ** max(self.trips - 1, 0), self.max_reset_timeout)
+        return max(0.0, self.opened_at + timeout - time.monotonic())
+
+    def allow(self):
+        """Whether a call may go to the upstream now; a True in half-open state is the probe"""
+        with self._lock:
+            if self.state == self.OPEN and not self.retry_in:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._probing = False
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    self.opened_at = time.monotonic()
+                    self._set_state(self.OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker; any exception it raises counts as a failure"""
+        if not self.allow():
+            REJECTED.inc(breaker=self.name)
+            raise CircuitOpenError(f"{self.name} circuit open, retrying in {self.retry_in:.0f}s")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def _set_state(self, state):
+        self.state = state
+        TRANSITIONS.inc(breaker=self.name, state=state)
+        print(f"{self.name} circuit {state.replace('_', '-')}")
+
+STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+metrics.gauge('dashboard_circuit_state', "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+              lambda: {name: STATE_VALUES[breaker.state] for name, breaker in _breakers.items()}, ('breaker',))
@@ -8,34 +8,32 @@ Real-time Data Visualization Dashboard Launcher Script
 import os
 import sys
 import subprocess
-import time
+from importlib.util import find_spec
+
+# Modules the dashboard imports at runtime
+REQUIRED_MODULES = ['dash', 'plotly', 'numpy', 'requests', 'psutil', 'dotenv']
 
 def check_requirements():
     """Check and install necessary dependencies"""
     print("🔍 Checking dependencies...")
     
-    try:
-        import dash
-        import plotly
-        import pandas
-        import requests
-        import bs4
-        import yfinance
-        import psutil
+    # find_spec locates modules without importing them, so the app's own import stays the only one
+    missing = [name for name in REQUIRED_MODULES if find_spec(name) is None]
+    if not missing:
         print("✅ All dependencies installed")
         return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
-        print("📦 Auto-installing dependencies...")
-        
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-            print("✅ Dependencies installed successfully")
-            return True
-        except subprocess.CalledProcessError:
-            print("❌ Failed to install dependencies")
-            print("💡 Please run manually: pip install -r requirements.txt")
-            return False
+    
+    print(f"❌ Missing dependency: {', '.join(missing)}")
+    print("📦 Auto-installing dependencies...")
+    
+    try:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        print("✅ Dependencies installed successfully")
+        return True
+    except subprocess.CalledProcessError:
+        print("❌ Failed to install dependencies")
+        print("💡 Please run manually: pip install -r requirements.txt")
+        return False
 
 def create_env_file():
     """Create environment variables file"""
@@ -70,7 +68,6 @@ def main():
     # Launch application
     try:
         print("🔥 LAUNCHING HACKER DASHBOARD...")
-        time.sleep(2)
         
         # Import and run main application
         from app import app
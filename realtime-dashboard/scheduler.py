@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+class _Job:
+    __slots__ = ('name', 'run', 'interval', 'failures', 'started')
+
+    def __init__(self, name, run, interval):
+        self.name = name
+        self.run = run
+        self.interval = interval
+        self.failures = 0
+        self.started = None
+
+class Scheduler:
+    """Run jobs at their own intervals from a single priority queue
+
+    Each job's next run is measured from the start of its previous run, so
+    slow jobs don't push the schedule back. A job may return a Future, in
+    which case it is rescheduled when the future completes and never runs
+    twice at once. Failures back off exponentially up to max_backoff;
+    returning None (e.g. still busy) reschedules without counting either way.
+    """
+
+    def __init__(self, jitter=0.1, max_backoff=900):
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self._jobs = {}
+        self._queue = []  # (due, tiebreak, name) on the monotonic clock
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def add(self, name, run, interval, delay=0):
+        """Schedule run() every interval seconds; interval may be a function returning seconds"""
+        self._jobs[name] = _Job(name, run, interval)
+        self._push(name, time.monotonic() + delay)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def next_run(self, name):
+        """Seconds until name is due, or None while it is running"""
+        with self._cond:
+            for due, _, queued in self._queue:
+                if queued == name:
+                    return max(0.0, due - time.monotonic())
+        return None
+
+    def _push(self, name, due):
+        with self._cond:
+            heapq.heappush(self._queue, (due, next(self._counter), name))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                _, _, name = heapq.heappop(self._queue)
+            self._start(self._jobs[name])
+
+    def _start(self, job):
+        job.started = time.monotonic()
+        try:
+            result = job.run()
+        except Exception as e:
+            print(f"{job.name} job failed: {e}")
+            self._finish(job, False)
+            return
+
+        if isinstance(result, Future):
+            result.add_done_callback(lambda future: self._finish(
+                job, not future.cancelled() and future.exception() is None))
+        else:
+            self._finish(job, result)
+
+    def _finish(self, job, ok):
+        if ok is True:
+            job.failures = 0
+        elif ok is False:
+            job.failures += 1
+
+        interval = job.interval() if callable(job.interval) else job.interval
+        if job.failures:
+            interval = min(interval * 2 ** job.failures, max(interval, self.max_backoff))
+            print(f"{job.name} failed {job.failures}x, retrying in {interval:.0f}s")
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        self._push(job.name, job.started + interval)
@@ -0,0 +1,109 @@
+import json
+import mmap
+import os
+import struct
+from snapshot import snapshot_from_dict, snapshot_to_dict
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): every process acts as its own producer
+    fcntl = None
+
+MAGIC = b'RTDASH01'
+# magic, sequence number, payload length
+HEADER = struct.Struct('<8sQQ')
+
+class SharedState:
+    """Single-producer snapshot exchange between processes
+
+    The process holding the producer lock polls the upstreams and writes each
+    snapshot into a memory-mapped file; every other process (web workers)
+    maps the same file read-only. Writes follow a seqlock protocol: the
+    sequence number is odd while a write is in progress, so readers retry
+    instead of seeing half a snapshot. Readers only decode when the sequence
+    number changes, and all requests in a worker share that one snapshot.
+    """
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.size = size
+        self.path = os.path.join(directory, 'snapshot.mmap')
+        self.is_producer = False
+        self._lock_file = None
+        self._mm = None
+        self._seq = 0
+        self._snapshot = None
+        os.makedirs(directory, exist_ok=True)
+
+    def try_become_producer(self):
+        """Take the producer lock if no other process holds it"""
+        if self.is_producer:
+            return True
+        lock_file = open(os.path.join(self.directory, 'producer.lock'), 'a+')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+
+        # Held until the process exits, which releases the lock for a reader to take over
+        self._lock_file = lock_file
+        self.is_producer = True
+        self._open_for_writing()
+        return True
+
+    def write(self, snapshot):
+        """Publish a snapshot to all readers (producer only)"""
+        payload = json.dumps(snapshot_to_dict(snapshot)).encode('utf-8')
+        if HEADER.size + len(payload) > self.size:
+            print(f"Shared snapshot too large ({len(payload)} bytes), raise SHARED_STATE_SIZE")
+            return
+
+        self._seq += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, self._seq, 0)
+        self._mm[HEADER.size:HEADER.size + len(payload)] = payload
+        self._seq += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, self._seq, len(payload))
+
+    def read(self):
+        """Get the newest complete snapshot, or None if nothing was written yet"""
+        if self._mm is None and not self._open_for_reading():
+            return None
+
+        for _ in range(100):
+            magic, seq, length = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or seq == 0:
+                return None
+            if seq == self._seq:
+                return self._snapshot
+            if seq % 2:
+                continue
+            payload = self._mm[HEADER.size:HEADER.size + length]
+            if HEADER.unpack_from(self._mm, 0)[1] != seq:
+                # The producer wrote while we copied; try again
+                continue
+            self._snapshot = snapshot_from_dict(json.loads(payload))
+            self._seq = seq
+            return self._snapshot
+        return self._snapshot
+
+    def _open_for_writing(self):
+        with open(self.path, 'a+b') as f:
+            f.truncate(self.size)
+        with open(self.path, 'r+b') as f:
+            self._mm = mmap.mmap(f.fileno(), self.size)
+        # Continue the old sequence so readers notice the first new write
+        magic, seq, _ = HEADER.unpack_from(self._mm, 0)
+        self._seq = seq + (seq % 2) if magic == MAGIC else 0
+
+    def _open_for_reading(self):
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self.size:
+                    return False
+                self._mm = mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ)
+            return True
+        except OSError:
+            return False
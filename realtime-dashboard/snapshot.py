@@ -0,0 +1,86 @@
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+from records import RECORD_TYPES, CryptoRecord, NewsRecord, StockRecord, WeatherRecord, decode_record, encode_record
+
+SOURCES = ('weather', 'stocks', 'news', 'crypto')
+
+class Snapshot(NamedTuple):
+    """Immutable view of the latest data from every source
+
+    A new snapshot replaces the old one with a single reference swap, so
+    readers never lock or copy. weather, stocks and crypto are keyed by
+    city, symbol and asset. version increases on every publish, and
+    versions holds the version at which each source last changed, so a
+    caller can skip work for sources it has already seen. stale maps each
+    source whose upstream is failing to the epoch ms it started failing;
+    that source keeps showing its last good records.
+    """
+    version: int
+    weather: Mapping[str, WeatherRecord]
+    stocks: Mapping[str, StockRecord]
+    news: Optional[NewsRecord]
+    crypto: Mapping[str, CryptoRecord]
+    versions: Mapping[str, int]
+    stale: Mapping[str, int]
+
+    def changed_since(self, versions):
+        """Get the sources that changed after the given per-source versions"""
+        return [source for source in SOURCES if self.versions[source] > versions.get(source, 0)]
+
+    def publish(self, source, value):
+        """Return the next snapshot with one source replaced (and no longer stale)"""
+        stale = self.stale
+        if source in stale:
+            stale = MappingProxyType({name: since for name, since in stale.items() if name != source})
+        return self._changed(source, **{source: value, 'stale': stale})
+
+    def mark_stale(self, source, since):
+        """Return the next snapshot with one source's records kept but flagged stale since `since`"""
+        return self._changed(source, stale=MappingProxyType({**self.stale, source: since}))
+
+    def _changed(self, source, **changes):
+        version = self.version + 1
+        versions = dict(self.versions)
+        versions[source] = version
+        return self._replace(version=version, versions=MappingProxyType(versions), **changes)
+
+EMPTY_SNAPSHOT = Snapshot(
+    version=0,
+    weather=MappingProxyType({}),
+    stocks=MappingProxyType({}),
+    news=None,
+    crypto=MappingProxyType({}),
+    versions=MappingProxyType({source: 0 for source in SOURCES}),
+    stale=MappingProxyType({})
+)
+
+def snapshot_to_dict(snapshot):
+    """JSON-ready form of a snapshot; records are value lists in the order given by 'fields'"""
+    return {
+        'version': snapshot.version,
+        'versions': dict(snapshot.versions),
+        'stale': dict(snapshot.stale),
+        'fields': {source: record_type._fields for source, record_type in RECORD_TYPES.items()},
+        'weather': [encode_record(record) for record in snapshot.weather.values()],
+        'stocks': [encode_record(record) for record in snapshot.stocks.values()],
+        'news': encode_record(snapshot.news),
+        'crypto': [encode_record(record) for record in snapshot.crypto.values()]
+    }
+
+def snapshot_from_dict(data):
+    """Rebuild a snapshot written by snapshot_to_dict"""
+    fields = data.get('fields', {})
+
+    def keyed(source, key):
+        records = (decode_record(source, record, fields.get(source)) for record in data[source])
+        return MappingProxyType({getattr(record, key): record for record in records if record is not None})
+
+    return Snapshot(
+        version=data['version'],
+        weather=keyed('weather', 'city'),
+        stocks=keyed('stocks', 'symbol'),
+        news=decode_record('news', data['news'], fields.get('news')),
+        crypto=keyed('crypto', 'asset'),
+        versions=MappingProxyType(data['versions']),
+        stale=MappingProxyType(data.get('stale', {}))
+    )
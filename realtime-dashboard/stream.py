@@ -0,0 +1,99 @@
+import json
+import threading
+from collections import deque
+from flask import Response
+from plotly.io.json import to_json_plotly
+import config
+
+# Increments kept for clients that fall behind between wakeups
+INCREMENT_BACKLOG = 64
+
+class StreamHub:
+    """Fan rendered panel updates out to server-sent event clients
+
+    The updater publishes rendered panels; each one is serialized once and
+    only kept if it differs from what was last published. Every connected
+    client then receives just the panels that changed since its last event.
+    
+    Incremental updates (such as a chart's extendData) are published as
+    increments instead: they are delivered in order to clients connected at
+    the time and never replayed to new ones.
+    """
+
+    def __init__(self, heartbeat=None):
+        self.heartbeat = heartbeat or config.STREAM_HEARTBEAT
+        self.version = 0
+        # output id -> (version, serialized {"prop": ..., "value": ...})
+        self._panels = {}
+        # (version, output id, serialized payload) of recent increments
+        self._increments = deque(maxlen=INCREMENT_BACKLOG)
+        self._condition = threading.Condition()
+
+    def publish(self, panels):
+        """Publish {output_id: (prop, value)} and wake clients if anything changed"""
+        self.publish_serialized({
+            output_id: (prop, to_json_plotly(value))
+            for output_id, (prop, value) in panels.items()
+        })
+
+    def publish_serialized(self, panels):
+        """Like publish, but each value is already JSON text"""
+        serialized = {
+            output_id: f'{{"prop":{json.dumps(prop)},"value":{value_json}}}'
+            for output_id, (prop, value_json) in panels.items()
+        }
+        with self._condition:
+            changed = {
+                output_id: payload for output_id, payload in serialized.items()
+                if self._panels.get(output_id, (0, None))[1] != payload
+            }
+            if not changed:
+                return
+            self.version += 1
+            for output_id, payload in changed.items():
+                self._panels[output_id] = (self.version, payload)
+            self._condition.notify_all()
+
+    def publish_increment(self, output_id, prop, value):
+        """Publish an update that applies on top of the previous ones"""
+        payload = to_json_plotly({'prop': prop, 'value': value})
+        with self._condition:
+            self.version += 1
+            self._increments.append((self.version, output_id, payload))
+            self._condition.notify_all()
+
+    def events(self):
+        """Generate SSE messages: all panels first, then only changed ones"""
+        seen = None
+        while True:
+            with self._condition:
+                if seen is not None:
+                    self._condition.wait_for(lambda: self.version > seen, timeout=self.heartbeat)
+                changed = [
+                    (output_id, payload) for output_id, (version, payload) in self._panels.items()
+                    if version > (seen or 0)
+                ]
+                increments = [
+                    (output_id, payload) for version, output_id, payload in self._increments
+                    if seen is not None and version > seen
+                ]
+                seen = self.version
+
+            messages = []
+            if changed:
+                body = ','.join(f"{json.dumps(output_id)}:{payload}" for output_id, payload in changed)
+                messages.append(f"data: {{{body}}}\n\n")
+            # One message per increment so they apply in order
+            for output_id, payload in increments:
+                messages.append(f"data: {{{json.dumps(output_id)}:{payload}}}\n\n")
+
+            # Comment line keeps proxies from closing idle connections
+            yield ''.join(messages) or ": keepalive\n\n"
+
+    def response(self):
+        """Flask view streaming events to one client"""
+        return Response(
+            self.events(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
@@ -0,0 +1,97 @@
+import os
+import platform
+import threading
+import time
+from collections import deque
+import psutil
+import config
+from records import SystemSample, now_ms
+
+# Numeric fields of a sample, and the short names alert rules may use for them
+SAMPLE_COLUMNS = SystemSample._fields[:-1]
+SAMPLE_ALIASES = {
+    'cpu': 'cpu_percent',
+    'memory': 'memory_percent',
+    'disk': 'disk_percent',
+    'process_cpu': 'process_cpu_percent',
+    'rss': 'process_rss',
+    'threads': 'process_threads'
+}
+
+class SystemSampler:
+    """Sample CPU, memory, disk and process metrics on a fixed schedule
+
+    Samples go into a small rolling buffer; readers only look at what is
+    already there, so no request ever waits on psutil.
+    """
+
+    def __init__(self, interval=None, history=None):
+        self.interval = interval or config.SYSTEM_SAMPLE_INTERVAL
+        self.samples = deque(maxlen=history or config.SYSTEM_SAMPLE_HISTORY)
+        self.version = 0
+        self.os_name = platform.system()
+        self.process = psutil.Process(os.getpid())
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, listener):
+        """Call listener(sample) after every sample, from the sampler thread"""
+        self._listeners.append(listener)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        # The first non-blocking cpu_percent call only sets the baseline
+        psutil.cpu_percent(interval=None)
+        self.process.cpu_percent(interval=None)
+        self._thread = threading.Thread(target=self._run, name='system-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def sample(self):
+        """Take one sample and append it to the buffer"""
+        memory = psutil.virtual_memory()
+        with self.process.oneshot():
+            process_memory = self.process.memory_info()
+            process_cpu = self.process.cpu_percent(interval=None)
+            process_threads = self.process.num_threads()
+
+        sample = SystemSample(
+            # CPU usage since the previous sample, without blocking
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=memory.percent,
+            disk_percent=psutil.disk_usage('/').percent,
+            process_cpu_percent=process_cpu,
+            process_rss=process_memory.rss,
+            process_threads=process_threads,
+            timestamp=now_ms()
+        )
+        self.samples.append(sample)
+        self.version += 1
+
+        for listener in self._listeners:
+            try:
+                listener(sample)
+            except Exception as e:
+                print(f"System sample listener failed: {e}")
+        return sample
+
+    def latest(self):
+        return self.samples[-1] if self.samples else None
+
+    def history(self):
+        return list(self.samples)
+
+    def _run(self):
+        # Fixed-rate schedule: the next tick is relative to the previous one, not to when sampling finished
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"System sampling failed: {e}")
+            next_time += self.interval
+            self._stop.wait(max(0, next_time - time.monotonic()))
@@ -0,0 +1,90 @@
+import pytest
+from alerts import FIRING, RESOLVED, AlertEngine, compile_rule, subject_index
+from records import StockRecord
+
+FIELDS = {'stocks': ('price', 'change_percent'), 'weather': ('temperature',), 'system': ('cpu_percent',)}
+KEYS = {'stocks': ['TSLA', 'AAPL'], 'weather': ['London']}
+
+def engine(*rules):
+    """An engine with the given rules and a list collecting every dispatched alert"""
+    alerts = AlertEngine(rules, FIELDS, KEYS, {'cpu': 'cpu_percent'})
+    dispatched = []
+    alerts.subscribe(dispatched.extend)
+    return alerts, dispatched
+
+def stock(symbol, change_percent, ts):
+    return StockRecord(symbol, 100.0, 0.0, change_percent, 0.0, ts)
+
+def feed(alerts, symbol, changes, start=0, step=1000):
+    for i, change in enumerate(changes):
+        alerts.observe('stocks', symbol, start + i * step, stock(symbol, change, start + i * step))
+
+def states(dispatched):
+    return [(alert.rule.text, alert.key, alert.state) for alert in dispatched]
+
+def test_fires_once_on_crossing_and_resolves():
+    alerts, dispatched = engine('TSLA change_percent < -3')
+    feed(alerts, 'TSLA', [-1, -4, -5, -6, -2])
+    assert states(dispatched) == [('TSLA change_percent < -3', 'TSLA', FIRING),
+                                  ('TSLA change_percent < -3', 'TSLA', RESOLVED)]
+    assert dispatched[0].value == -4 and dispatched[0].timestamp == 1000
+    assert alerts.active() == []
+
+def test_refires_after_resolving():
+    alerts, dispatched = engine('TSLA change_percent < -3')
+    feed(alerts, 'TSLA', [-4, 0, -4])
+    assert [alert.state for alert in dispatched] == [FIRING, RESOLVED, FIRING]
+    assert len(alerts.active()) == 1
+    assert alerts.recent_alerts() == dispatched[::-1]
+
+def test_threshold_boundary_depends_on_operator():
+    alerts, dispatched = engine('TSLA price > 100', 'TSLA price >= 100')
+    alerts.observe('stocks', 'TSLA', 0, stock('TSLA', 0, 0))
+    assert [alert.rule.text for alert in dispatched] == ['TSLA price >= 100']
+
+def test_only_rules_between_old_and_new_value_change_state():
+    alerts, dispatched = engine('AAPL change_percent > 1', 'AAPL change_percent > 2', 'AAPL change_percent > 3')
+    feed(alerts, 'AAPL', [0, 2.5, 3.5, 1.5])
+    assert states(dispatched) == [
+        ('AAPL change_percent > 1', 'AAPL', FIRING),
+        ('AAPL change_percent > 2', 'AAPL', FIRING),
+        ('AAPL change_percent > 3', 'AAPL', FIRING),
+        ('AAPL change_percent > 2', 'AAPL', RESOLVED),
+        ('AAPL change_percent > 3', 'AAPL', RESOLVED)
+    ]
+
+def test_any_key_rule_tracks_each_symbol():
+    alerts, dispatched = engine('stocks:* change_percent < -3')
+    feed(alerts, 'TSLA', [-4])
+    feed(alerts, 'AAPL', [-5, 0])
+    assert [(alert.key, alert.state) for alert in dispatched] == [('TSLA', FIRING), ('AAPL', FIRING), ('AAPL', RESOLVED)]
+
+def test_duration_fires_only_once_held_long_enough():
+    alerts, dispatched = engine('CPU > 90 for 3s')
+    for ts, cpu in [(0, 95), (1000, 96), (2000, 97)]:
+        alerts.observe('system', None, ts, {'cpu_percent': cpu})
+    assert dispatched == []
+    alerts.observe('system', None, 3000, {'cpu_percent': 98})
+    assert states(dispatched) == [('CPU > 90 for 3s', None, FIRING)]
+    alerts.observe('system', None, 4000, {'cpu_percent': 99})
+    assert len(dispatched) == 1
+
+def test_duration_restarts_when_condition_breaks():
+    alerts, dispatched = engine('CPU > 90 for 3s')
+    for ts, cpu in [(0, 95), (2000, 50), (3000, 95), (5000, 95)]:
+        alerts.observe('system', None, ts, {'cpu_percent': cpu})
+    assert dispatched == []
+    alerts.observe('system', None, 6000, {'cpu_percent': 95})
+    assert [alert.timestamp for alert in dispatched] == [6000]
+
+def test_missing_value_resolves():
+    alerts, dispatched = engine('"London" temperature >= 30')
+    alerts.observe('weather', 'London', 0, {'temperature': 31})
+    alerts.observe('weather', 'London', 1000, {'temperature': float('nan')})
+    assert [alert.state for alert in dispatched] == [FIRING, RESOLVED]
+
+@pytest.mark.parametrize('text', ['TSLA change_percent', 'TSLA volume > 1', 'NFLX price > 1', 'TSLA price > abc',
+                                  'TSLA price > 1 during 5s'])
+def test_bad_rules_are_rejected(text):
+    with pytest.raises(ValueError):
+        compile_rule(0, text, FIELDS, subject_index(KEYS))
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from analytics import ANALYTICS_COLUMNS, RollingStats, StockAnalytics
+from timeseries import TimeSeriesStore
+
+WINDOW = 5
+SPAN = 4
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    volumes = rng.integers(0, 1000, n).astype(np.float64)
+    volumes[rng.random(n) < 0.1] = np.nan
+    return prices, volumes
+
+def naive(prices, volumes):
+    """Every statistic recomputed from the full series for each tick"""
+    volumes = np.nan_to_num(volumes)
+    alpha = 2 / (SPAN + 1)
+    out = {name: [] for name in ANALYTICS_COLUMNS}
+    ema = prices[0]
+    for i in range(len(prices)):
+        window = prices[max(0, i - WINDOW + 1):i + 1]
+        window_volumes = volumes[max(0, i - WINDOW + 1):i + 1]
+        returns = np.diff(np.log(window))
+        ema = alpha * prices[i] + (1 - alpha) * ema
+        out['sma'].append(window.mean())
+        out['ema'].append(ema)
+        out['vwap'].append((window * window_volumes).sum() / window_volumes.sum() if window_volumes.sum() else np.nan)
+        out['volatility'].append(np.std(returns, ddof=1) * 100 if len(returns) > 1 else np.nan)
+        out['low'].append(window.min())
+        out['high'].append(window.max())
+    return {name: np.array(values) for name, values in out.items()}
+
+@pytest.mark.parametrize('batches', [[200], [1] * 50 + [150], [3, 7, 1, 60, 2, 127]])
+def test_incremental_matches_naive_recompute(batches):
+    prices, volumes = random_walk(sum(batches))
+    stats = RollingStats(WINDOW, SPAN)
+    parts = []
+    start = 0
+    for size in batches:
+        parts.append(stats.extend(prices[start:start + size], volumes[start:start + size]))
+        start += size
+    expected = naive(prices, volumes)
+    for name in ANALYTICS_COLUMNS:
+        np.testing.assert_allclose(np.concatenate([part[name] for part in parts]), expected[name],
+                                   rtol=1e-9, equal_nan=True, err_msg=name)
+
+def test_catch_up_only_processes_new_rows():
+    history = TimeSeriesStore({'stocks': ('price', 'volume')}, {'stocks': 100})
+    analytics = StockAnalytics(history, WINDOW, SPAN, correlation_window=10, capacity=100)
+    prices, volumes = random_walk(30, seed=1)
+    for i in range(30):
+        history.append('stocks', 'TSLA', 1000 * i, {'price': prices[i], 'volume': volumes[i]})
+        if i % 7 == 0:
+            analytics.catch_up()
+    analytics.catch_up()
+    analytics.catch_up()
+    timestamps, columns = analytics.series.window('stocks', 'TSLA')
+    assert timestamps.tolist() == [1000 * i for i in range(30)]
+    np.testing.assert_allclose(columns['sma'], naive(prices, volumes)['sma'])
+    assert analytics.latest('TSLA')['high'] == prices[-WINDOW:].max()
@@ -0,0 +1,73 @@
+import json
+import time
+import config
+from crypto_feed import OHLCAggregator
+from data_sources import CryptoData
+from records import OHLCBar
+
+START = 1700000040000  # on a minute boundary
+
+def aggregator():
+    """A 1s/1m aggregator and the list of (resolution, asset, bar) it closes"""
+    closed = []
+    return OHLCAggregator({'1s': 1, '1m': 60}, lambda *bar: closed.append(bar)), closed
+
+def test_ticks_fold_into_one_bar():
+    bars, closed = aggregator()
+    for offset, price, size in [(0, 10, 1), (200, 12, 2), (500, 9, 1), (900, 11, 3)]:
+        bars.add('BTC-USD', START + offset, price, size)
+    assert bars.current('BTC-USD', '1s') == OHLCBar(10, 12, 9, 11, 7, START)
+    assert closed == []
+
+def test_later_interval_closes_the_bar():
+    bars, closed = aggregator()
+    bars.add('BTC-USD', START, 10, 1)
+    bars.add('BTC-USD', START + 1500, 20, 1)
+    assert closed == [('1s', 'BTC-USD', OHLCBar(10, 10, 10, 10, 1, START))]
+    assert bars.current('BTC-USD', '1s') == OHLCBar(20, 20, 20, 20, 1, START + 1000)
+
+def test_late_tick_leaves_the_open_bar_alone():
+    bars, closed = aggregator()
+    bars.add('BTC-USD', START + 1000, 10, 1)
+    bars.add('BTC-USD', START + 500, 99, 5)
+    bars.add('BTC-USD', START + 200, 1, 5)
+    assert bars.current('BTC-USD', '1s') == OHLCBar(10, 10, 10, 10, 1, START + 1000)
+    assert bars.late['1s'] == 2
+    # Same minute, so the 1m bar takes them
+    assert bars.current('BTC-USD', '1m') == OHLCBar(10, 99, 1, 1, 11, START)
+    assert bars.late['1m'] == 0
+    assert closed == []
+
+def test_tick_after_close_expired_is_late():
+    bars, closed = aggregator()
+    bars.add('BTC-USD', START, 10, 1)
+    bars.close_expired(START + 5000)
+    bars.add('BTC-USD', START + 900, 50, 1)
+    assert closed == [('1s', 'BTC-USD', OHLCBar(10, 10, 10, 10, 1, START))]
+    assert bars.current('BTC-USD', '1s') is None
+    assert bars.late['1s'] == 1
+
+def test_no_feed_url_is_never_stale(monkeypatch):
+    monkeypatch.setattr(config, 'CRYPTO_FEED_URL', '')
+    crypto = CryptoData()
+    crypto.feed.stale_after = 0
+    assert not crypto.configured
+    assert crypto.get_crypto_data() is None
+    assert crypto.feed._thread is None
+
+def ticker(price):
+    return json.dumps({'type': 'ticker', 'product_id': 'BTC-USD', 'time': '2023-11-14T22:14:00Z',
+                       'price': str(price), 'last_size': '0.5', 'open_24h': '100', 'volume_24h': '2000'})
+
+def test_publishes_only_after_new_ticks(monkeypatch):
+    monkeypatch.setattr(config, 'CRYPTO_FEED_URL', 'wss://feed.example.com')
+    crypto = CryptoData()
+    crypto.feed._thread = object()  # never connect
+    crypto.feed.last_tick_at = time.monotonic()
+    assert crypto.get_crypto_data() is None
+    crypto.feed.handle_message(ticker(110))
+    [record] = crypto.get_crypto_data()
+    assert (record.asset, record.price, record.change_24h) == ('BTC-USD', 110, 10)
+    assert crypto.get_crypto_data() is None
+    crypto.feed.handle_message(ticker(90))
+    assert crypto.get_crypto_data()[0].price == 90
@@ -0,0 +1,75 @@
+import numpy as np
+from downsample import SeriesDownsampler, lttb, minmax
+from timeseries import TimeSeriesStore
+
+START = 1700000000000
+
+def filled_store(rows, step=1000, seed=0):
+    """A day-sized price series with a few gaps, one row per step ms"""
+    rng = np.random.default_rng(seed)
+    store = TimeSeriesStore({'stocks': ('price',)}, {'stocks': rows})
+    timestamps = START + np.arange(rows, dtype=np.int64) * step
+    prices = 100 + np.cumsum(rng.normal(0, 0.1, rows))
+    prices[rng.choice(rows, rows // 100, replace=False)] = np.nan
+    store.extend('stocks', 'AAPL', timestamps, {'price': prices})
+    return store, timestamps, prices
+
+def test_minmax_keeps_extremes_in_order():
+    x = np.arange(1000, dtype=np.int64)
+    y = np.sin(x / 10.0)
+    y[500] = 5
+    y[700] = -5
+    ts, values = minmax(x, y, 50)
+    assert len(ts) <= 100
+    assert np.all(np.diff(ts) > 0)
+    assert 500 in ts and 700 in ts
+
+def test_lttb_keeps_ends_and_order():
+    x = np.arange(1000, dtype=np.int64)
+    y = np.cos(x / 7.0)
+    ts, _ = lttb(x, y, 100)
+    assert len(ts) == 100
+    assert ts[0] == 0 and ts[-1] == 999
+    assert np.all(np.diff(ts) > 0)
+
+def test_random_zoom_windows_are_strictly_increasing():
+    store, timestamps, _ = filled_store(86400)
+    rng = np.random.default_rng(1)
+    for reducer in ('minmax', 'lttb'):
+        view = SeriesDownsampler(store, 'stocks', 'price', reducer)
+        for _ in range(200):
+            # Window edges fall between rows and inside pyramid buckets
+            t0 = int(rng.integers(timestamps[0] - 5000, timestamps[-1]))
+            t1 = int(rng.integers(t0 + 1, timestamps[-1] + 5000))
+            width = int(rng.integers(1, 20)) * 100
+            ts, values = view.view('AAPL', width, t0, t1)
+            assert np.all(np.diff(ts) > 0), (reducer, t0, t1, width)
+            assert len(ts) <= 2 * width + 2
+            assert len(ts) == len(values)
+
+def test_view_ends_on_the_rows_around_the_range():
+    store, timestamps, prices = filled_store(86400)
+    view = SeriesDownsampler(store, 'stocks', 'price')
+    t0, t1 = START + 3600500, START + 7200500
+    ts, values = view.view('AAPL', 300, t0, t1)
+    # One row either side of the range, so the line reaches the plot edges
+    assert ts[0] == START + 3600000 and ts[-1] == START + 7201000
+    assert values[-1] == prices[7201] or np.isnan(prices[7201])
+
+def test_small_ranges_are_returned_raw():
+    store, timestamps, prices = filled_store(1000)
+    view = SeriesDownsampler(store, 'stocks', 'price')
+    ts, values = view.view('AAPL', 1000)
+    np.testing.assert_array_equal(ts, timestamps)
+    np.testing.assert_array_equal(values, prices)
+
+def test_view_follows_new_rows():
+    store, timestamps, _ = filled_store(86400)
+    view = SeriesDownsampler(store, 'stocks', 'price')
+    view.view('AAPL', 500)
+    for i in range(1, 2001):
+        store.append('stocks', 'AAPL', int(timestamps[-1]) + i * 1000, {'price': 200.0 + i})
+    ts, values = view.view('AAPL', 500)
+    assert ts[-1] == timestamps[-1] + 2000 * 1000
+    assert values.max() == 2200.0
+    assert np.all(np.diff(ts) > 0)
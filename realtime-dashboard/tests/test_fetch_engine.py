@@ -0,0 +1,53 @@
+import threading
+import time
+import pytest
+from fetch_engine import FetchEngine
+
+@pytest.fixture
+def engine():
+    engine = FetchEngine(max_workers=4, source_timeouts={'fast': 0.5, 'slow': 0.1}, cycle_deadline=1)
+    yield engine
+    engine.shutdown()
+
+def test_slow_source_times_out_at_its_own_deadline(engine):
+    release = threading.Event()
+    published = []
+    jobs = {
+        'fast': (lambda: 'fast data', published.append),
+        'slow': (lambda: release.wait(5) and 'slow data', published.append)
+    }
+    start = time.monotonic()
+    assert engine.run_cycle(jobs) == {'fast': 'ok', 'slow': 'timeout'}
+    assert time.monotonic() - start < 0.4
+    assert published == ['fast data']
+
+    # Still running: the next cycle does not start it again
+    assert engine.run_cycle(jobs)['slow'] == 'busy'
+    release.set()
+    time.sleep(0.1)
+    assert published[-1] == 'slow data'
+    assert engine.run_cycle(jobs) == {'fast': 'ok', 'slow': 'ok'}
+
+def test_cycle_deadline_caps_every_source():
+    engine = FetchEngine(max_workers=2, source_timeouts={'hung': 10}, cycle_deadline=0.1)
+    release = threading.Event()
+    start = time.monotonic()
+    assert engine.run_cycle({'hung': (lambda: release.wait(5), print)}) == {'hung': 'timeout'}
+    assert time.monotonic() - start < 0.5
+    release.set()
+    engine.shutdown()
+
+def test_errors_are_reported_and_nothing_is_published(engine):
+    published = []
+
+    def fail():
+        raise ValueError("bad response")
+    status = engine.run_cycle({'fast': (fail, published.append), 'slow': (lambda: None, published.append)})
+    assert status == {'fast': 'error', 'slow': 'ok'}
+    # None means there was nothing new
+    assert published == []
+
+def test_sources_run_concurrently(engine):
+    barrier = threading.Barrier(2, timeout=1)
+    status = engine.run_cycle({'fast': (barrier.wait, print), 'slow': (barrier.wait, print)})
+    assert status == {'fast': 'ok', 'slow': 'ok'}
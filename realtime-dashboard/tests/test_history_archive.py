@@ -0,0 +1,37 @@
+from history_archive import HistoryArchive
+from news_store import NewsStore
+
+SCHEMAS = {'stocks': ('price',)}
+DAY = 1700000000000
+
+def archive(path):
+    return HistoryArchive(str(path), SCHEMAS, retention_days=36500)
+
+def feed(store):
+    return [(headline.id, headline.title, headline.last_seen) for headline in store.query(limit=100)[1]]
+
+def test_replayed_headline_log_builds_the_same_store(tmp_path):
+    producer, producer_store = archive(tmp_path), NewsStore(capacity=3)
+    batches = [(['Alpha', 'Beta'], DAY), (['beta', 'Gamma'], DAY + 1000), (['Delta'], DAY + 86400000)]
+    for titles, ts in batches:
+        producer_store.add(titles, ts)
+        producer.record_headlines(titles, ts)
+    producer.flush()
+
+    follower_store = NewsStore(capacity=3)
+    archive(tmp_path).headlines_into(follower_store)
+    assert feed(follower_store) == feed(producer_store)
+    assert follower_store.version == producer_store.version
+
+def test_follower_only_reads_new_complete_lines(tmp_path):
+    producer = archive(tmp_path)
+    follower, store = archive(tmp_path), NewsStore()
+    producer.record_headlines(['Alpha'], DAY)
+    producer.flush()
+    follower.headlines_into(store)
+    producer.record_headlines(['Beta'], DAY + 1000)
+    producer.flush()
+    with open(tmp_path / 'headlines' / f"{producer._day(DAY)}.jsonl", 'a', encoding='utf-8') as f:
+        f.write('[1700000002000, ["Gam')
+    follower.headlines_into(store)
+    assert [headline.title for headline in store.query()[1]] == ['Beta', 'Alpha']
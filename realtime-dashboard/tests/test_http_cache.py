@@ -0,0 +1,48 @@
+import json
+import os
+from http_cache import HttpCache
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+class FakeSession:
+    """Returns the queued responses in order, recording request headers"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.headers.append(headers)
+        return self.responses.pop(0)
+
+BODY = b'{"temp": 21.5}\x00\xff'
+
+def test_entries_are_stored_as_json(tmp_path):
+    session = FakeSession(FakeResponse(200, BODY, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+    HttpCache(session, cache_dir=str(tmp_path)).get('https://example.com/weather', {'q': 'London'})
+    [name] = os.listdir(tmp_path)
+    with open(tmp_path / name, encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['status'] == 200
+    assert data['headers'] == {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    assert isinstance(data['fetched_at'], float)
+
+def test_restarted_cache_revalidates_from_disk(tmp_path):
+    first = FakeSession(FakeResponse(200, BODY, {'ETag': '"v1"'}))
+    HttpCache(first, cache_dir=str(tmp_path)).get('https://example.com/weather')
+
+    second = FakeSession(FakeResponse(304))
+    entry = HttpCache(second, cache_dir=str(tmp_path)).get('https://example.com/weather')
+    assert second.headers == [{'If-None-Match': '"v1"'}]
+    assert entry.content == BODY
+    assert entry.version == 1
+
+def test_unreadable_entry_is_fetched_again(tmp_path):
+    cache = HttpCache(FakeSession(FakeResponse(200, BODY)), cache_dir=str(tmp_path))
+    with open(cache._path(cache._key('https://example.com/weather', None)), 'w') as f:
+        f.write('{"status": 200')
+    assert cache.get('https://example.com/weather').content == BODY
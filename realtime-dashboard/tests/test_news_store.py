@@ -0,0 +1,52 @@
+from news_store import NewsStore
+
+def titles(headlines):
+    return [headline.title for headline in headlines]
+
+def test_duplicates_only_update_last_seen():
+    store = NewsStore()
+    assert store.add(['Rates hold steady', 'Chip stocks rally'], 1000) == 2
+    assert store.add(['rates  HOLD steady', 'Oil slips'], 2000) == 1
+    assert len(store) == 3
+    total, headlines = store.query()
+    assert total == 3
+    assert titles(headlines) == ['Oil slips', 'Chip stocks rally', 'Rates hold steady']
+    assert (headlines[2].first_seen, headlines[2].last_seen) == (1000, 2000)
+
+def test_version_changes_only_with_new_headlines():
+    store = NewsStore()
+    store.add(['One'], 0)
+    version = store.version
+    store.add(['one'], 1)
+    assert store.version == version
+    store.add(['Two'], 2)
+    assert store.version == version + 1
+
+def test_filter_matches_every_word_newest_first():
+    store = NewsStore()
+    store.add(['Fed holds rates', 'Rates rise in Europe', 'Fed chair speaks', 'Europe rates fall'], 0)
+    assert titles(store.query('rates europe ')[1]) == ['Europe rates fall', 'Rates rise in Europe']
+    assert store.query('fed')[0] == 2
+    assert store.query('bitcoin ')[0] == 0
+
+def test_last_word_matches_as_prefix_while_typing():
+    store = NewsStore()
+    store.add(['Chip stocks rally', 'Chipmakers slump', 'Chile election'], 0)
+    assert titles(store.query('chip')[1]) == ['Chipmakers slump', 'Chip stocks rally']
+    assert titles(store.query('chip ')[1]) == ['Chip stocks rally']
+    assert store.query('ch')[0] == 3
+
+def test_paging():
+    store = NewsStore()
+    store.add([f"Story {i} markets" for i in range(10)], 0)
+    assert titles(store.query('', offset=2, limit=3)[1]) == ['Story 7 markets', 'Story 6 markets', 'Story 5 markets']
+    assert titles(store.query('markets', offset=8, limit=5)[1]) == ['Story 1 markets', 'Story 0 markets']
+
+def test_oldest_headlines_are_evicted_from_the_index():
+    store = NewsStore(capacity=3)
+    store.add(['Alpha news', 'Beta news', 'Gamma news', 'Delta news'], 0)
+    assert len(store) == 3
+    assert store.query('alpha')[0] == 0
+    assert store.query('news')[0] == 3
+    # An evicted headline counts as new when it comes back
+    assert store.add(['Alpha news'], 1) == 1
@@ -0,0 +1,59 @@
+import threading
+import time
+import pytest
+from dash import html
+from render_cache import RenderCache, RenderedPanel
+
+def test_hits_reuse_the_rendered_value():
+    cache = RenderCache()
+    calls = []
+    render = lambda: calls.append(1) or object()
+    first = cache.get(('weather', 1), render)
+    assert cache.get(('weather', 1), render) is first
+    assert cache.get(('weather', 2), render) is not first
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_ratio == pytest.approx(1 / 3)
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RenderCache(max_entries=2)
+    cache.get('a', lambda: 'A')
+    cache.get('b', lambda: 'B')
+    cache.get('a', lambda: 'A again')
+    cache.get('c', lambda: 'C')
+    assert len(cache) == 2
+    assert cache.get('a', lambda: 'A again') == 'A'
+    assert cache.get('b', lambda: 'B again') == 'B again'
+
+def test_concurrent_requests_share_one_render():
+    cache = RenderCache()
+    calls = []
+
+    def render():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'panel'
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('news', render))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['panel'] * 8
+    assert len(calls) == 1
+
+def test_failed_render_is_not_cached():
+    cache = RenderCache()
+
+    def fail():
+        raise RuntimeError("render failed")
+    with pytest.raises(RuntimeError):
+        cache.get('stocks', fail)
+    assert cache.get('stocks', lambda: 'ok') == 'ok'
+
+def test_panel_serializes_once():
+    cache = RenderCache()
+    panel = cache.panel('system', 3, lambda: html.Div("CPU", id='cpu'))
+    assert isinstance(panel, RenderedPanel)
+    assert panel.value == {'props': {'children': 'CPU', 'id': 'cpu'}, 'type': 'Div', 'namespace': 'dash_html_components'}
+    assert cache.panel('system', 3, lambda: html.Div("other")) is panel
@@ -0,0 +1,70 @@
+import pytest
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    return clock
+
+def fail():
+    raise ConnectionError("upstream down")
+
+def trip(breaker, times):
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('test-open', failure_threshold=3, reset_timeout=30)
+    trip(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.call(lambda: 'ok')
+    trip(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    trip(breaker, 1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_open_circuit_fails_fast(clock):
+    breaker = CircuitBreaker('test-fast', failure_threshold=1, reset_timeout=30)
+    trip(breaker, 1)
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert breaker.retry_in == 30
+
+def test_one_probe_after_the_timeout_closes_on_success(clock):
+    breaker = CircuitBreaker('test-probe', failure_threshold=1, reset_timeout=30)
+    trip(breaker, 1)
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.call(lambda: 'ok') == 'ok'
+
+def test_failed_probe_doubles_the_timeout_up_to_the_cap(clock):
+    breaker = CircuitBreaker('test-backoff', failure_threshold=1, reset_timeout=30, max_reset_timeout=100)
+    trip(breaker, 1)
+    retries = []
+    for _ in range(4):
+        clock.now += breaker.retry_in
+        trip(breaker, 1)
+        assert breaker.state == CircuitBreaker.OPEN
+        retries.append(breaker.retry_in)
+    assert retries == [60, 100, 100, 100]
+    clock.now += 100
+    breaker.call(lambda: 'ok')
+    trip(breaker, 1)
+    assert breaker.retry_in == 30
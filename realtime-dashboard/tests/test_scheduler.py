@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import Future
+import scheduler
+from scheduler import Scheduler
+
+def due_times(sched):
+    return {name: due for due, _, name in sched._queue}
+
+def finished(sched, name, outcomes, started=100.0):
+    """Due time of name after finishing a run started at `started` with each outcome in turn"""
+    job = sched._jobs[name]
+    for ok in outcomes:
+        sched._queue.clear()
+        job.started = started
+        sched._finish(job, ok)
+    return due_times(sched)[name]
+
+def test_next_run_is_measured_from_the_previous_start(monkeypatch):
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: 0)
+    sched = Scheduler()
+    sched.add('weather', lambda: True, 60)
+    assert finished(sched, 'weather', [True]) == 160
+
+def test_failures_back_off_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: 0)
+    sched = Scheduler(max_backoff=900)
+    sched.add('stocks', lambda: True, 60)
+    assert finished(sched, 'stocks', [False]) == 100 + 120
+    assert finished(sched, 'stocks', [False, False]) == 100 + 480
+    # 4th failure would wait 60 * 16
+    assert finished(sched, 'stocks', [False]) == 100 + 900
+    assert sched._jobs['stocks'].failures == 4
+    assert finished(sched, 'stocks', [True]) == 160
+    assert sched._jobs['stocks'].failures == 0
+
+def test_cap_never_shortens_a_long_interval(monkeypatch):
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: 0)
+    sched = Scheduler(max_backoff=900)
+    sched.add('closed-market', lambda: True, 3600)
+    assert finished(sched, 'closed-market', [False]) == 100 + 3600
+
+def test_none_neither_resets_nor_counts(monkeypatch):
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: 0)
+    sched = Scheduler()
+    sched.add('news', lambda: True, 10)
+    finished(sched, 'news', [False])
+    assert finished(sched, 'news', [None]) == 100 + 20
+    assert sched._jobs['news'].failures == 1
+
+def test_jitter_stays_within_bounds():
+    sched = Scheduler(jitter=0.1)
+    sched.add('crypto', lambda: True, 100, delay=0)
+    dues = [finished(sched, 'crypto', [True]) for _ in range(200)]
+    assert all(100 + 90 <= due <= 100 + 110 for due in dues)
+    assert len(set(dues)) > 1
+
+def test_interval_may_be_a_function(monkeypatch):
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: 0)
+    sched = Scheduler()
+    sched.add('stocks', lambda: True, lambda: 5)
+    assert finished(sched, 'stocks', [True]) == 105
+
+def test_future_jobs_never_overlap():
+    sched = Scheduler(jitter=0)
+    running = []
+    overlaps = []
+    runs = []
+
+    def run():
+        if running:
+            overlaps.append(True)
+        future = Future()
+        running.append(future)
+        runs.append(time.monotonic())
+
+        def finish():
+            time.sleep(0.05)
+            running.remove(future)
+            future.set_result(None)
+        threading.Thread(target=finish).start()
+        return future
+
+    sched.add('slow', run, 0.01)
+    sched.start()
+    time.sleep(0.3)
+    sched.stop()
+    assert 2 <= len(runs) <= 7
+    assert not overlaps
@@ -0,0 +1,57 @@
+import shared_state
+from records import NewsRecord
+from shared_state import HEADER, MAGIC, SharedState
+from snapshot import EMPTY_SNAPSHOT
+
+def news_snapshot(count):
+    return EMPTY_SNAPSHOT.publish('news', NewsRecord(count, tuple(f"Headline {i}" for i in range(count)), 1000 * count))
+
+class InterruptedHeader:
+    """HEADER whose next sequence check after a payload copy first runs `write`"""
+
+    def __init__(self, write):
+        self.size = HEADER.size
+        self.write = write
+        self.calls = 0
+
+    def pack_into(self, *args):
+        HEADER.pack_into(*args)
+
+    def unpack_from(self, buffer, offset=0):
+        self.calls += 1
+        if self.calls == 2 and self.write is not None:
+            # The reader has copied the payload; the producer overwrites it before the check
+            write, self.write = self.write, None
+            write()
+        return HEADER.unpack_from(buffer, offset)
+
+def test_reader_sees_published_snapshot(tmp_path):
+    producer = SharedState(str(tmp_path), 1 << 16)
+    assert producer.try_become_producer()
+    reader = SharedState(str(tmp_path), 1 << 16)
+    assert reader.read() is None
+    producer.write(news_snapshot(2))
+    assert reader.read().news.latest_titles == ('Headline 0', 'Headline 1')
+    assert reader.read() is reader.read()
+
+def test_torn_read_is_retried(tmp_path, monkeypatch):
+    producer = SharedState(str(tmp_path), 1 << 16)
+    producer.try_become_producer()
+    reader = SharedState(str(tmp_path), 1 << 16)
+    producer.write(news_snapshot(1))
+    header = InterruptedHeader(lambda: producer.write(news_snapshot(5)))
+    monkeypatch.setattr(shared_state, 'HEADER', header)
+    snapshot = reader.read()
+    # The first copy was discarded and the read retried
+    assert header.calls == 4
+    assert snapshot.news.news_count == 5
+
+def test_write_in_progress_keeps_last_snapshot(tmp_path):
+    producer = SharedState(str(tmp_path), 1 << 16)
+    producer.try_become_producer()
+    reader = SharedState(str(tmp_path), 1 << 16)
+    producer.write(news_snapshot(1))
+    assert reader.read().news.news_count == 1
+    # An odd sequence number: the producer is part way through the next write
+    HEADER.pack_into(producer._mm, 0, MAGIC, producer._seq + 1, 0)
+    assert reader.read().news.news_count == 1
@@ -0,0 +1,99 @@
+import copy
+import json
+import math
+import os
+import pytest
+import config
+from data_sources import StockData
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fixtures')
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return json.load(f)
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+class FakeSession:
+    """Answers spark and quote requests from the captured-layout fixtures"""
+
+    def __init__(self, spark, quote):
+        self.spark = spark
+        self.quote = quote
+        self.quote_status = 200
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((url, params))
+        if url == config.STOCK_QUOTE_URL:
+            return FakeResponse(copy.deepcopy(self.quote), self.quote_status)
+        return FakeResponse(copy.deepcopy(self.spark))
+
+@pytest.fixture
+def stocks(monkeypatch):
+    monkeypatch.setattr(config, 'STOCK_SYMBOLS', ['AAPL', 'TSLA'])
+    source = StockData()
+    source.session = FakeSession(load_fixture('spark_1d_1m.json'), load_fixture('quote.json'))
+    return source
+
+def set_day_volume(session, symbol, volume):
+    for result in session.spark['spark']['result']:
+        if result['symbol'] == symbol:
+            result['response'][0]['meta']['regularMarketVolume'] = volume
+    for quote in session.quote['quoteResponse']['result']:
+        if quote['symbol'] == symbol:
+            quote['regularMarketVolume'] = volume
+
+def test_prices_come_from_the_last_close(stocks):
+    records = {record.symbol: record for record in stocks.get_stock_data()}
+    assert records['AAPL'].price == 247.52
+    assert records['TSLA'].price == 434.05
+
+def test_first_sample_has_unknown_volume(stocks):
+    for record in stocks.get_stock_data():
+        assert math.isnan(record.volume)
+
+def test_volume_is_traded_since_the_previous_sample(stocks):
+    stocks.get_stock_data()
+    set_day_volume(stocks.session, 'AAPL', 1843217 + 1500)
+    set_day_volume(stocks.session, 'TSLA', 5120334 + 250)
+    records = {record.symbol: record for record in stocks.get_stock_data()}
+    assert records['AAPL'].volume == 1500
+    assert records['TSLA'].volume == 250
+
+def test_quote_endpoint_only_asked_for_symbols_without_meta_volume(stocks):
+    stocks.get_stock_data()
+    quotes = [params for url, params in stocks.session.requests if url == config.STOCK_QUOTE_URL]
+    assert quotes == [{'symbols': 'TSLA'}]
+
+def test_missing_volume_is_nan_not_zero(stocks):
+    stocks.session.quote = {'quoteResponse': {'result': [], 'error': None}}
+    stocks.get_stock_data()
+    records = {record.symbol: record for record in stocks.get_stock_data()}
+    assert math.isnan(records['TSLA'].volume)
+    assert records['AAPL'].volume == 0
+
+def test_new_session_restarts_the_day_volume(stocks):
+    stocks.get_stock_data()
+    set_day_volume(stocks.session, 'AAPL', 4200)
+    records = {record.symbol: record for record in stocks.get_stock_data()}
+    assert records['AAPL'].volume == 4200
+
+def test_refused_quote_endpoint_is_not_asked_again(stocks):
+    stocks.session.quote_status = 401
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD + 1):
+        records = {record.symbol: record for record in stocks.get_stock_data()}
+    quotes = [params for url, params in stocks.session.requests if url == config.STOCK_QUOTE_URL]
+    assert len(quotes) == 1
+    assert stocks.quote_breaker.state == 'closed'
+    assert records['AAPL'].volume == 0
+    assert math.isnan(records['TSLA'].volume)
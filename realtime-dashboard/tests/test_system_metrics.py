@@ -0,0 +1,16 @@
+from alerts import AlertEngine
+from records import SystemSample
+from system_metrics import SAMPLE_ALIASES, SAMPLE_COLUMNS, SystemSampler
+
+def test_samples_are_records_with_epoch_ms():
+    sample = SystemSampler(interval=1, history=4).sample()
+    assert isinstance(sample, SystemSample)
+    assert isinstance(sample.timestamp, int) and sample.timestamp > 1e12
+    assert sample.get('cpu_percent') == sample.cpu_percent
+    assert sample.get('missing') is None
+
+def test_samples_feed_alert_rules():
+    engine = AlertEngine(['CPU > 90'], {'system': SAMPLE_COLUMNS}, aliases=SAMPLE_ALIASES)
+    engine.observe('system', None, 1000, SystemSample(95.0, 50.0, 40.0, 1.0, 1 << 20, 8, 1000))
+    [alert] = engine.active()
+    assert alert.value == 95.0 and alert.timestamp == 1000
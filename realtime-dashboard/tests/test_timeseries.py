@@ -0,0 +1,67 @@
+import numpy as np
+from timeseries import RingBuffer
+
+def filled(capacity, rows):
+    buffer = RingBuffer(capacity, ('value',))
+    for i in range(rows):
+        buffer.append(1000 * i, {'value': float(i)})
+    return buffer
+
+def test_wraparound_keeps_newest_rows_in_order():
+    buffer = filled(4, 11)
+    timestamps, columns = buffer.window()
+    assert len(buffer) == 4
+    assert timestamps.tolist() == [7000, 8000, 9000, 10000]
+    assert columns['value'].tolist() == [7, 8, 9, 10]
+    assert buffer.latest() == (10000, {'value': 10.0})
+
+def test_window_and_since_after_wraparound():
+    buffer = filled(5, 13)
+    assert buffer.window(2)[0].tolist() == [11000, 12000]
+    assert buffer.window(50)[0].tolist() == [8000, 9000, 10000, 11000, 12000]
+    assert buffer.since(9500)[1]['value'].tolist() == [10, 11, 12]
+    assert len(buffer.since(12000)[0]) == 0
+
+def test_missing_values_are_nan():
+    buffer = RingBuffer(3, ('a', 'b'))
+    buffer.append(0, {'a': 1.0})
+    assert np.isnan(buffer.window()[1]['b'][0])
+
+def test_extend_wraps_like_appends():
+    appended = filled(4, 6)
+    extended = filled(4, 3)
+    timestamps = np.arange(3, 6, dtype=np.int64) * 1000
+    extended.extend(timestamps, {'value': np.arange(3, 6, dtype=np.float64)})
+    assert extended.window()[0].tolist() == appended.window()[0].tolist()
+    assert extended.window()[1]['value'].tolist() == appended.window()[1]['value'].tolist()
+    extended.append(6000, {'value': 6.0})
+    assert extended.window()[1]['value'].tolist() == [3, 4, 5, 6]
+
+def test_extend_longer_than_capacity_keeps_the_newest():
+    buffer = RingBuffer(3, ('value',))
+    buffer.extend(np.arange(10, dtype=np.int64), {'value': np.arange(10, dtype=np.float64)})
+    assert buffer.window()[0].tolist() == [7, 8, 9]
+
+def test_storage_grows_with_the_rows_up_to_capacity():
+    buffer = filled(1000, 10)
+    assert buffer.allocated == RingBuffer.INITIAL_ROWS
+    small = buffer.nbytes
+    for i in range(10, 300):
+        buffer.append(1000 * i, {'value': float(i)})
+    assert buffer.allocated == 512
+    assert buffer.window()[1]['value'].tolist() == list(range(300))
+    for i in range(300, 1250):
+        buffer.append(1000 * i, {'value': float(i)})
+    assert buffer.allocated == 1000
+    assert buffer.nbytes == small * 1000 // RingBuffer.INITIAL_ROWS
+    assert buffer.window()[1]['value'].tolist() == list(range(250, 1250))
+    assert buffer.latest() == (1249000, {'value': 1249.0})
+
+def test_extend_grows_once_for_the_whole_batch():
+    buffer = filled(1000, 3)
+    view = buffer.window()[0]
+    buffer.extend(np.arange(3, 203, dtype=np.int64) * 1000, {'value': np.arange(3, 203, dtype=np.float64)})
+    assert buffer.allocated == 256
+    assert buffer.window()[1]['value'].tolist() == list(range(203))
+    # Views taken before growing still show the rows they held
+    assert view.tolist() == [0, 1000, 2000]
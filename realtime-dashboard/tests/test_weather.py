@@ -0,0 +1,41 @@
+import config
+from data_sources import WeatherData
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+class FakeCache:
+    def __init__(self, names):
+        self.names = names
+
+    def get(self, url, params=None, ttl=0, timeout=None):
+        return FakeResponse({
+            'name': self.names[params['q']],
+            'main': {'temp': 21.0, 'humidity': 60, 'pressure': 1012},
+            'weather': [{'description': 'clear sky'}],
+            'dt': 0
+        })
+
+def test_weather_is_keyed_by_the_requested_city(monkeypatch):
+    monkeypatch.setattr(config, 'WEATHER_LOCATIONS', ['New York', 'Tokyo'])
+    weather = WeatherData()
+    weather.cache = FakeCache({'New York': 'New York City', 'Tokyo': 'Tokyo'})
+    records = weather.get_all_weather()
+    assert [record.city for record in records] == ['New York', 'Tokyo']
+
+def test_failing_city_does_not_open_the_others_circuit(monkeypatch):
+    monkeypatch.setattr(config, 'WEATHER_LOCATIONS', ['Atlantis', 'Tokyo'])
+    weather = WeatherData()
+    weather.cache = FakeCache({'Tokyo': 'Tokyo'})
+    for _ in range(config.CIRCUIT_FAILURE_THRESHOLD + 1):
+        records = weather.get_all_weather()
+        weather._observations.clear()
+    assert [record.city for record in records] == ['Tokyo']
+    assert weather.breakers['Atlantis'].state == 'open'
+    assert weather.breakers['Tokyo'].state == 'closed'
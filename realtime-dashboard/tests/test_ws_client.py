@@ -0,0 +1,71 @@
+import io
+import os
+import struct
+import pytest
+from ws_client import (OP_BINARY, OP_CONTINUATION, OP_PING, OP_PONG, OP_TEXT, WebSocket, apply_mask,
+                       encode_frame, read_frame)
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+def socket_receiving(*frames):
+    """A WebSocket reading the given raw frames, without a connection or handshake"""
+    ws = WebSocket.__new__(WebSocket)
+    ws.stream = io.BytesIO(b''.join(frames))
+    ws.sock = FakeSocket()
+    return ws
+
+def frame(payload, opcode, fin=True):
+    """One unmasked server frame, possibly non-final"""
+    return bytes([(0x80 if fin else 0) | opcode, len(payload)]) + payload
+
+def test_mask_is_its_own_inverse():
+    payload = os.urandom(1001)
+    mask = b'\x01\x80\xfe\x7f'
+    masked = apply_mask(payload, mask)
+    assert masked != payload
+    assert masked[:4] == bytes(b ^ m for b, m in zip(payload[:4], mask))
+    assert apply_mask(masked, mask) == payload
+    assert apply_mask(b'', mask) == b''
+
+def test_client_frames_are_masked():
+    data = encode_frame('hello', mask=True)
+    assert data[0] == 0x80 | OP_TEXT
+    assert data[1] == 0x80 | 5
+    key = data[2:6]
+    assert apply_mask(data[6:], key) == b'hello'
+    assert read_frame(io.BytesIO(data)) == (True, OP_TEXT, b'hello')
+
+@pytest.mark.parametrize('size, header', [(125, 2), (126, 4), (65535, 4), (65536, 10)])
+def test_payload_length_encodings(size, header):
+    payload = os.urandom(size)
+    data = encode_frame(payload, OP_BINARY)
+    assert len(data) == header + size
+    assert read_frame(io.BytesIO(data)) == (True, OP_BINARY, payload)
+    masked = encode_frame(payload, OP_BINARY, mask=True)
+    assert read_frame(io.BytesIO(masked)) == (True, OP_BINARY, payload)
+
+def test_fragmented_message_is_reassembled():
+    ws = socket_receiving(frame(b'{"type":', OP_TEXT, fin=False), frame(b'"ticker",', OP_CONTINUATION, fin=False),
+                          frame(b'"price":"1"}', OP_CONTINUATION))
+    assert ws.recv() == '{"type":"ticker","price":"1"}'
+
+def test_ping_between_fragments_is_answered():
+    ws = socket_receiving(frame(b'ab', OP_BINARY, fin=False), frame(b'hi', OP_PING), frame(b'cd', OP_CONTINUATION))
+    assert ws.recv() == b'abcd'
+    [pong] = ws.sock.sent
+    fin, opcode, payload = read_frame(io.BytesIO(pong))
+    assert (fin, opcode, payload) == (True, OP_PONG, b'hi')
+    assert pong[1] & 0x80
+
+def test_close_frame_ends_the_stream():
+    ws = socket_receiving(frame(struct.pack('!H', 1000), 0x8))
+    assert ws.recv() is None
+
+def test_truncated_frame_raises():
+    with pytest.raises(ConnectionError):
+        read_frame(io.BytesIO(encode_frame('hello')[:-1]))
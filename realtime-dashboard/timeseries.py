@@ -0,0 +1,168 @@
+import threading
+import numpy as np
+
+class RingBuffer:
+    """Bounded columnar ring buffer
+
+    Timestamps are epoch milliseconds (int64) and every metric is its own
+    float64 column. Each row is written twice, at i and i + allocated, so the
+    newest n rows are always one contiguous slice: appends are O(1) and
+    windows are NumPy views, not copies. Views alias the live buffer, so copy
+    them if they must outlive the next `capacity` appends.
+
+    Storage starts at INITIAL_ROWS and doubles as it fills, so a series that
+    never reaches `capacity` rows never pays for them.
+    """
+
+    INITIAL_ROWS = 64
+
+    def __init__(self, capacity, columns):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._timestamps = np.zeros(0, dtype=np.int64)
+        self._data = {name: np.zeros(0, dtype=np.float64) for name in self.columns}
+        self._pos = 0
+        self._size = 0
+        self._grow(min(capacity, self.INITIAL_ROWS))
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def allocated(self):
+        """Rows the buffers currently hold before wrapping"""
+        return len(self._timestamps) // 2
+
+    def _grow(self, rows):
+        """Reallocate for at least rows rows (at most capacity), keeping the newest rows in order"""
+        allocated = max(1, self.allocated)
+        while allocated < rows:
+            allocated *= 2
+        allocated = min(allocated, self.capacity)
+        n = self._size
+        timestamps, columns = self.window()
+        new_timestamps = np.zeros(2 * allocated, dtype=np.int64)
+        new_timestamps[:n] = new_timestamps[allocated:allocated + n] = timestamps
+        data = {}
+        for name, values in columns.items():
+            column = data[name] = np.zeros(2 * allocated, dtype=np.float64)
+            column[:n] = column[allocated:allocated + n] = values
+        # Readers take no lock: this position is also the current one in the old
+        # layout, and the columns are swapped before the timestamps, so a window
+        # taken mid-swap still slices each array it read at the right rows
+        self._pos = n % allocated
+        self._data = data
+        self._timestamps = new_timestamps
+
+    def append(self, ts, values):
+        """Append one row; values maps column name to number (missing -> NaN)"""
+        if self._size == self.allocated < self.capacity:
+            self._grow(self._size + 1)
+        allocated = self.allocated
+        i = self._pos
+        j = i + allocated
+        self._timestamps[i] = self._timestamps[j] = ts
+        for name in self.columns:
+            value = values.get(name)
+            self._data[name][i] = self._data[name][j] = np.nan if value is None else value
+
+        self._pos = (i + 1) % allocated
+        if self._size < self.capacity:
+            self._size += 1
+
+    def extend(self, timestamps, columns):
+        """Append many rows at once from arrays (used to warm-start from disk)"""
+        n = len(timestamps)
+        if not n:
+            return
+        if self._size + n > self.allocated < self.capacity:
+            self._grow(self._size + n)
+        allocated = self.allocated
+        # Only the newest `capacity` rows can survive
+        skip = max(0, n - allocated)
+        index = (self._pos + np.arange(n - skip)) % allocated
+        for target, values in [(self._timestamps, timestamps)] + [
+                (col, columns[name]) for name, col in self._data.items()]:
+            target[index] = values[skip:]
+            target[index + allocated] = values[skip:]
+
+        self._pos = int(index[-1] + 1) % allocated
+        self._size = min(self._size + n - skip, allocated)
+
+    @staticmethod
+    def _newest(values, pos, n):
+        """The n rows of one mirrored array ending at pos"""
+        end = pos + len(values) // 2
+        return values[end - n:end]
+
+    def window(self, n=None):
+        """Get (timestamps, {column: values}) views of the newest n rows, oldest first"""
+        timestamps, data = self._timestamps, self._data
+        pos = self._pos
+        n = self._size if n is None else max(0, min(n, self._size))
+        return self._newest(timestamps, pos, n), {name: self._newest(col, pos, n) for name, col in data.items()}
+
+    def since(self, ts):
+        """Get views of the rows newer than ts"""
+        # One window for both the search and the slice, so an append in between cannot shift it
+        timestamps, columns = self.window()
+        # Timestamps are appended in order, so the window is sorted
+        start = int(np.searchsorted(timestamps, ts, side='right'))
+        return timestamps[start:], {name: values[start:] for name, values in columns.items()}
+
+    def latest(self):
+        """Get (timestamp, {column: value}) of the newest row, or None"""
+        if not self._size:
+            return None
+        timestamps, data = self._timestamps, self._data
+        pos = self._pos
+        return int(self._newest(timestamps, pos, 1)[0]), {name: float(self._newest(col, pos, 1)[0])
+                                                          for name, col in data.items()}
+
+    @property
+    def nbytes(self):
+        return self._timestamps.nbytes + sum(col.nbytes for col in self._data.values())
+
+class TimeSeriesStore:
+    """Ring buffers per source and key (symbol, city, ...), created on first append"""
+
+    def __init__(self, schemas, capacities):
+        self.schemas = schemas
+        self.capacities = capacities
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def append(self, source, key, ts, values):
+        buffer = self._buffers.get((source, key))
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get((source, key))
+                if buffer is None:
+                    buffer = RingBuffer(self.capacities[source], self.schemas[source])
+                    self._buffers[(source, key)] = buffer
+        buffer.append(ts, values)
+
+    def extend(self, source, key, timestamps, columns):
+        buffer = self._buffers.get((source, key))
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(
+                    (source, key), RingBuffer(self.capacities[source], self.schemas[source]))
+        buffer.extend(timestamps, columns)
+
+    def buffer(self, source, key=None):
+        return self._buffers.get((source, key))
+
+    def window(self, source, key=None, n=None):
+        """Get (timestamps, {column: values}) views for one series, or None if it is empty"""
+        buffer = self._buffers.get((source, key))
+        return buffer.window(n) if buffer is not None else None
+
+    def keys(self, source):
+        return [key for buffer_source, key in list(self._buffers) if buffer_source == source]
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in list(self._buffers.values()))
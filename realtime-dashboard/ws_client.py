@@ -0,0 +1,159 @@
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+from urllib.parse import urlparse
+import config
+
+# RFC 6455 opcodes
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+HANDSHAKE_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key"""
+    return base64.b64encode(hashlib.sha1((key + HANDSHAKE_GUID).encode('ascii')).digest()).decode('ascii')
+
+def apply_mask(payload, mask):
+    """XOR payload with the 4-byte mask (its own inverse)"""
+    n = len(payload)
+    if not n:
+        return payload
+    # One big-integer XOR instead of a Python loop over every byte
+    repeated = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(n, 'big')
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    """One final frame; clients must mask, servers must not"""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    n = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, mask_bit | n)
+    elif n < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, mask_bit | 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, mask_bit | 127, n)
+    if mask:
+        key = os.urandom(4)
+        return header + key + apply_mask(payload, key)
+    return header + payload
+
+def read_exact(stream, n):
+    data = stream.read(n)
+    if len(data) < n:
+        raise ConnectionError("connection closed mid-frame")
+    return data
+
+def read_frame(stream):
+    """Read one frame from a buffered binary stream: (fin, opcode, payload)"""
+    first, second = read_exact(stream, 2)
+    n = second & 0x7F
+    if n == 126:
+        n = struct.unpack('!H', read_exact(stream, 2))[0]
+    elif n == 127:
+        n = struct.unpack('!Q', read_exact(stream, 8))[0]
+    key = read_exact(stream, 4) if second & 0x80 else None
+    payload = read_exact(stream, n)
+    if key is not None:
+        payload = apply_mask(payload, key)
+    return bool(first & 0x80), first & 0x0F, payload
+
+class WebSocket:
+    """Minimal blocking WebSocket client (RFC 6455) on the standard library
+
+    Enough for JSON market data feeds: text and binary messages, fragmented
+    messages, ping/pong and close. ws:// and wss:// URLs are supported;
+    extensions such as compression are not negotiated.
+    """
+
+    def __init__(self, url, timeout=10, headers=None):
+        parsed = urlparse(url)
+        secure = parsed.scheme == 'wss'
+        port = parsed.port or (443 if secure else 80)
+        path = (parsed.path or '/') + (f"?{parsed.query}" if parsed.query else '')
+
+        sock = socket.create_connection((parsed.hostname, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parsed.hostname)
+        self.sock = sock
+        self.stream = sock.makefile('rb')
+
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        lines = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {parsed.hostname}" + (f":{parsed.port}" if parsed.port else ''),
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13",
+            f"User-Agent: {config.HTTP_USER_AGENT}"
+        ] + [f"{name}: {value}" for name, value in (headers or {}).items()]
+        sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('ascii'))
+
+        status = self.stream.readline().decode('latin-1')
+        response_headers = {}
+        while True:
+            line = self.stream.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        if ' 101 ' not in status:
+            self.close()
+            raise ConnectionError(f"WebSocket handshake failed: {status.strip()}")
+        if response_headers.get('sec-websocket-accept') != accept_key(key):
+            self.close()
+            raise ConnectionError("WebSocket handshake failed: bad Sec-WebSocket-Accept")
+
+    def send(self, message):
+        """Send a text (str) or binary (bytes) message"""
+        opcode = OP_TEXT if isinstance(message, str) else OP_BINARY
+        self.sock.sendall(encode_frame(message, opcode, mask=True))
+
+    def recv(self):
+        """Block until the next message and return it (str for text); None once closed"""
+        fragments = []
+        message_opcode = None
+        while True:
+            fin, opcode, payload = read_frame(self.stream)
+            if opcode == OP_PING:
+                self.sock.sendall(encode_frame(payload, OP_PONG, mask=True))
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                try:
+                    self.sock.sendall(encode_frame(payload[:2], OP_CLOSE, mask=True))
+                except OSError:
+                    pass
+                return None
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+            fragments.append(payload)
+            if fin:
+                data = fragments[0] if len(fragments) == 1 else b''.join(fragments)
+                return data.decode('utf-8') if message_opcode == OP_TEXT else data
+
+    def settimeout(self, timeout):
+        self.sock.settimeout(timeout)
+
+    def close(self):
+        try:
+            self.sock.sendall(encode_frame(struct.pack('!H', 1000), OP_CLOSE, mask=True))
+        except OSError:
+            pass
+        try:
+            self.stream.close()
+            self.sock.close()
+        except OSError:
+            pass